@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -77,6 +78,13 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Workers e servidor web no mesmo arquivo: WAL (leituras não bloqueiam a escrita), espera de até
+        # 20 s pelo lock em vez de "database is locked" e BEGIN IMMEDIATE nas transações (ver formulario2/db.py)
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL',
+        },
     }
 }
 
@@ -122,9 +130,79 @@ LOGIN_URL = '/formulario2/login/'
 LOGIN_REDIRECT_URL = '/formulario2/'
 LOGOUT_REDIRECT_URL = '/formulario2/login/'
 
+# Worker de automação: máximo de jobs (navegadores) simultâneos por portal
+AUTOMATION_CONCURRENCY = {
+    'porto': 4,
+    'amil': 2,
+}
+
+# chromedriver: caminho pré-instalado (sem acesso à rede) ou cache local por versão do Chrome
+AUTOMATION_CHROMEDRIVER_PATH = None
+AUTOMATION_CHROMEDRIVER_CACHE_DIR = BASE_DIR / '.chromedriver'
+AUTOMATION_CHROMEDRIVER_OFFLINE = False  # True em workers sem internet: nunca baixar o driver
+
+# Pool de navegadores pré-inicializados usado pelo worker
+AUTOMATION_DRIVER_POOL = {
+    'enabled': True,
+    'size': {'porto': 4, 'amil': 2},  # navegadores ociosos mantidos prontos
+    'max_uses': 20,  # jobs por navegador antes de reciclar
+    'max_rss_mb': 1500,  # recicla quando o Chrome passa desse consumo de memória
+    'reset': ['cookies', 'tabs', 'storage'],  # estado limpo ao devolver o navegador
+}
+
+# Sessões autenticadas dos portais (cookies do último login, reaproveitados entre jobs)
+AUTOMATION_SESSION_DIR = BASE_DIR / 'sessions'
+AUTOMATION_SESSION_MAX_AGE = 4 * 60 * 60  # segundos; sessões mais antigas nem são testadas
+
+# Timeouts adaptativos por passo: p99 das durações observadas × multiplicador, limitado entre min e max
+AUTOMATION_STEP_TIMEOUTS = {
+    'enabled': True,
+    'percentile': 99,
+    'multiplier': 1.5,
+    'min': 2,  # segundos
+    'max': 90,  # segundos
+    'min_samples': 20,  # abaixo disso vale o valor de TIMING
+    'growth_timeout_rate': 0.05,  # esperas esgotadas acima disso (com sucessos no limite) permitem crescer
+    'max_growth': 1.25,  # aumento máximo por recálculo
+    'window': 500,  # jobs mais recentes considerados
+    'refresh_interval': 3600,  # o worker recalcula a cada N segundos
+}
+
+# Endpoint /metrics (Prometheus)
+AUTOMATION_METRICS = {
+    'token': None,  # defina para exigir "Authorization: Bearer <token>"
+    'window': 500,  # jobs mais recentes usados nos histogramas de duração
+    'throughput_window': 300,  # segundos considerados em jobs por minuto
+    'worker_stale_after': 60,  # segundos sem notícias até um worker ser considerado parado
+    'worker_status_interval': 5,  # segundos entre publicações do estado do worker
+    'buckets': [0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300],
+}
+
+# Escritas dos jobs com o banco ocupado (além do timeout de DATABASES): novas tentativas com espera crescente
+AUTOMATION_DB_WRITES = {
+    'lock_retries': 3,
+    'lock_retry_delay': 0.5,  # segundos; dobra a cada tentativa
+}
+
+# Status dos jobs em tempo real (/api/jobs/events/, Server-Sent Events)
+AUTOMATION_EVENTS = {
+    'poll_interval': 0.5,  # segundos entre leituras de eventos novos (uma por processo, para todos os clientes)
+    'heartbeat': 15,  # segundos sem eventos até um comentário de keep-alive
+    'queue_size': 1000,  # eventos pendentes por cliente antes de desconectá-lo
+    'step_events': True,  # publicar início/fim de cada passo
+    'retention': 24 * 60 * 60,  # segundos até o worker apagar um evento
+}
+
 
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Portal de testes local (python manage.py run_fake_portal): quando definido, as automações
+# abrem as páginas dele em vez dos portais reais. Ex: AUTOMATION_FAKE_PORTAL_URL=http://127.0.0.1:8765
+AUTOMATION_FAKE_PORTAL_URL = os.environ.get('AUTOMATION_FAKE_PORTAL_URL') or None
+
+# Sobrescritas pontuais de URLS (automation_config), aplicadas por último
+AUTOMATION_URLS = {}
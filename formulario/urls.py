@@ -19,8 +19,9 @@ from django.urls import path, include
 from django.shortcuts import redirect
 from formulario2.views import (
     Formulario2APIView, Formulario2DetailAPIView,
-    FormularioAmilAPIView, FormularioAmilDetailAPIView
+    FormularioAmilAPIView, FormularioAmilDetailAPIView, FormularioBulkAPIView, job_events_view, metrics_view
 )
+from formulario2.forms import Formulario2Form, FormularioAmilForm
 
 def redirect_to_login(request):
     """Redireciona a URL raiz para a página de login"""
@@ -36,8 +37,17 @@ urlpatterns = [
     # API Endpoints - Formulario2 (Porto)
     path('api/porto/', Formulario2APIView.as_view(), name='formulario2_api'),
     path('api/porto/<int:pk>/', Formulario2DetailAPIView.as_view(), name='formulario2_detail_api'),
+    path('api/porto/bulk/', FormularioBulkAPIView.as_view(form_class=Formulario2Form), name='formulario2_bulk_api'),
     
     # API Endpoints - FormularioAmil
     path('api/amil/', FormularioAmilAPIView.as_view(), name='formulario_amil_api'),
     path('api/amil/<int:pk>/', FormularioAmilDetailAPIView.as_view(), name='formulario_amil_detail_api'),
+    path('api/amil/bulk/', FormularioBulkAPIView.as_view(form_class=FormularioAmilForm), name='formulario_amil_bulk_api'),
+    
+    # Status dos jobs em tempo real (Server-Sent Events)
+    path('api/jobs/events/', job_events_view, name='job_events'),
+    path('api/jobs/<int:pk>/events/', job_events_view, name='job_detail_events'),
+    
+    # Métricas (Prometheus)
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -1,8 +1,20 @@
+import re
+
 from django.contrib import admin
-from .models import Formulario2, FormularioAmil, AutomationLog
+from .models import Formulario2, FormularioAmil, AutomationLog, StepTimeout, LocatorStrategy, WorkerStatus, AutomationEvent
+
+class CpfSearchMixin:
+    """Busca por CPF completo (com ou sem máscara) pela coluna indexada ``cpf_digits``"""
+
+    def get_search_results(self, request, queryset, search_term):
+        if re.fullmatch(r'[\d.\- ]+', search_term.strip()):
+            digits = re.sub(r'\D', '', search_term)
+            if len(digits) == 11:
+                return queryset.filter(cpf_digits=digits), False
+        return super().get_search_results(request, queryset, search_term)
 
 @admin.register(Formulario2)
-class Formulario2Admin(admin.ModelAdmin):
+class Formulario2Admin(CpfSearchMixin, admin.ModelAdmin):
     list_display = ('nomeCompleto', 'email', 'cpf', 'telefone', 'genero', 'estadoCivil')
     list_filter = ('genero', 'estadoCivil', 'dataNascimento')
     search_fields = ('nomeCompleto', 'email', 'cpf', 'rg')
@@ -21,7 +33,7 @@ class Formulario2Admin(admin.ModelAdmin):
     )
 
 @admin.register(FormularioAmil)
-class FormularioAmilAdmin(admin.ModelAdmin):
+class FormularioAmilAdmin(CpfSearchMixin, admin.ModelAdmin):
     list_display = ('nome', 'cpf', 'plano', 'sexo', 'estado_civil', 'created_at')
     list_filter = ('sexo', 'estado_civil', 'nacionalidade', 'created_at')
     search_fields = ('nome', 'cpf', 'nome_cartao', 'plano')
@@ -48,21 +60,50 @@ class FormularioAmilAdmin(admin.ModelAdmin):
 
 @admin.register(AutomationLog)
 class AutomationLogAdmin(admin.ModelAdmin):
-    list_display = ('id', 'formulario', 'status', 'started_at', 'completed_at')
-    list_filter = ('status', 'started_at')
-    search_fields = ('formulario__nomeCompleto', 'formulario__email')
-    readonly_fields = ('id', 'started_at', 'completed_at')
+    list_display = ('id', 'portal', '__str__', 'status', 'attempts', 'worker_id', 'started_at', 'completed_at')
+    list_filter = ('portal', 'status', 'started_at')
+    search_fields = ('formulario__nomeCompleto', 'formulario__email', 'formulario_amil__nome')
+    readonly_fields = ('id', 'started_at', 'claimed_at', 'completed_at')
     
     fieldsets = (
         ('Informações Básicas', {
-            'fields': ('formulario', 'status', 'started_at', 'completed_at')
+            'fields': ('portal', 'formulario', 'formulario_amil', 'status', 'started_at', 'completed_at')
+        }),
+        ('Fila', {
+            'fields': ('claimed_at', 'worker_id', 'attempts'),
+            'classes': ('collapse',)
         }),
         ('Arquivos', {
             'fields': ('log_file_path', 'screenshot_path'),
             'classes': ('collapse',)
         }),
         ('Dados da Automação', {
-            'fields': ('automation_data', 'error_message'),
+            'fields': ('automation_data', 'steps', 'error_message'),
             'classes': ('collapse',)
         }),
     )
+
+@admin.register(StepTimeout)
+class StepTimeoutAdmin(admin.ModelAdmin):
+    list_display = ('step', 'timeout', 'p99', 'samples', 'updated_at')
+    search_fields = ('step',)
+    readonly_fields = ('updated_at',)
+
+@admin.register(LocatorStrategy)
+class LocatorStrategyAdmin(admin.ModelAdmin):
+    list_display = ('portal', 'page', 'field', 'by', 'value', 'misses', 'updated_at')
+    list_filter = ('portal', 'page')
+    search_fields = ('field', 'value')
+    readonly_fields = ('updated_at',)
+
+@admin.register(WorkerStatus)
+class WorkerStatusAdmin(admin.ModelAdmin):
+    list_display = ('worker_id', 'running', 'concurrency', 'processed', 'updated_at')
+    readonly_fields = ('worker_id', 'running', 'concurrency', 'driver_pools', 'processed', 'updated_at')
+
+@admin.register(AutomationEvent)
+class AutomationEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'job', 'portal', 'kind', 'status', 'step', 'created_at')
+    list_filter = ('portal', 'kind', 'status')
+    search_fields = ('step',)
+    readonly_fields = ('job', 'portal', 'kind', 'status', 'step', 'data', 'created_at')
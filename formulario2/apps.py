@@ -6,5 +6,6 @@ class Formulario2Config(AppConfig):
     name = 'formulario2'
     
     def ready(self):
-        """Registra os signals quando o app estiver pronto"""
-        import formulario2.signals
\ No newline at end of file
+        """Registra os signals e os system checks quando o app estiver pronto"""
+        import formulario2.signals
+        import formulario2.query_plans
@@ -7,12 +7,30 @@ URLS = {
     'formulario_list': 'http://127.0.0.1:8000/formulario2/',
     'automation_logs': 'http://127.0.0.1:8000/formulario2/automation-logs/',
     'api_viewer': 'http://127.0.0.1:8000/formulario2/api-viewer/',
-    'api_endpoint': 'http://127.0.0.1:8000/formulario2/api/',  # Endpoint da API
+    'api_endpoint': 'http://127.0.0.1:8000/api/porto/',  # Endpoint da API (formulários Porto)
     'admin': 'http://127.0.0.1:8000/admin/',
+    'api_amil': 'http://127.0.0.1:8000/api/amil/',  # Endpoint da API (formulários Amil)
     'porto_seguro_corretor': 'https://corretor.portoseguro.com.br/portal/site/corretoronline/template.LOGIN/',
-    'administracao_de_apolices': 'https://corretor.portoseguro.com.br/corretoronline/iframe?javax.portlet.ctx_iframe=url=https://wwws.portoseguro.com.br/react-spa-saud-pbko-administracao-de-apolices/?source=col%23%23document=BA6QXJ%23%23smsession=KoeVr%2BJ6b95SayUEzv%2FQTCyBebyHV9wItjHn4qn%2B0pjAVw2UcfOwREHSolWIMFPkUuw9OL5PSuP0ERZvd2SsDghzES%2FMZFFtbtuMtW1Gm0%2BxVaDd1erYzJbNDWAN2RX5gb5K95EOP%2B1qcBAMHLc29TG19OLQmN1T%2FuGwx0Ll5CNJ4EdqBteMqDQI%2FrSFqYo173UFS0%2FrCgjRL2q%2BmhtzZWNz%2BASkMNJtHM%2F6sQ%2BAvLtae8bK14mNXKebGqrLKh5Xc29g0quWS3smVGn54OW76NByjYfjoXTUki5gqoDNR6CZhEGlGJSJ%2BTa5d2uYtcT1tkEuxKzOeENSmY6EAhij%2BeY6aXcc8JQN6jtFdIU853Gx9UQ1zoJSdsyFNnyzFBcyYMHINAV63tMC%2F4w%2BvtP2aAgJjkC3%2FGR9Wnf2qpuXKR29YscGbcGoCROB8kt4uuWGmIrVeQ7GccT%2B4of6qqwvtq7j46YAsjzseNyOOeJBtOytQ3VOsBcJIwMy0GsDNmnDc6hNtQHTXXSfKRJUomxStJ%2BEH6NOdZF%2FveYAw4yF74xjMK2NW5Q2iJkosb8d%2BKSTSHTWvDku%2Fu2t%2FoVy39sc8dtDIFXn8gLY0%2BU%2F%2F6VpMXswN6MZ7PRgpJ%2BxlsZ0%2FXIj6qWTis7n8ovAPbrUyupxCWLRgTWxvAqC1LjH0vh131nYtAxO%2BiGVxYjXZhw5Okxj%2FbdjAzGN76ekOIbGnCzRQi02XM1x9qEGaBMDq26awxFalq6gtbza1gwWMfAplB2C2YV9zIv2A8BKIVpdryPw34SoIKP8gn1TgF5Wh9mwdjn1JW5dGf2mHzCBjBUADoGv27ARwx6YlckKnXrEQJvKYbNiwSQO1go1z8DAfrAdDDF5cc8WWfsc8FESgPib%2Bn18SmE9Pi234l%2FegfHSd0XlDDhy8Ob33mpzDBGySRu17EIO3%2FCIT6ISUmFn735gY%2BgBPwFQX9uu7trPQJsyJttCXtcQNDQgRGSt0GMkSgYzZCXAntPz0ERiBVKOaUv8BX%2FieYHmsGgd5cViq4zZ3TISROipwn%2FbMem0QDR2HStWscdaBDHMbJvz9cpEvKXH%2FqHo%2FEHotBIKW1ILzz4TLbpJcxo6RAvmhoLE%2FH%2F8unZEIj1uWFAlwMu1t0eabrESmuzhpdAebz9EjwIRWn0dAj%2FpJgVOzqhp1%2BeH',
+    'porto_home': 'https://corretor.portoseguro.com.br/corretoronline/',
+    'amil_login': 'https://www.amil.com.br/empresa/#/login',
+    'amil_home': 'https://www.amil.com.br/empresa/#/',
+    'administracao_de_apolices': 'https://corretor.portoseguro.com.br/corretoronline/iframe?javax.portlet.ctx_iframe=url=https://wwws.portoseguro.com.br/react-spa-saud-pbko-administracao-de-apolices/?source=col%23%23document=BA6QXJ%23%23smsession=Vxx%2FB1ekUiER1f3pzT86I0rumx6Yi3ZOthEFk74STFIwbKfiUnsLnZ5iBh71DnRLkoXHkMT4oJvaLwHNWvg2YB%2Bm2WRADW4X3u1VYCvgXVKtQl7iO5S9uQfZxKs04G8Q9zQhAfgHTA2aLQRwRMQcZOAFzqZOmGADu6j0PLW2SaUOAP%2FYEhASuSlrDikYVtWFCXHnXZkM0DHBhwnjfpzjsXbbuUFoa3p2pwi%2B8fJW3415xFk8CEdjOo%2BVl2rowkuWLWBNH6vroNZIUsP%2BgD5a0GDNp4ffWgtftYPoiM5sYdVXonXc4Tc0D4r7JRPmf3b6ZysOwfrVkh%2BqA8FSfhrKdzGihpV8apNi8Z1EEqg6kZxObGZ5o25R%2Fja8q8klvsWJUJa5JXyu8kRKIXOAI88SrMGtvtbB3MTpIrIsR6dZqB4U4gb7kzt89N1U1M92QHLKjsegQnAH5Z99W5UG009GRQ35vk7jymU9B6IK4ATFoxzbkGc8ugAdoCTu%2F2orglxNBpotw0PEo1wPXBegpxkur%2FIPd5e%2FyCRjez0uOG%2F9xI4dvUv%2BhroeNkj4ftqEL930F0fUsRdFMLN0%2Bbo2SSRCfV7PCXv17%2FZbCqg2Ftf9bDSSWJ%2BQYEmvfFr1sUJoKTLnnZYVHnwsbhxqysl1pYxDk85kGEZPu%2B3Onjdg0yP60YUm0Id6OttCCUUoD9v5Mn0cPz32kIwlXwwSA6TpPXcrm0N7mNHXXWlzmsqOZ6FX7ucDwzcCCZ49c9HJFLLOkBUcB0oGF7BPJqaxs4oBDLEao4aZcGrwXs4ATlA63Xn1Z9%2B7uk26k8shmmwnBw0kbdEQUDnoT0mwhhv1HJsSpvclAcyE1TKOJ4GvkjZ7dXR4YVwH0mirN%2BCzjPKWhgWpHOfWoF6uUmZkMWleoOu8lcMTl1UY6ldRlaMgrl2GJfsryUntD97K0q28w%2FhZy7ztMiWQ94C9oyStqIbCkyjAo6S1vgLm0Tfg%2F87WPpRh5Z%2FcodPLfgOiKhcIx1l73PKPgPD3gWxV5YDbDvk3HvIGyWSZtJPwSO6zIIcfuC8AZCoRUbAzp2DINRQNbm%2F33kNz%2F8Swcaf0XtQZv7%2Bo73LQiKOgrSuurKa5w%2BPIIOkwTHZxIqQj6s7sJPU1U7o6QIfqfhuhEKN951tkhqgU3JWdl8Qp1Ub%2FT6gevlb5',
 }
 
+
+def _apply_url_overrides():
+    """Portal de testes (``AUTOMATION_FAKE_PORTAL_URL``) e ``AUTOMATION_URLS`` dos settings sobre as URLs acima"""
+    from django.conf import settings
+
+    fake_portal_url = getattr(settings, 'AUTOMATION_FAKE_PORTAL_URL', None)
+    if fake_portal_url:
+        from .fake_portal import portal_urls
+        URLS.update(portal_urls(fake_portal_url))
+    URLS.update(getattr(settings, 'AUTOMATION_URLS', None) or {})
+
+
+_apply_url_overrides()
+
 # Configurações do Chrome
 CHROME_OPTIONS = {
     'headless': False,  # False para manter o navegador aberto
@@ -22,12 +40,15 @@ CHROME_OPTIONS = {
     'disable_gpu': True,
 }
 
-# Configurações de tempo (em segundos)
+# Tempos máximos de espera (em segundos) - cada passo segue assim que a condição é atendida
 TIMING = {
-    'page_load_wait': 3,
-    'element_wait': 10,
-    'form_fill_delay': 2,
-    'navigation_delay': 2,
+    'page_load': 30,  # document.readyState completo após navegar
+    'element': 15,  # elemento presente/clicável
+    'navigation': 30,  # mudança de URL após login/clique
+    'settle': 5,  # valor do campo, foco ou spinners estabilizarem após uma ação
+    'network_idle': 10,  # requisições da página terminarem
+    'poll_interval': 0.1,  # intervalo entre verificações
+    'element_wait': 0,  # implicitly_wait do driver: 0 - as esperas são explícitas e com tempo por passo
 }
 
 # Configurações de screenshots
@@ -41,7 +62,8 @@ SCREENSHOT = {
 LOGGING = {
     'enabled': True,
     'directory': 'logs',
-    'level': 'INFO',
+    'level': 'INFO',  # DEBUG inclui payloads da API e listagens de campos/opções
+    'format': 'json',  # 'json' (uma linha JSON por registro) ou 'text'
 }
 
 # Comportamentos da automação
@@ -51,10 +73,40 @@ BEHAVIOR = {
     'take_screenshots': True,  # Tirar screenshots
     'submit_form': False,  # Não submeter o formulário automaticamente
     'close_browser': False,  # Não fechar o navegador ao finalizar
-    'fetch_last_api_object': True,  # Buscar último objeto da API
+    'fetch_last_api_object': True,  # Registrar em logs/ o formulário do job (Porto)
+    'fetch_record_via_api': False,  # Buscar o formulário do job pela API (/api/<portal>/<id>/) em vez do banco
     'open_porto_seguro': True,  # Abrir Corretor Online da Porto Seguro
     'click_porto_button': True,  # Clicar no botão específico da Porto Seguro
     'do_login': True,  # Fazer login na Porto Seguro
+    'reuse_session': True,  # Reaproveitar a sessão (cookies) do último login em vez de logar de novo
+    'batch_fill': True,  # Preencher o formulário Amil em uma única chamada ao navegador (teclado só para campos rejeitados)
+}
+
+# Contas de acesso aos portais
+PORTAL_ACCOUNTS = {
+    'porto': {
+        'login': '140.552.248-85',
+        'senha': 'Shaddai2025!',
+        'susep': 'BA6QXJ (P)',
+    },
+    'amil': {
+        'login': 'G2517723',
+        'senha': 'Netza240@',
+    },
+}
+
+# Verificação de sessão: página aberta com os cookies salvos e elemento que só aparece logado
+SESSION_CHECKS = {
+    'porto': {
+        'url': URLS['porto_home'],
+        'logged_in_xpath': '//*[@id="favorites"]',
+        'timeout': 8,
+    },
+    'amil': {
+        'url': URLS['amil_home'],
+        'logged_in_xpath': '//*[@id="app"]/div[2]/div[1]/div/div[3]/div[2]/nav',
+        'timeout': 8,
+    },
 }
 
 # Dados de teste (usado se não houver dados do formulário)
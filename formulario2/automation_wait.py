@@ -6,11 +6,10 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from django.conf import settings
 from .models import AutomationLog
+from .chromedriver import chrome_service
 from .automation_config import URLS, CHROME_OPTIONS, TIMING, SCREENSHOT, LOGGING, BEHAVIOR, TEST_DATA
 import os
 
@@ -41,7 +40,7 @@ class FormularioAutomation:
             if CHROME_OPTIONS.get('headless'):
                 chrome_options.add_argument("--headless")
             
-            service = Service(ChromeDriverManager().install())
+            service = chrome_service()
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
             self.driver.implicitly_wait(TIMING.get('element_wait', 10))
             logger.info("Driver do Chrome configurado com sucesso")
@@ -0,0 +1,234 @@
+"""
+Benchmark de throughput das automações (``python manage.py bench_automation``).
+
+Cria N formulários de teste, enfileira um job para cada um e os processa com
+o mesmo ``AutomationWorkerPool`` do worker, normalmente contra o portal de
+testes (``fake_portal``). O relatório traz jobs por minuto, percentis da
+duração dos jobs e de cada passo (``AutomationLog.steps``), pico de memória
+(processo + Chrome) e de processos do Chrome, além do commit e da
+configuração usados — dois relatórios da mesma configuração são comparáveis
+entre commits (``compare_reports``).
+"""
+import logging
+import os
+import subprocess
+import threading
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .jobs import enqueue_automation
+from .models import AutomationLog, Formulario2, FormularioAmil
+from .step_timeouts import percentile
+
+logger = logging.getLogger(__name__)
+
+BENCH_NAME_PREFIX = 'Benchmark'
+
+
+class ResourceSampler:
+    """Amostra em segundo plano a memória (RSS) do processo e de seus filhos e quantos processos do Chrome existem"""
+
+    def __init__(self, interval=0.5):
+        self.interval = interval
+        self.peak_rss_mb = None
+        self.peak_chrome_processes = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        try:
+            import psutil
+        except ImportError:
+            return
+
+        process = psutil.Process(os.getpid())
+        rss = 0
+        chrome = 0
+        for proc in [process] + process.children(recursive=True):
+            try:
+                rss += proc.memory_info().rss
+                if 'chrom' in proc.name().lower():
+                    chrome += 1
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+
+        rss_mb = round(rss / (1024 * 1024), 1)
+        self.peak_rss_mb = max(self.peak_rss_mb or 0, rss_mb)
+        self.peak_chrome_processes = max(self.peak_chrome_processes or 0, chrome)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self.sample()
+        self._thread = threading.Thread(target=self._loop, name='bench-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+        self.sample()
+
+
+def current_commit():
+    """Commit atual do repositório (com ``-dirty`` se houver alterações) ou None fora de um checkout git"""
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=10, check=True,
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def create_bench_jobs(portal, count):
+    """Cria ``count`` formulários de teste (sem disparar os signals) e enfileira um job para cada; devolve os formulários"""
+    today = date.today()
+    if portal == 'amil':
+        forms = FormularioAmil.objects.bulk_create([
+            FormularioAmil(
+                nome=f'{BENCH_NAME_PREFIX} {i}',
+                cpf=f'{i:011d}',
+                nome_cartao=f'{BENCH_NAME_PREFIX.upper()} {i}',
+                data_inclusao=today,
+                data_registro=today,
+                data_nascimento=today - timedelta(days=365 * 30),
+                sexo='M',
+                nome_mae='Maria Benchmark',
+                estado_civil='S',
+                plano='Plano Benchmark',
+                nacionalidade='B',
+            )
+            for i in range(1, count + 1)
+        ])
+    else:
+        forms = Formulario2.objects.bulk_create([
+            Formulario2(
+                nomeCompleto=f'{BENCH_NAME_PREFIX} {i}',
+                dataNascimento=today - timedelta(days=365 * 30),
+                genero='M',
+                rg=f'{i:09d}',
+                cpf=f'{i:011d}',
+                orgaoEmissor='SSP',
+                dataEmissao=today - timedelta(days=365),
+                estadoCivil='S',
+                telefone='11999999999',
+                email=f'benchmark{i}@example.com',
+                nomeMae='Maria Benchmark',
+            )
+            for i in range(1, count + 1)
+        ])
+    for formulario in forms:
+        enqueue_automation(formulario)
+    return forms
+
+
+def summarize(values):
+    """p50/p95/p99, média e máximo (segundos) de uma lista de durações"""
+    if not values:
+        return {'count': 0, 'p50': None, 'p95': None, 'p99': None, 'mean': None, 'max': None}
+    return {
+        'count': len(values),
+        'p50': percentile(values, 50),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'mean': round(sum(values) / len(values), 3),
+        'max': max(values),
+    }
+
+
+def build_report(log_ids, wall_seconds, config, sampler):
+    """Relatório (dict serializável em JSON) dos jobs ``log_ids``"""
+    logs = AutomationLog.objects.filter(pk__in=log_ids).values_list('status', 'claimed_at', 'completed_at', 'steps')
+
+    statuses = defaultdict(int)
+    job_durations = []
+    step_durations = defaultdict(list)
+    step_outcomes = defaultdict(lambda: {'failed': 0, 'error': 0, 'retries': 0})
+    for status, claimed_at, completed_at, steps in logs:
+        statuses[status] += 1
+        if claimed_at and completed_at:
+            job_durations.append(round((completed_at - claimed_at).total_seconds(), 3))
+        for record in steps or []:
+            name = record['name']
+            if record.get('duration') is not None:
+                step_durations[name].append(record['duration'])
+            if record.get('outcome') in ('failed', 'error'):
+                step_outcomes[name][record['outcome']] += 1
+            step_outcomes[name]['retries'] += record.get('retries') or 0
+
+    completed = statuses.get('completed', 0)
+    return {
+        'commit': current_commit(),
+        'created_at': timezone.now().isoformat(),
+        'config': config,
+        'jobs': {'total': len(log_ids), **dict(statuses)},
+        'wall_seconds': round(wall_seconds, 3),
+        'jobs_per_minute': round(completed * 60 / wall_seconds, 3) if wall_seconds else None,
+        'job_duration': summarize(job_durations),
+        'steps': {
+            name: {**summarize(durations), **step_outcomes[name]}
+            for name, durations in sorted(step_durations.items())
+        },
+        'resources': {
+            'peak_rss_mb': sampler.peak_rss_mb,
+            'peak_chrome_processes': sampler.peak_chrome_processes,
+        },
+    }
+
+
+def compare_reports(report, baseline):
+    """
+    Variações relevantes entre ``report`` e ``baseline``: jobs por minuto e o
+    p95 do job e de cada passo. Devolve ``[(métrica, antes, depois, variação %)]``,
+    com a variação positiva quando o resultado piorou.
+    """
+    rows = []
+
+    def add(metric, before, after, higher_is_better=False):
+        if before in (None, 0) or after is None:
+            return
+        change = (after - before) / before * 100
+        rows.append((metric, before, after, round(-change if higher_is_better else change, 1)))
+
+    add('jobs_per_minute', baseline.get('jobs_per_minute'), report.get('jobs_per_minute'), higher_is_better=True)
+    add('job_duration.p95', baseline.get('job_duration', {}).get('p95'), report['job_duration']['p95'])
+    for name, stats in report['steps'].items():
+        before = baseline.get('steps', {}).get(name)
+        if before:
+            add(f'{name}.p95', before.get('p95'), stats['p95'])
+    return rows
+
+
+def format_summary(report):
+    """Resumo legível do relatório (linhas de texto)"""
+    config = report['config']
+    jobs = report['jobs']
+    duration = report['job_duration']
+    resources = report['resources']
+
+    lines = [
+        f"📊 {config['portal']}: {jobs['total']} job(s), concorrência {config['concurrency']}, "
+        f"pool {'ligado' if config['driver_pool'] else 'desligado'}, "
+        f"sessão {'reaproveitada' if config['reuse_session'] else 'nova a cada job'}, "
+        f"{'headless' if config['headless'] else 'com janela'} (commit {report['commit'] or '?'})",
+        f"   ✅ {jobs.get('completed', 0)} concluído(s), ❌ {jobs.get('failed', 0)} falho(s) em {report['wall_seconds']}s "
+        f"→ {report['jobs_per_minute']} jobs/min",
+        f"   ⏱️ job: p50 {duration['p50']}s, p95 {duration['p95']}s, p99 {duration['p99']}s",
+        f"   🧠 pico de memória: {resources['peak_rss_mb'] if resources['peak_rss_mb'] is not None else '? (sem psutil)'} MB, "
+        f"processos do Chrome: {resources['peak_chrome_processes'] if resources['peak_chrome_processes'] is not None else '?'}",
+    ]
+    if report['steps']:
+        width = max(len(name) for name in report['steps'])
+        lines.append(f"   {'passo'.ljust(width)}  {'n':>4}  {'p50':>7}  {'p95':>7}  {'p99':>7}  falhas  retentativas")
+        for name, stats in report['steps'].items():
+            lines.append(
+                f"   {name.ljust(width)}  {stats['count']:>4}  {stats['p50']:>7}  {stats['p95']:>7}  {stats['p99']:>7}  "
+                f"{stats['failed'] + stats['error']:>6}  {stats['retries']:>12}"
+            )
+    return lines
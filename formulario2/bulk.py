@@ -0,0 +1,74 @@
+"""
+Cadastro em lote pelas APIs (``POST /api/porto/bulk/``, ``POST /api/amil/bulk/``).
+
+O corpo é um array JSON ou NDJSON (``application/x-ndjson``, um objeto por
+linha). Cada item é validado pelo mesmo ModelForm das telas de cadastro; os
+válidos são inseridos com um único ``bulk_create`` e os jobs de automação
+criados na mesma transação (``bulk_create`` não dispara o ``post_save``, então
+os signals não enfileiram nada aqui). Itens inválidos não impedem os demais e
+voltam com os erros de cada campo.
+"""
+import json
+
+from django.db import transaction
+
+from .jobs import enqueue_automations
+
+MAX_BULK_ITEMS = 1000
+
+
+class BulkError(ValueError):
+    """Corpo da requisição inválido (a view responde 400)"""
+
+
+def parse_items(request):
+    """Itens do corpo da requisição (array JSON ou NDJSON)"""
+    try:
+        body = request.body.decode('utf-8')
+        if request.content_type == 'application/x-ndjson':
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = json.loads(body)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise BulkError('JSON inválido')
+
+    if not isinstance(items, list):
+        raise BulkError('O corpo deve ser um array JSON ou NDJSON')
+    if not items:
+        raise BulkError('Nenhum item informado')
+    if len(items) > MAX_BULK_ITEMS:
+        raise BulkError(f'Máximo de {MAX_BULK_ITEMS} itens por requisição')
+    return items
+
+
+def create_in_bulk(form_class, items):
+    """
+    Valida ``items`` com ``form_class`` e cria os válidos, com os seus jobs,
+    em uma transação. Retorna o resultado de cada item, na ordem recebida:
+    ``{'index', 'success', 'id'}`` ou ``{'index', 'success', 'errors'}``.
+    """
+    results = []
+    instances = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            results.append({'index': index, 'success': False, 'errors': {'__all__': ['O item deve ser um objeto JSON']}})
+            continue
+        form = form_class(data=item)
+        if form.is_valid():
+            instances.append(form.save(commit=False))
+            results.append({'index': index, 'success': True, 'id': None})
+        else:
+            results.append({'index': index, 'success': False, 'errors': {field: list(errors) for field, errors in form.errors.items()}})
+
+    if instances:
+        model = form_class._meta.model
+        with transaction.atomic():
+            created = model.objects.bulk_create(instances)
+            enqueue_automations(created)
+
+        # Os ids voltam na mesma ordem dos itens válidos
+        ids = iter(formulario.id for formulario in created)
+        for result in results:
+            if result['success']:
+                result['id'] = next(ids)
+    return results
@@ -0,0 +1,167 @@
+"""
+Resolução do executável do chromedriver.
+
+``ChromeDriverManager().install()`` consulta a internet e o sistema de arquivos
+a cada chamada e falha em máquinas sem acesso externo. Aqui o caminho é
+resolvido uma única vez por processo, nesta ordem:
+
+1. ``settings.AUTOMATION_CHROMEDRIVER_PATH`` (ou a variável de ambiente
+   ``CHROMEDRIVER_PATH``): driver pré-instalado, nenhum acesso à rede;
+2. cache local ``<cache>/<versão do Chrome>/chromedriver`` (``<cache>/unknown/``
+   quando a versão do Chrome não pode ser lida);
+3. download via webdriver-manager, copiado para o cache local — desativado
+   com ``AUTOMATION_CHROMEDRIVER_OFFLINE = True``.
+"""
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+CHROME_BINARIES = [
+    'google-chrome',
+    'google-chrome-stable',
+    'chromium',
+    'chromium-browser',
+    'chrome',
+    r'C:\Program Files\Google\Chrome\Application\chrome.exe',
+    r'C:\Program Files (x86)\Google\Chrome\Application\chrome.exe',
+    '/Applications/Google Chrome.app/Contents/MacOS/Google Chrome',
+]
+
+DRIVER_NAME = 'chromedriver.exe' if sys.platform.startswith('win') else 'chromedriver'
+
+# Diretório do cache para drivers baixados sem conhecer a versão do Chrome
+UNKNOWN_VERSION = 'unknown'
+
+_resolved_path = None
+_resolve_lock = threading.Lock()
+
+
+class ChromeDriverNotFound(Exception):
+    """Nenhum chromedriver disponível sem acesso à rede"""
+
+
+def _setting(name, env_var=None, default=None):
+    """Lê uma configuração do Django (se configurado) ou da variável de ambiente"""
+    if env_var and os.environ.get(env_var):
+        return os.environ[env_var]
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        # Scripts avulsos (ex: teste_automacao.py) rodam sem Django configurado
+        return default
+
+
+def _default_cache_dir():
+    try:
+        from django.conf import settings
+        return Path(settings.BASE_DIR) / '.chromedriver'
+    except Exception:
+        return Path.cwd() / '.chromedriver'
+
+
+def detect_chrome_version():
+    """Versão do Chrome instalado (ex: '126.0.6478.126') ou None"""
+    binary = _setting('AUTOMATION_CHROME_BINARY', 'CHROME_BINARY')
+    candidates = [binary] if binary else CHROME_BINARIES
+
+    for candidate in candidates:
+        executable = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if not executable:
+            continue
+        try:
+            output = subprocess.run(
+                [executable, '--version'], capture_output=True, text=True, timeout=10
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r'(\d+\.\d+\.\d+\.\d+)', output)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _cached_driver(cache_dir, chrome_version):
+    """Driver do cache para a versão exata ou, na falta dela, para a mesma versão major"""
+    if not chrome_version:
+        unknown = cache_dir / UNKNOWN_VERSION / DRIVER_NAME
+        return unknown if unknown.is_file() else None
+
+    exact = cache_dir / chrome_version / DRIVER_NAME
+    if exact.is_file():
+        return exact
+
+    major = chrome_version.split('.')[0]
+    if cache_dir.is_dir():
+        for version_dir in sorted(cache_dir.iterdir(), reverse=True):
+            candidate = version_dir / DRIVER_NAME
+            if version_dir.name.split('.')[0] == major and candidate.is_file():
+                return candidate
+    return None
+
+
+def _download_to_cache(cache_dir, chrome_version):
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    logger.info(f"⬇️ Baixando chromedriver para o Chrome {chrome_version or '(versão desconhecida)'}...")
+    downloaded = Path(ChromeDriverManager().install())
+
+    target_dir = cache_dir / (chrome_version or UNKNOWN_VERSION)
+    target_dir.mkdir(parents=True, exist_ok=True)
+    target = target_dir / DRIVER_NAME
+    shutil.copy2(downloaded, target)
+    target.chmod(0o755)
+    return target
+
+
+def resolve_chromedriver_path():
+    """Caminho do chromedriver, resolvido uma vez por processo"""
+    global _resolved_path
+    if _resolved_path:
+        return _resolved_path
+
+    with _resolve_lock:
+        if _resolved_path:
+            return _resolved_path
+
+        explicit = _setting('AUTOMATION_CHROMEDRIVER_PATH', 'CHROMEDRIVER_PATH')
+        if explicit:
+            if not os.path.isfile(explicit):
+                raise ChromeDriverNotFound(f"AUTOMATION_CHROMEDRIVER_PATH não existe: {explicit}")
+            _resolved_path = str(explicit)
+            logger.info(f"🔧 Usando chromedriver configurado: {_resolved_path}")
+            return _resolved_path
+
+        cache_dir = Path(_setting('AUTOMATION_CHROMEDRIVER_CACHE_DIR', 'CHROMEDRIVER_CACHE_DIR') or _default_cache_dir())
+        chrome_version = detect_chrome_version()
+
+        cached = _cached_driver(cache_dir, chrome_version)
+        if cached:
+            _resolved_path = str(cached)
+            logger.info(f"🔧 Usando chromedriver do cache: {_resolved_path}")
+            return _resolved_path
+
+        offline = _setting('AUTOMATION_CHROMEDRIVER_OFFLINE', 'CHROMEDRIVER_OFFLINE', False)
+        if offline and str(offline).lower() not in ('0', 'false', 'no'):
+            raise ChromeDriverNotFound(
+                f"Nenhum chromedriver em cache para o Chrome {chrome_version or '(versão desconhecida)'} em {cache_dir} "
+                f"e o download está desativado (AUTOMATION_CHROMEDRIVER_OFFLINE). "
+                f"Defina AUTOMATION_CHROMEDRIVER_PATH ou copie o driver para {cache_dir / (chrome_version or UNKNOWN_VERSION)}/"
+            )
+
+        _resolved_path = str(_download_to_cache(cache_dir, chrome_version))
+        logger.info(f"🔧 chromedriver salvo no cache: {_resolved_path}")
+        return _resolved_path
+
+
+def chrome_service():
+    """``Service`` do Selenium apontando para o chromedriver resolvido"""
+    from selenium.webdriver.chrome.service import Service
+    return Service(resolve_chromedriver_path())
@@ -0,0 +1,74 @@
+"""
+GET condicional (ETag / Last-Modified) nas APIs de formulários.
+
+Os painéis consultam as APIs o tempo todo, mas os dados mudam poucas vezes
+por hora. O estado de cada tabela — ``max(updated_at)`` e ``count`` — sai de
+uma única consulta agregada; se o cliente já tem essa versão
+(``If-None-Match`` / ``If-Modified-Since``) a resposta é ``304 Not Modified``
+sem ler nem serializar nenhum registro.
+
+Inserções mudam o total e o ``updated_at`` máximo, edições mudam o
+``updated_at`` e exclusões mudam o total. O ETag inclui a query string, já
+que cada página, limite, formato ou seleção de campos é uma representação
+diferente.
+
+As listagens respondem só com ETag: uma exclusão não muda o ``updated_at``
+máximo, então um ``Last-Modified`` da tabela faria ``If-Modified-Since``
+devolver 304 com dados desatualizados. Os detalhes (um registro) têm os dois.
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+
+def _list_state(request, model):
+    """``(total, último updated_at)`` da tabela, calculado uma vez por requisição"""
+    cache = request.__dict__.setdefault('_table_state', {})
+    if model not in cache:
+        state = model.objects.aggregate(count=Count('id'), last_modified=Max('updated_at'))
+        cache[model] = (state['count'], state['last_modified'])
+    return cache[model]
+
+
+def _detail_state(request, model, pk):
+    """``updated_at`` do registro ``pk`` (None se não existir), calculado uma vez por requisição"""
+    cache = request.__dict__.setdefault('_row_state', {})
+    if (model, pk) not in cache:
+        cache[(model, pk)] = model.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    return cache[(model, pk)]
+
+
+def _etag(*parts):
+    return hashlib.md5('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+
+def conditional_list(model):
+    """Decorator do ``get`` das listagens: ETag pelo estado da tabela (sem Last-Modified, ver acima)"""
+    def etag(request, *args, **kwargs):
+        count, last_modified = _list_state(request, model)
+        return _etag(model._meta.label, count, last_modified and last_modified.isoformat(), request.GET.urlencode())
+
+    return _conditional(etag)
+
+
+def conditional_detail(model):
+    """Decorator do ``get`` de um registro: ETag/Last-Modified pelo ``updated_at`` do registro"""
+    def etag(request, pk, *args, **kwargs):
+        updated_at = _detail_state(request, model, pk)
+        return _etag(model._meta.label, pk, updated_at.isoformat(), request.GET.urlencode()) if updated_at else None
+
+    def last_modified(request, pk, *args, **kwargs):
+        return _detail_state(request, model, pk)
+
+    return _conditional(etag, last_modified)
+
+
+def _conditional(etag, last_modified=None):
+    # no-cache: o navegador guarda a resposta mas sempre revalida (e recebe 304 se nada mudou)
+    def decorator(view_method):
+        view_method = method_decorator(condition(etag_func=etag, last_modified_func=last_modified))(view_method)
+        return method_decorator(cache_control(private=True, no_cache=True))(view_method)
+    return decorator
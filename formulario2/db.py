@@ -0,0 +1,65 @@
+"""
+Escritas curtas no SQLite com vários workers.
+
+O SQLite aceita um escritor por vez. Com ``journal_mode=WAL`` (``DATABASES``
+em settings.py) leitores e escritor não se bloqueiam, e o ``timeout`` faz cada
+conexão esperar a vez em vez de falhar na hora com ``database is locked``.
+``transaction_mode='IMMEDIATE'`` reserva a escrita já no ``BEGIN`` dos blocos
+``atomic``, que assim também esperam o timeout em vez de falhar ao tentar
+promover uma leitura a escrita.
+
+Para que a espera seja curta, as atualizações de status e de passo dos jobs
+seguram o lock o mínimo possível: ``update_instance`` grava só as colunas
+alteradas, em um único UPDATE fora de transação, e tenta de novo se o banco
+continuar ocupado depois do timeout (``retry_on_locked``).
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_WRITES_CONFIG = {
+    'lock_retries': 3,  # novas tentativas de uma escrita que encontrou o banco ocupado
+    'lock_retry_delay': 0.5,  # segundos antes da primeira nova tentativa (dobra a cada uma)
+}
+
+
+def get_db_writes_config():
+    config = dict(DEFAULT_DB_WRITES_CONFIG)
+    config.update(getattr(settings, 'AUTOMATION_DB_WRITES', {}))
+    return config
+
+
+def is_locked_error(exc):
+    """``database is locked`` / ``database table is locked`` do SQLite"""
+    return isinstance(exc, OperationalError) and 'locked' in str(exc)
+
+
+def retry_on_locked(func, *args, **kwargs):
+    """
+    Executa ``func`` repetindo enquanto o banco estiver ocupado.
+
+    Dentro de um bloco ``atomic`` não repete: a transação inteira precisa ser
+    refeita por quem a abriu.
+    """
+    config = get_db_writes_config()
+    delay = config['lock_retry_delay']
+    for attempt in range(config['lock_retries'] + 1):
+        try:
+            return func(*args, **kwargs)
+        except OperationalError as e:
+            if not is_locked_error(e) or connection.in_atomic_block or attempt == config['lock_retries']:
+                raise
+            logger.warning(f"⏳ Banco ocupado, nova tentativa em {delay}s ({attempt + 1}/{config['lock_retries']})")
+            time.sleep(delay)
+            delay *= 2
+
+
+def update_instance(instance, **values):
+    """Atribui ``values`` em ``instance`` e grava só essas colunas (um UPDATE); retorna as linhas afetadas"""
+    for field, value in values.items():
+        setattr(instance, field, value)
+    return retry_on_locked(type(instance)._default_manager.filter(pk=instance.pk).update, **values)
@@ -0,0 +1,273 @@
+"""
+Pool de navegadores (WebDriver) pré-inicializados.
+
+Abrir um ``webdriver.Chrome`` leva de 3 a 8 segundos e gera um pico de
+memória. O pool mantém alguns navegadores prontos por portal, entrega um para
+cada job e, na devolução, limpa o estado (cookies, abas, storage) para o
+próximo job. Um navegador é reciclado (fechado e substituído) depois de
+``max_uses`` jobs ou quando a memória (RSS) do Chrome passa de ``max_rss_mb``.
+
+Configuração em ``settings.AUTOMATION_DRIVER_POOL``; o pool é usado apenas
+pelo worker da fila (``run_automation_worker``).
+"""
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from .automation_config import CHROME_OPTIONS
+from .chromedriver import chrome_service
+from .waits import install_quiescence_probe
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_CONFIG = {
+    'enabled': True,
+    'size': {'porto': 1, 'amil': 1},  # navegadores ociosos mantidos prontos por portal
+    'max_uses': 20,  # jobs por navegador antes de reciclar
+    'max_rss_mb': 1500,  # memória do Chrome (processo + filhos) antes de reciclar
+    'reset': ['cookies', 'tabs', 'storage'],  # o que limpar na devolução
+}
+
+
+def get_pool_config():
+    config = dict(DEFAULT_POOL_CONFIG)
+    config.update(getattr(settings, 'AUTOMATION_DRIVER_POOL', {}))
+    return config
+
+
+def build_chrome_options(portal):
+    """Opções do Chrome usadas por cada portal"""
+    chrome_options = Options()
+
+    if portal == 'amil':
+        chrome_options.add_argument("--start-maximized")  # Maximizar janela
+        chrome_options.add_argument("--disable-blink-features=AutomationControlled")  # Evitar detecção
+        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        chrome_options.add_experimental_option('useAutomationExtension', False)
+        if CHROME_OPTIONS.get('headless'):
+            chrome_options.add_argument("--headless")
+        return chrome_options
+
+    if CHROME_OPTIONS.get('no_sandbox'):
+        chrome_options.add_argument("--no-sandbox")
+    if CHROME_OPTIONS.get('disable_dev_shm_usage'):
+        chrome_options.add_argument("--disable-dev-shm-usage")
+    if CHROME_OPTIONS.get('disable_gpu'):
+        chrome_options.add_argument("--disable-gpu")
+    if CHROME_OPTIONS.get('window_size'):
+        chrome_options.add_argument(f"--window-size={CHROME_OPTIONS['window_size']}")
+    if CHROME_OPTIONS.get('headless'):
+        chrome_options.add_argument("--headless")
+    return chrome_options
+
+
+def create_driver(portal):
+    """Inicia um novo navegador Chrome configurado para o portal"""
+    driver = webdriver.Chrome(service=chrome_service(), options=build_chrome_options(portal))
+    # Probe de DOM/rede usado por waits.quiescent em todas as páginas abertas por este navegador
+    install_quiescence_probe(driver)
+    return driver
+
+
+def driver_rss_mb(driver):
+    """Memória residente (MB) do chromedriver e de todos os processos do Chrome, ou None sem psutil"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        total = 0
+        for proc in processes:
+            try:
+                total += proc.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return total / (1024 * 1024)
+    except Exception:
+        return None
+
+
+class DriverPool:
+    """Pool de navegadores de um portal"""
+
+    def __init__(self, portal, size=1, max_uses=20, max_rss_mb=1500, reset=('cookies', 'tabs', 'storage')):
+        self.portal = portal
+        self.size = size
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.reset_items = set(reset or ())
+        self._idle = queue.LifoQueue()
+        self._uses = {}
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._closed = False
+
+    @property
+    def stats(self):
+        with self._lock:
+            return {'portal': self.portal, 'idle': self._idle.qsize(), 'in_use': self._in_use, 'size': self.size}
+
+    def warm(self, background=True):
+        """Completa o número de navegadores ociosos até ``size``"""
+        if background:
+            threading.Thread(target=self.warm, kwargs={'background': False}, daemon=True,
+                             name=f'driver-pool-warm-{self.portal}').start()
+            return
+
+        while not self._closed and self._idle.qsize() < self.size:
+            try:
+                driver = self._launch()
+            except Exception as e:
+                logger.error(f"❌ Erro ao pré-inicializar navegador ({self.portal}): {e}")
+                return
+            self._idle.put(driver)
+            logger.info(f"🔥 Navegador pré-inicializado ({self.portal}) - {self._idle.qsize()}/{self.size} prontos")
+
+    def _launch(self):
+        driver = create_driver(self.portal)
+        with self._lock:
+            self._uses[id(driver)] = 0
+        return driver
+
+    def _is_alive(self, driver):
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def acquire(self):
+        """Entrega um navegador pronto (ou inicia um novo se não houver ocioso)"""
+        driver = None
+        while driver is None:
+            try:
+                candidate = self._idle.get_nowait()
+            except queue.Empty:
+                driver = self._launch()
+                break
+            if self._is_alive(candidate):
+                driver = candidate
+            else:
+                logger.warning(f"⚠️ Navegador ocioso ({self.portal}) não responde - descartando")
+                self._discard(candidate)
+
+        with self._lock:
+            self._uses[id(driver)] += 1
+            self._in_use += 1
+        return driver
+
+    def release(self, driver, discard=False):
+        """Devolve o navegador ao pool, limpando o estado ou reciclando-o"""
+        with self._lock:
+            self._in_use -= 1
+            uses = self._uses.get(id(driver), 0)
+
+        recycle_reason = None
+        if discard:
+            recycle_reason = 'descartado pelo job'
+        elif self._closed:
+            recycle_reason = 'pool encerrado'
+        elif uses >= self.max_uses:
+            recycle_reason = f'{uses} usos'
+        elif self._idle.qsize() >= self.size:
+            recycle_reason = 'pool cheio'
+        else:
+            rss = driver_rss_mb(driver)
+            if rss is not None and self.max_rss_mb and rss > self.max_rss_mb:
+                recycle_reason = f'{rss:.0f} MB de RSS'
+
+        if recycle_reason is None:
+            try:
+                self.reset(driver)
+            except Exception as e:
+                recycle_reason = f'erro ao limpar estado: {e}'
+
+        if recycle_reason:
+            logger.info(f"♻️ Reciclando navegador ({self.portal}): {recycle_reason}")
+            self._discard(driver)
+            if not self._closed:
+                self.warm()
+            return
+
+        self._idle.put(driver)
+
+    def reset(self, driver):
+        """Limpa o estado do navegador conforme ``reset``"""
+        if 'tabs' in self.reset_items:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+        if 'storage' in self.reset_items:
+            # localStorage/sessionStorage só podem ser limpos na origem atual
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except Exception:
+                pass
+
+        if 'cookies' in self.reset_items:
+            try:
+                driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            except Exception:
+                driver.delete_all_cookies()
+
+        driver.get('about:blank')
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def shutdown(self):
+        """Fecha todos os navegadores ociosos; os em uso são fechados na devolução"""
+        self._closed = True
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_driver_pool(portal):
+    """Pool do portal (criado na primeira chamada) ou None se o pool estiver desativado"""
+    config = get_pool_config()
+    if not config.get('enabled'):
+        return None
+
+    with _pools_lock:
+        pool = _pools.get(portal)
+        if pool is None:
+            pool = DriverPool(
+                portal,
+                size=config['size'].get(portal, 1),
+                max_uses=config['max_uses'],
+                max_rss_mb=config['max_rss_mb'],
+                reset=config['reset'],
+            )
+            _pools[portal] = pool
+        return pool
+
+
+def shutdown_driver_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown()
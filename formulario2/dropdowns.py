@@ -0,0 +1,101 @@
+"""
+Descoberta de opções em dropdowns/autocompletes.
+
+A busca fica restrita ao container do dropdown aberto pelo campo
+(``aria-controls``/``aria-owns``, a caixa de opções do componente
+``input-select-search`` ou o ancestral mais próximo do campo que tenha
+opções) em vez de varrer o documento inteiro. As opções são deduplicadas e,
+quando um texto alvo é informado, só a opção correspondente (com o elemento,
+pronto para o clique) volta pelo WebDriver — não a lista inteira.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Elementos tratados como opção (mesmos tipos que o antigo options_script procurava)
+OPTION_SELECTOR = ', '.join([
+    'option',
+    '[role="option"]',
+    'li[data-value]', 'li.select-option',
+    'div[data-value]', 'div.select-option',
+    'span[data-value]', 'span.select-option',
+])
+
+# Containers de opções conhecidos, procurados no documento quando o campo não aponta para um
+CONTAINER_SELECTOR = ', '.join([
+    '[data-testid="input-select-search-options-box"]',
+    '[role="listbox"]',
+])
+
+FIND_OPTION_SCRIPT = """
+var anchor = arguments[0], target = arguments[1], sampleSize = arguments[2];
+var optionSelector = arguments[3], containerSelector = arguments[4];
+
+function visible(el) { return el && el.offsetParent !== null; }
+function clean(value) { return String(value || '').replace(/\\s+/g, ' ').trim(); }
+
+// 1. Container do dropdown aberto pelo campo
+var scope = null, scopeName = null;
+if (anchor) {
+    var ids = (anchor.getAttribute('aria-controls') || anchor.getAttribute('aria-owns') || '').split(/\\s+/);
+    for (var i = 0; i < ids.length && !scope; i++) {
+        var byId = ids[i] && document.getElementById(ids[i]);
+        if (visible(byId)) { scope = byId; scopeName = 'aria'; }
+    }
+    // Ancestral mais próximo do campo que contenha opções (máx. 6 níveis)
+    var node = anchor.parentElement;
+    for (var depth = 0; node && depth < 6 && !scope; depth++, node = node.parentElement) {
+        if (node.querySelector(containerSelector) || node.querySelector(optionSelector)) {
+            scope = node.querySelector(containerSelector) || node;
+            scopeName = 'ancestral';
+        }
+    }
+}
+// 2. Container de opções visível no documento (dropdowns renderizados em portal)
+if (!scope) {
+    var containers = document.querySelectorAll(containerSelector);
+    for (var c = 0; c < containers.length && !scope; c++) {
+        if (visible(containers[c])) { scope = containers[c]; scopeName = 'container'; }
+    }
+}
+if (!scope) { scope = document; scopeName = 'documento'; }
+
+// Opções deduplicadas por (texto, valor): o mesmo item costuma aparecer em <option> e no <div> do componente
+var nodes = scope.querySelectorAll(optionSelector);
+var seen = {}, count = 0, sample = [], match = null;
+for (var n = 0; n < nodes.length; n++) {
+    var el = nodes[n];
+    if (el.tagName !== 'OPTION' && !visible(el)) continue;
+    var text = clean(el.textContent);
+    var value = clean(el.getAttribute('data-value') || el.value || text);
+    var key = text + '\\u0000' + value;
+    if (!text || seen[key]) continue;
+    seen[key] = true;
+    count++;
+    if (target && !match && (text.indexOf(target) >= 0 || value.indexOf(target) >= 0)) {
+        match = {text: text, value: value, element: el};
+    }
+    if (sample.length < sampleSize) sample.push({text: text, value: value});
+}
+return {scope: scopeName, count: count, match: match, sample: match ? [] : sample};
+"""
+
+
+def find_option(driver, target=None, anchor=None, sample_size=20):
+    """
+    Procura ``target`` (trecho do texto ou do valor) entre as opções do
+    dropdown aberto por ``anchor`` (o campo digitado), em uma única chamada.
+
+    Retorna ``{'scope', 'count', 'match', 'sample'}``: ``match`` é
+    ``{'text', 'value', 'element'}`` ou None; ``sample`` traz até
+    ``sample_size`` opções (só quando não há correspondência, para diagnóstico).
+    """
+    return driver.execute_script(
+        FIND_OPTION_SCRIPT, anchor, target, sample_size, OPTION_SELECTOR, CONTAINER_SELECTOR,
+    )
+
+
+def has_options(driver, anchor=None):
+    """True quando o dropdown aberto por ``anchor`` já tem opções (condição para ``waits.until``)"""
+    result = find_option(driver, None, anchor, sample_size=0)
+    return bool(result and result['count'])
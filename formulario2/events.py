@@ -0,0 +1,239 @@
+"""
+Status dos jobs em tempo real (Server-Sent Events).
+
+Quem muda o estado de um job grava um ``AutomationEvent``: ``pending`` ao
+enfileirar, ``running`` quando o worker reivindica, ``completed``/``failed``
+ao terminar e um evento de passo (``kind='step'``) no início e no fim de cada
+passo cronometrado (``step_timing``).
+
+No servidor web, ``/api/jobs/events/`` (todos os jobs) e
+``/api/jobs/<id>/events/`` (um job) mantêm a conexão aberta. Um único
+``EventBroker`` por processo lê os eventos novos (``id`` maior que o último
+lido) a cada ``poll_interval``, enquanto houver alguém conectado, e os
+distribui para as filas dos clientes: uma consulta por intervalo, qualquer
+que seja o número de clientes. No SQLite as escritas são serializadas, então
+os ids chegam em ordem de commit e nenhum evento é pulado.
+
+O navegador reconecta sozinho enviando ``Last-Event-ID``; os eventos
+perdidos nesse intervalo são reenviados a partir do banco.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Max
+from django.utils import timezone
+
+from .db import retry_on_locked
+from .models import AutomationEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EVENTS_CONFIG = {
+    'poll_interval': 0.5,  # segundos entre leituras de eventos novos (uma por processo web)
+    'heartbeat': 15,  # segundos sem eventos até enviar um comentário para manter a conexão
+    'queue_size': 1000,  # eventos pendentes por cliente; acima disso o cliente é desconectado e reconecta
+    'step_events': True,  # publicar início/fim de cada passo (além das mudanças de status)
+    'retention': 24 * 60 * 60,  # segundos; eventos mais antigos são apagados pelo worker
+}
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+EVENT_FIELDS = ('id', 'job_id', 'portal', 'kind', 'status', 'step', 'data', 'created_at')
+
+
+def get_events_config():
+    config = dict(DEFAULT_EVENTS_CONFIG)
+    config.update(getattr(settings, 'AUTOMATION_EVENTS', {}))
+    return config
+
+
+def _new_event(automation_log, status=None, **data):
+    return AutomationEvent(
+        job_id=automation_log.id,
+        portal=automation_log.portal,
+        kind='status',
+        status=status or automation_log.status,
+        data=data,
+    )
+
+
+def publish_status(automation_log, status=None, **data):
+    """Registra o status atual (ou ``status``) do job; erros só são logados"""
+    try:
+        retry_on_locked(_new_event(automation_log, status, **data).save)
+    except Exception as e:
+        logger.error(f"❌ Erro ao publicar evento do job {automation_log.id}: {e}")
+
+
+def publish_statuses(automation_logs, status=None):
+    """``publish_status`` de vários jobs em um único INSERT"""
+    if automation_logs:
+        AutomationEvent.objects.bulk_create([_new_event(automation_log, status) for automation_log in automation_logs])
+
+
+def step_publisher(automation_log):
+    """Callback ``on_step`` de ``step_timing.tracking`` que publica o progresso do job (ou None, se desligado)"""
+    if not get_events_config()['step_events']:
+        return None
+
+    def on_step(record, phase):
+        data = {'phase': phase}
+        if phase == 'finished':
+            data.update(outcome=record['outcome'], duration=record['duration'], retries=record['retries'])
+        retry_on_locked(
+            AutomationEvent.objects.create,
+            job_id=automation_log.id,
+            portal=automation_log.portal,
+            kind='step',
+            status='running',
+            step=record['name'],
+            data=data,
+        )
+    return on_step
+
+
+def purge_events():
+    """Apaga os eventos mais antigos que ``retention``; retorna quantos foram apagados"""
+    cutoff = timezone.now() - timedelta(seconds=get_events_config()['retention'])
+    deleted, _ = AutomationEvent.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def _as_dict(values):
+    values['job'] = values.pop('job_id')
+    values['created_at'] = values['created_at'].isoformat()
+    return values
+
+
+class Subscription:
+    """Fila de eventos de um cliente conectado (todos os jobs ou só ``job_id``)"""
+
+    def __init__(self, job_id=None, queue_size=1000):
+        self.job_id = job_id
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def put(self, event):
+        if self.overflowed or (self.job_id is not None and event['job'] != self.job_id):
+            return
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            # Cliente lento: encerra a conexão; ele reconecta com Last-Event-ID e recupera do banco
+            self.overflowed = True
+
+
+class EventBroker:
+    """Lê os eventos novos do banco em uma thread e distribui para as assinaturas abertas"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._thread = None
+        self._last_id = 0
+
+    def subscribe(self, job_id=None, last_event_id=None):
+        """Nova assinatura; com ``last_event_id`` os eventos posteriores a ele já entram na fila"""
+        config = get_events_config()
+        subscription = Subscription(job_id, config['queue_size'])
+        with self._lock:
+            if self._thread is None:
+                self._last_id = AutomationEvent.objects.aggregate(last=Max('id'))['last'] or 0
+                self._thread = threading.Thread(target=self._run, name='automation-events', daemon=True)
+                self._thread.start()
+            self._subscriptions.add(subscription)
+            # Tudo até aqui vem do banco; o que vier depois, da thread
+            replay_until = self._last_id
+
+        if last_event_id is not None and last_event_id < replay_until:
+            missed = AutomationEvent.objects.filter(id__gt=last_event_id, id__lte=replay_until)
+            if job_id is not None:
+                missed = missed.filter(job_id=job_id)
+            for values in missed.order_by('id').values(*EVENT_FIELDS)[:config['queue_size']]:
+                subscription.put(_as_dict(values))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def _run(self):
+        try:
+            while True:
+                with self._lock:
+                    if not self._subscriptions:
+                        self._thread = None
+                        return
+                try:
+                    self._poll()
+                except Exception as e:
+                    logger.error(f"❌ Erro ao ler eventos de automação: {e}")
+                    close_old_connections()
+                time.sleep(get_events_config()['poll_interval'])
+        finally:
+            connection.close()
+
+    def _poll(self):
+        events = [
+            _as_dict(values)
+            for values in AutomationEvent.objects.filter(id__gt=self._last_id).order_by('id').values(*EVENT_FIELDS)[:500]
+        ]
+        if not events:
+            return
+        with self._lock:
+            self._last_id = events[-1]['id']
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            for event in events:
+                subscription.put(event)
+
+
+_broker = EventBroker()
+
+
+def get_broker():
+    return _broker
+
+
+def _format(event, name=None):
+    lines = []
+    if 'id' in event:
+        lines.append(f"id: {event['id']}")
+    lines.append(f"event: {name or event['kind']}")
+    lines.append(f"data: {json.dumps(event, ensure_ascii=False)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def sse_stream(subscription, snapshot=None):
+    """
+    Gerador do corpo ``text/event-stream``. Com ``snapshot`` (estado atual de
+    um job) ele é o primeiro evento e o stream termina quando o job termina.
+    """
+    broker = get_broker()
+    heartbeat = get_events_config()['heartbeat']
+    try:
+        yield 'retry: 3000\n\n'
+        if snapshot:
+            yield _format(snapshot, 'snapshot')
+            if snapshot['status'] in TERMINAL_STATUSES:
+                # Job já terminado: só os eventos reenviados (Last-Event-ID), se houver
+                while not subscription.queue.empty():
+                    yield _format(subscription.queue.get_nowait())
+                return
+        while not subscription.overflowed:
+            try:
+                event = subscription.queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ': ping\n\n'
+                continue
+            yield _format(event)
+            if snapshot and event['kind'] == 'status' and event['status'] in TERMINAL_STATUSES:
+                return
+    finally:
+        broker.unsubscribe(subscription)
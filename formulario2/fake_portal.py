@@ -0,0 +1,568 @@
+"""
+Portal de testes local: imitação dos portais da Porto Seguro e da Amil.
+
+Não dá para medir o throughput das automações contra o Corretor Online e o
+Amil Empresa reais. Este app WSGI (sem dependências além da biblioteca
+padrão) reproduz as páginas que as automações percorrem, com os mesmos ids,
+names e XPaths:
+
+* Porto: botão de acesso do corretor, login (``logonPrincipal``,
+  ``liSenha``, ``inputLogin``), SUSEP com autocomplete
+  (``susepsAutocomplete``, ``btnAvancarSusep``), menu de favoritos/produtos,
+  card "Gestão de Apólice" e o select-search do ``container_page_mov``;
+* Amil: login, menu Beneficiários > Incluir titulares, popup de aviso,
+  seletor de contrato (``rw_8``) e o formulário ``beneficiaryOwner.*``.
+
+Cada requisição espera ``latency`` segundos (mais até ``jitter`` aleatórios);
+as chamadas de API das páginas (autocomplete, login da Amil, contratos)
+esperam ``api_latency``.
+
+Suba com ``python manage.py run_fake_portal`` e aponte as automações para
+ele com ``AUTOMATION_FAKE_PORTAL_URL`` (settings ou variável de ambiente):
+``portal_urls`` devolve as entradas de ``URLS`` correspondentes.
+"""
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from http.cookies import SimpleCookie
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+logger = logging.getLogger(__name__)
+
+PORTO_COOKIE = 'fake_porto_session'
+AMIL_COOKIE = 'fake_amil_session'
+
+
+def portal_urls(base_url):
+    """Entradas de ``automation_config.URLS`` apontando para o portal de testes em ``base_url``"""
+    base = base_url.rstrip('/')
+    return {
+        'porto_seguro_corretor': f'{base}/porto/login/',
+        'porto_home': f'{base}/porto/corretoronline/',
+        'administracao_de_apolices': f'{base}/porto/corretoronline/administracao-de-apolices/',
+        'amil_login': f'{base}/amil/#/login',
+        'amil_home': f'{base}/amil/#/',
+    }
+
+
+# Estilo comum: o suficiente para os elementos terem tamanho (offsetParent) e serem clicáveis
+STYLE = """
+<style>
+body { font-family: sans-serif; margin: 0; }
+button, input, a, .clicavel { cursor: pointer; }
+input { display: block; margin: 4px 0 12px; padding: 4px; width: 280px; }
+input[type=radio] { display: inline; width: auto; }
+.loading-spinner { position: fixed; top: 8px; right: 8px; width: 16px; height: 16px; border: 3px solid #ccc; border-top-color: #06c; border-radius: 50%; }
+[role=option] { padding: 4px; border-bottom: 1px solid #eee; }
+.square-card-button { display: inline-block; width: 180px; height: 90px; margin: 8px; border: 1px solid #ccc; }
+</style>
+"""
+
+# fetch com indicador de carregamento (os spinners que waits.spinner_gone procura)
+FETCH_JS = """
+<script>
+function carregar(url, options) {
+    var spinner = document.getElementById('spinner');
+    spinner.style.display = 'block';
+    return fetch(url, options).then(function (response) {
+        return response.json();
+    }).finally(function () {
+        spinner.style.display = 'none';
+    });
+}
+function mostrar(id) { document.getElementById(id).style.display = 'block'; }
+</script>
+"""
+
+PORTO_LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Corretor Online (portal de testes)</title>""" + STYLE + """</head>
+<body>
+<div><h1>Corretor Online - portal de testes</h1></div>
+<div></div>
+<div class="loading-spinner" id="spinner" style="display:none"></div>
+<div>
+    <div>
+        <div>
+            <div>Acesso</div>
+            <div><ul><li><button type="button" onclick="mostrar('areaLogin')">Sou corretor</button></li></ul></div>
+        </div>
+    </div>
+    <div id="areaLogin" style="display:none">
+        <form method="post" action="">
+            <ul>
+                <li><input id="logonPrincipal" name="login" placeholder="CPF"></li>
+                <li id="liSenha"><div><input type="password" name="senha" placeholder="Senha"></div></li>
+            </ul>
+            <button type="submit" id="inputLogin">Entrar</button>
+        </form>
+    </div>
+</div>
+""" + FETCH_JS + """
+</body></html>
+"""
+
+PORTO_SUSEP_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>SUSEP (portal de testes)</title>""" + STYLE + """</head>
+<body>
+<div class="loading-spinner" id="spinner" style="display:none"></div>
+<form method="post" action="">
+    <label>SUSEP<input id="susepsAutocomplete" name="susep" autocomplete="off"></label>
+    <div id="susepsOpcoes" role="listbox"></div>
+    <button type="submit" id="btnAvancarSusep">Avançar</button>
+</form>
+""" + FETCH_JS + """
+<script>
+var campo = document.getElementById('susepsAutocomplete');
+campo.addEventListener('input', function () {
+    carregar('/porto/api/suseps/?q=' + encodeURIComponent(campo.value)).then(function (data) {
+        var lista = document.getElementById('susepsOpcoes');
+        lista.innerHTML = '';
+        data.results.forEach(function (susep) {
+            var opcao = document.createElement('div');
+            opcao.setAttribute('role', 'option');
+            opcao.textContent = susep;
+            opcao.onclick = function () { campo.value = susep; lista.innerHTML = ''; };
+            lista.appendChild(opcao);
+        });
+    });
+});
+</script>
+</body></html>
+"""
+
+PORTO_HOME_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Corretor Online - início (portal de testes)</title>""" + STYLE + """</head>
+<body>
+<div class="loading-spinner" id="spinner" style="display:none"></div>
+<div id="favorites"><div><div><div><div><span class="clicavel"><i onclick="mostrar('menu')">&#9733; Favoritos</i></span></div></div></div></div></div>
+<div id="menu" style="display:none">
+    <button type="button" id="COL-02TS6" onclick="mostrar('submenuSaude')">Produtos</button>
+    <div id="submenuSaude" style="display:none">
+        <button type="button" id="9982" onclick="mostrar('submenuEmpresarial')">Saúde</button>
+    </div>
+    <div id="submenuEmpresarial" style="display:none">
+        <button type="button" id="COL-02X27" onclick="mostrar('single-spa-application:@porto-seguro/ssmr-corp-ncol-mfe-products')">Saúde Empresarial</button>
+    </div>
+</div>
+<div id="single-spa-application:@porto-seguro/ssmr-corp-ncol-mfe-products" style="display:none">
+    <div><div><div>
+        <div><h2>Saúde Empresarial</h2></div>
+        <div>
+            <div></div>
+            <div></div>
+            <div><div>
+                <a href="#">Cotar</a>
+                <a href="produtos/"><button type="button" onclick="location.href = 'produtos/'">Ver produtos</button></a>
+            </div></div>
+        </div>
+    </div></div></div>
+</div>
+""" + FETCH_JS + """
+</body></html>
+"""
+
+PORTO_PRODUTOS_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Produtos (portal de testes)</title>""" + STYLE + """</head>
+<body>
+<div class="loading-spinner" id="spinner" style="display:none"></div>
+<div>
+    <a class="square-card-button" href="#"><h2>Cotação</h2></a>
+    <a class="square-card-button" href="../administracao-de-apolices/"><h2>Gestão de Apólice</h2></a>
+</div>
+</body></html>
+"""
+
+PORTO_GESTAO_APOLICE_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Administração de apólices (portal de testes)</title>""" + STYLE + """</head>
+<body>
+<div class="loading-spinner" id="spinner" style="display:none"></div>
+<div id="container_page_mov"><div><div>
+    <div><div><div>
+        <label>Estipulante
+            <input data-testid="input-select-search" name="stipulatorData.stipulator.label"
+                   placeholder="Buscar estipulante" autocomplete="off">
+        </label>
+        <div data-testid="input-select-search-options-box" style="display:none"></div>
+    </div></div></div>
+    <div id="estipulanteSelecionado"></div>
+</div></div></div>
+""" + FETCH_JS + """
+<script>
+var campo = document.querySelector('[data-testid="input-select-search"]');
+var caixa = document.querySelector('[data-testid="input-select-search-options-box"]');
+campo.addEventListener('input', function () {
+    var termo = campo.value;
+    carregar('/porto/api/estipulantes/?q=' + encodeURIComponent(termo)).then(function (data) {
+        if (campo.value !== termo) return;
+        caixa.innerHTML = '';
+        data.results.forEach(function (item) {
+            var opcao = document.createElement('div');
+            opcao.setAttribute('role', 'option');
+            opcao.setAttribute('data-value', item.code);
+            opcao.className = 'select-option';
+            opcao.textContent = item.code + ' - ' + item.name;
+            opcao.onclick = function () {
+                campo.value = opcao.textContent;
+                caixa.style.display = 'none';
+                document.getElementById('estipulanteSelecionado').textContent = 'Estipulante selecionado: ' + opcao.textContent;
+            };
+            caixa.appendChild(opcao);
+        });
+        caixa.style.display = data.results.length ? 'block' : 'none';
+    });
+});
+</script>
+</body></html>
+"""
+
+AMIL_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Amil Empresa (portal de testes)</title>""" + STYLE + """</head>
+<body>
+<div id="app"></div>
+<div id="avisos"></div>
+<div id="popup" style="display:none"><div><div><div><div>
+    <div><strong>Aviso</strong></div>
+    <div>Confira os dados do titular antes de enviar.</div>
+    <div><div><button type="button" onclick="document.getElementById('popup').style.display = 'none'">Ok</button></div></div>
+</div></div></div></div></div>
+<div class="loading-spinner" id="spinner" style="display:none"></div>
+
+<template id="telaLogin">
+<div id="login"><div><div><section><section><form onsubmit="return false">
+    <div>
+        <div><div><div><div><div><input name="login" placeholder="Código de acesso"></div></div></div></div></div>
+        <div><div><div><div><div><div><input type="password" name="senha" placeholder="Senha"></div></div></div></div></div></div>
+        <div><div><div><div><button type="button" id="entrar">Entrar</button></div></div></div></div>
+    </div>
+</form></section></section></div></div></div>
+</template>
+
+<template id="telaPrincipal">
+<div><h1>Amil Empresa - portal de testes</h1></div>
+<div>
+    <div><div>
+        <div></div>
+        <div></div>
+        <div>
+            <div>Menu</div>
+            <div><nav><div><ul>
+                <div><a href="#/">Início</a></div>
+                <div>Contratos</div>
+                <div>Faturas</div>
+                <div>
+                    <div class="clicavel" onclick="mostrar('submenuBeneficiarios')">Beneficiários</div>
+                    <div id="submenuBeneficiarios" style="display:none"><ul><div>
+                        <div><a href="#/beneficiarios/incluir">Incluir titulares</a></div>
+                    </div></ul></div>
+                </div>
+            </ul></div></nav></div>
+        </div>
+    </div></div>
+    <div id="conteudo"></div>
+</div>
+</template>
+
+<template id="telaIncluir">
+<div>
+    <div>
+        <label>Contrato</label>
+        <div id="rw_8_input"><div><div class="clicavel" id="contratoSelecionado">Selecione o contrato</div></div></div>
+        <div id="rw_8_listbox" role="listbox" style="display:none"></div>
+    </div>
+    <form id="formBeneficiario" style="display:none" onsubmit="return false"><fieldset>
+        <div>
+            <div><h3>Dados do titular</h3></div>
+            <div><div>
+                <div><label>Nome</label><input name="beneficiaryOwner.nome"></div>
+                <div><label>CPF</label><input name="beneficiaryOwner.cpf" data-mascara="cpf"></div>
+                <div><label>Nome no cartão</label><input name="beneficiaryOwner.nomeCartao"></div>
+                <div>
+                    <div>Sexo
+                        <label><input type="radio" name="beneficiaryOwner.sexo" value="M"> Masculino</label>
+                        <label><input type="radio" name="beneficiaryOwner.sexo" value="F"> Feminino</label>
+                    </div>
+                    <div>Nacionalidade
+                        <label><input type="radio" name="beneficiaryOwner.nacionalidade" value="B"> Brasileiro</label>
+                        <label><input type="radio" name="beneficiaryOwner.nacionalidade" value="E"> Estrangeiro</label>
+                    </div>
+                    <div><div><div><div><input name="beneficiaryOwner.dataNascimento" placeholder="dd/mm/aaaa" data-mascara="data"></div></div></div></div>
+                </div>
+                <div><label>Nome da mãe</label><input name="beneficiaryOwner.nomeMae"></div>
+                <div><label>Nome do pai</label><input name="beneficiaryOwner.nomePai"></div>
+            </div></div>
+        </div>
+    </fieldset></form>
+</div>
+</template>
+""" + FETCH_JS + """
+<script>
+var app = document.getElementById('app');
+
+function logado() { return document.cookie.indexOf('""" + AMIL_COOKIE + """=') >= 0; }
+function tela(id) { return document.getElementById(id).innerHTML; }
+
+// Máscaras simples (como as do portal): o valor final difere do digitado
+var mascaras = {
+    cpf: function (v) {
+        v = v.replace(/\\D/g, '').slice(0, 11);
+        return v.replace(/(\\d{3})(\\d)/, '$1.$2').replace(/(\\d{3})(\\d)/, '$1.$2').replace(/(\\d{3})(\\d{1,2})$/, '$1-$2');
+    },
+    data: function (v) {
+        v = v.replace(/\\D/g, '').slice(0, 8);
+        return v.replace(/(\\d{2})(\\d)/, '$1/$2').replace(/(\\d{2})(\\d)/, '$1/$2');
+    }
+};
+
+function telaLogin() {
+    app.innerHTML = tela('telaLogin');
+    document.getElementById('entrar').onclick = function () {
+        var form = app.querySelector('form');
+        carregar('/amil/api/login/', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({login: form.login.value, senha: form.senha.value})
+        }).then(function (data) {
+            if (data.ok) location.hash = '#/';
+        });
+    };
+}
+
+function telaIncluir() {
+    document.getElementById('conteudo').innerHTML = tela('telaIncluir');
+    mostrar('popup');
+    document.getElementById('contratoSelecionado').onclick = function () {
+        carregar('/amil/api/contratos/').then(function (data) {
+            var lista = document.getElementById('rw_8_listbox');
+            lista.innerHTML = '';
+            data.results.forEach(function (contrato, i) {
+                var opcao = document.createElement('div');
+                opcao.setAttribute('role', 'option');
+                opcao.textContent = contrato;
+                if (i === 0) { opcao.id = 'rw_8_listbox_active_option'; opcao.className = 'active'; }
+                opcao.onclick = function () {
+                    document.getElementById('contratoSelecionado').textContent = contrato;
+                    lista.style.display = 'none';
+                    mostrar('formBeneficiario');
+                };
+                lista.appendChild(opcao);
+            });
+            mostrar('rw_8_listbox');
+        });
+    };
+    Array.prototype.forEach.call(document.querySelectorAll('[data-mascara]'), function (campo) {
+        campo.addEventListener('input', function () {
+            var valor = mascaras[campo.getAttribute('data-mascara')](campo.value);
+            if (valor !== campo.value) campo.value = valor;
+        });
+    });
+}
+
+function rotear() {
+    var rota = location.hash.replace(/^#/, '') || '/';
+    if (rota === '/login') return telaLogin();
+    if (!logado()) { location.hash = '#/login'; return; }
+    if (!document.getElementById('conteudo')) app.innerHTML = tela('telaPrincipal');
+    document.getElementById('conteudo').innerHTML = '';
+    if (rota === '/beneficiarios/incluir') telaIncluir();
+}
+
+window.addEventListener('hashchange', rotear);
+rotear();
+</script>
+</body></html>
+"""
+
+ESTIPULANTES = [
+    {'code': '60146757', 'name': 'EMPRESA DEMONSTRACAO LTDA'},
+    {'code': '60146758', 'name': 'COMERCIO EXEMPLO S.A.'},
+    {'code': '61020304', 'name': 'INDUSTRIA MODELO LTDA'},
+    {'code': '62030405', 'name': 'SERVICOS TESTE EIRELI'},
+]
+
+SUSEPS = ['BA6QXJ (P)', 'BA6QXK (P)', 'BB1234 (J)']
+
+CONTRATOS = ['Contrato 123456 - PME Demonstração', 'Contrato 654321 - PME Exemplo']
+
+
+class FakePortal:
+    """App WSGI do portal de testes"""
+
+    def __init__(self, latency=0.2, jitter=0.1, api_latency=0.5):
+        self.latency = latency
+        self.jitter = jitter
+        self.api_latency = api_latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.routes = {
+            '/': self.index,
+            '/healthz': self.healthz,
+            '/porto/login/': self.porto_login,
+            '/porto/susep/': self.porto_susep,
+            '/porto/corretoronline/': self.porto_home,
+            '/porto/corretoronline/produtos/': self.porto_produtos,
+            '/porto/corretoronline/administracao-de-apolices/': self.porto_gestao_apolice,
+            '/porto/api/suseps/': self.porto_api_suseps,
+            '/porto/api/estipulantes/': self.porto_api_estipulantes,
+            '/amil/': self.amil,
+            '/amil/api/login/': self.amil_api_login,
+            '/amil/api/contratos/': self.amil_api_contratos,
+        }
+
+    def __call__(self, environ, start_response):
+        with self._lock:
+            self.requests += 1
+
+        path = environ.get('PATH_INFO') or '/'
+        if not path.endswith('/') and path + '/' in self.routes:
+            path += '/'
+        handler = self.routes.get(path)
+        if handler is None:
+            return self._respond(start_response, '404 Not Found', 'Não encontrado', 'text/plain')
+
+        delay = self.api_latency if '/api/' in path else self.latency
+        if delay or self.jitter:
+            time.sleep(delay + random.uniform(0, self.jitter))
+        return handler(environ, start_response)
+
+    # Respostas
+
+    def _respond(self, start_response, status, body, content_type='text/html', headers=None):
+        data = body.encode('utf-8')
+        start_response(status, [
+            ('Content-Type', f'{content_type}; charset=utf-8'),
+            ('Content-Length', str(len(data))),
+            ('Cache-Control', 'no-store'),
+        ] + list(headers or []))
+        return [data]
+
+    def _html(self, start_response, body, headers=None):
+        return self._respond(start_response, '200 OK', body, headers=headers)
+
+    def _json(self, start_response, payload, headers=None):
+        return self._respond(start_response, '200 OK', json.dumps(payload, ensure_ascii=False), 'application/json', headers)
+
+    def _redirect(self, start_response, location, headers=None):
+        start_response('303 See Other', [('Location', location), ('Content-Length', '0')] + list(headers or []))
+        return [b'']
+
+    @staticmethod
+    def _session_cookie(name):
+        return ('Set-Cookie', f'{name}={uuid.uuid4().hex}; Path=/; SameSite=Lax')
+
+    @staticmethod
+    def _cookies(environ):
+        return SimpleCookie(environ.get('HTTP_COOKIE', ''))
+
+    @staticmethod
+    def _form(environ):
+        try:
+            size = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            size = 0
+        body = environ['wsgi.input'].read(size).decode('utf-8') if size else ''
+        if environ.get('CONTENT_TYPE', '').startswith('application/json'):
+            return json.loads(body or '{}')
+        return {key: values[0] for key, values in parse_qs(body).items()}
+
+    @staticmethod
+    def _query(environ, key):
+        return parse_qs(environ.get('QUERY_STRING', '')).get(key, [''])[0]
+
+    # Páginas
+
+    def index(self, environ, start_response):
+        links = ''.join(f'<li><a href="{path}">{path}</a></li>' for path in self.routes if '/api/' not in path)
+        return self._html(start_response, f'<h1>Portal de testes</h1><ul>{links}</ul>')
+
+    def healthz(self, environ, start_response):
+        return self._json(start_response, {'ok': True, 'requests': self.requests})
+
+    def porto_login(self, environ, start_response):
+        if environ['REQUEST_METHOD'] == 'POST':
+            form = self._form(environ)
+            if not form.get('login') or not form.get('senha'):
+                return self._redirect(start_response, '/porto/login/')
+            return self._redirect(start_response, '/porto/susep/', [self._session_cookie(PORTO_COOKIE)])
+        return self._html(start_response, PORTO_LOGIN_PAGE)
+
+    def porto_susep(self, environ, start_response):
+        if PORTO_COOKIE not in self._cookies(environ):
+            return self._redirect(start_response, '/porto/login/')
+        if environ['REQUEST_METHOD'] == 'POST':
+            return self._redirect(start_response, '/porto/corretoronline/')
+        return self._html(start_response, PORTO_SUSEP_PAGE)
+
+    def porto_home(self, environ, start_response):
+        # Sem a sessão o portal volta para o login (é o que a verificação de sessão observa)
+        if PORTO_COOKIE not in self._cookies(environ):
+            return self._redirect(start_response, '/porto/login/')
+        return self._html(start_response, PORTO_HOME_PAGE)
+
+    def porto_produtos(self, environ, start_response):
+        return self._html(start_response, PORTO_PRODUTOS_PAGE)
+
+    def porto_gestao_apolice(self, environ, start_response):
+        return self._html(start_response, PORTO_GESTAO_APOLICE_PAGE)
+
+    def porto_api_suseps(self, environ, start_response):
+        termo = self._query(environ, 'q').upper()
+        return self._json(start_response, {'results': [s for s in SUSEPS if termo[:4] in s]})
+
+    def porto_api_estipulantes(self, environ, start_response):
+        termo = self._query(environ, 'q').strip()
+        results = [e for e in ESTIPULANTES if termo and (termo in e['code'] or termo.upper() in e['name'])]
+        return self._json(start_response, {'results': results})
+
+    def amil(self, environ, start_response):
+        return self._html(start_response, AMIL_PAGE)
+
+    def amil_api_login(self, environ, start_response):
+        if environ['REQUEST_METHOD'] != 'POST':
+            return self._respond(start_response, '405 Method Not Allowed', 'POST', 'text/plain')
+        form = self._form(environ)
+        if not form.get('login') or not form.get('senha'):
+            return self._json(start_response, {'ok': False})
+        return self._json(start_response, {'ok': True}, [self._session_cookie(AMIL_COOKIE)])
+
+    def amil_api_contratos(self, environ, start_response):
+        return self._json(start_response, {'results': CONTRATOS})
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        logger.debug(f"🌐 {self.address_string()} {format % args}")
+
+
+def make_threaded_server(app, host='127.0.0.1', port=0):
+    """Servidor HTTP para um app WSGI, uma thread por requisição (``port=0``: porta livre escolhida pelo sistema)"""
+    return make_server(host, port, app, server_class=_ThreadingWSGIServer, handler_class=_QuietHandler)
+
+
+def make_fake_portal_server(host='127.0.0.1', port=8765, **config):
+    """Servidor HTTP com o portal de testes; ``config`` vai para ``FakePortal``"""
+    return make_threaded_server(FakePortal(**config), host, port)
+
+
+def serve_in_background(server):
+    """Atende ``server`` em uma thread daemon; devolve a URL base (encerre com ``server.shutdown()``)"""
+    threading.Thread(target=server.serve_forever, name='fake-portal', daemon=True).start()
+    host, port = server.server_address[:2]
+    return f'http://{host}:{port}'
+
+
+def use_fake_portal(base_url):
+    """Aponta ``URLS`` e ``SESSION_CHECKS`` (automation_config) para o portal de testes, no processo atual"""
+    from .automation_config import SESSION_CHECKS, URLS
+
+    URLS.update(portal_urls(base_url))
+    SESSION_CHECKS['porto']['url'] = URLS['porto_home']
+    SESSION_CHECKS['amil']['url'] = URLS['amil_home']
@@ -0,0 +1,122 @@
+"""
+Preenchimento de formulários em lote, em uma única chamada ao navegador.
+
+Preencher campo a campo com ``find_element`` / ``click`` / ``clear`` /
+``send_keys`` custa várias idas e voltas ao WebDriver por campo. ``fill_fields``
+envia todos os campos de uma vez: o script localiza cada um (mesmas
+estratégias e cache de ``locators``), grava o valor pelo setter nativo do
+``HTMLInputElement`` — o que os frameworks (React) enxergam como digitação —,
+dispara ``input``, ``change`` e ``blur`` e devolve um relatório por campo
+comparando o valor final com o esperado.
+
+Campos que o relatório marca como não preenchidos (não encontrados, valor
+rejeitado por máscara etc.) devem ser preenchidos pelo chamador da forma
+tradicional, por teclado.
+"""
+import logging
+
+from .locators import LOCATE_JS, learn_strategy, ordered_strategies
+
+logger = logging.getLogger(__name__)
+
+FILL_FIELDS_SCRIPT = LOCATE_JS + """
+var fields = arguments[0];
+
+// Compara só letras e dígitos: máscaras reescrevem "12345678901" como "123.456.789-01"
+function normalize(value) {
+    return String(value === null || value === undefined ? '' : value)
+        .normalize('NFD').replace(/[^0-9a-z]/gi, '').toLowerCase();
+}
+
+function setNativeValue(el, value) {
+    var proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+        : el instanceof HTMLSelectElement ? HTMLSelectElement.prototype
+        : HTMLInputElement.prototype;
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, value);
+}
+
+function fire(el, type) {
+    var event = (type === 'blur' || type === 'focusout')
+        ? new FocusEvent(type, {bubbles: type === 'focusout'})
+        : new Event(type, {bubbles: true});
+    el.dispatchEvent(event);
+}
+
+var report = [];
+for (var i = 0; i < fields.length; i++) {
+    var field = fields[i];
+    var entry = {key: field.key, index: null, ok: false, value: null, element: null, error: null};
+    report.push(entry);
+
+    var found = locate(field.strategies);
+    if (!found) {
+        entry.error = 'não encontrado';
+        continue;
+    }
+    var el = found[1];
+    entry.index = found[0];
+    entry.element = el;
+
+    try {
+        if (el.focus) el.focus();
+        if (field.kind === 'radio' || field.kind === 'checkbox') {
+            if (!el.checked) el.click();
+            entry.ok = el.checked;
+            entry.value = el.value;
+        } else {
+            setNativeValue(el, field.value);
+            fire(el, 'input');
+            fire(el, 'change');
+            entry.value = el.value;
+            entry.ok = normalize(el.value) === normalize(field.value);
+        }
+        fire(el, 'blur');
+        fire(el, 'focusout');
+    } catch (e) {
+        entry.error = String(e);
+    }
+}
+return report;
+"""
+
+
+def fill_fields(driver, portal, page, fields):
+    """
+    Preenche ``fields`` em uma única chamada ``execute_script``.
+
+    Cada campo é um dict com ``key`` (nome do campo no cache de localizadores),
+    ``value``, ``strategies`` (lista de ``(by, value)``, como em ``find_field``)
+    e opcionalmente ``kind`` (``'text'``, ``'radio'`` ou ``'checkbox'``).
+
+    Retorna ``{key: {'ok', 'found', 'value', 'element', 'error'}}``; ``ok`` é
+    False para campos não encontrados ou cujo valor final difere do esperado.
+    """
+    payload = []
+    lookups = {}
+    for field in fields:
+        ordered, cached = ordered_strategies(portal, page, field['key'], field['strategies'])
+        lookups[field['key']] = (ordered, cached)
+        payload.append({
+            'key': field['key'],
+            'value': field.get('value', ''),
+            'kind': field.get('kind', 'text'),
+            'strategies': [list(s) for s in ordered],
+        })
+
+    entries = driver.execute_script(FILL_FIELDS_SCRIPT, payload) or []
+
+    report = {}
+    for entry in entries:
+        key = entry['key']
+        ordered, cached = lookups[key]
+        learn_strategy(portal, page, key, ordered, entry.get('index'), cached)
+        report[key] = {
+            'ok': bool(entry.get('ok')),
+            'found': entry.get('index') is not None,
+            'value': entry.get('value'),
+            'element': entry.get('element'),
+            'error': entry.get('error'),
+        }
+        if not report[key]['ok']:
+            logger.debug(f"⚠️ Campo {key} não preenchido em lote: {entry.get('error') or entry.get('value')!r}")
+    return report
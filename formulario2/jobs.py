@@ -0,0 +1,241 @@
+"""
+Fila de automações persistida no banco de dados.
+
+O signal de salvamento apenas enfileira um ``AutomationLog`` com status
+``pending``. O comando ``python manage.py run_automation_worker`` reivindica os
+registros pendentes de forma atômica e executa a automação, de modo que um
+reinício do servidor não perde os jobs que ainda não terminaram.
+"""
+import logging
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from .db import retry_on_locked, update_instance
+from .events import publish_status, publish_statuses, step_publisher
+from .metrics import get_metrics_config
+from .models import AutomationLog, FormularioAmil, WorkerStatus
+from .step_timeouts import recording
+from .step_timing import tracking
+from .structured_logging import job_context
+
+logger = logging.getLogger(__name__)
+
+# Número máximo de tentativas antes de marcar um job como falho
+MAX_ATTEMPTS = 3
+
+# Quantos candidatos pendentes são avaliados por tentativa de reivindicação
+CLAIM_BATCH_SIZE = 10
+
+
+def form_data_from_instance(formulario):
+    """Converte um Formulario2 no dicionário usado pela automação"""
+    return {
+        'id': formulario.id,
+        'nomeCompleto': formulario.nomeCompleto,
+        'nomeSocial': formulario.nomeSocial or '',
+        'dataNascimento': formulario.dataNascimento.strftime('%Y-%m-%d') if formulario.dataNascimento else None,
+        'genero': formulario.genero,
+        'estadoCivil': formulario.estadoCivil,
+        'rg': formulario.rg,
+        'cpf': formulario.cpf,
+        'orgaoEmissor': formulario.orgaoEmissor,
+        'dataEmissao': formulario.dataEmissao.strftime('%Y-%m-%d') if formulario.dataEmissao else None,
+        'telefone': formulario.telefone,
+        'email': formulario.email,
+        'nomeMae': formulario.nomeMae,
+    }
+
+
+def _new_job(formulario):
+    """``AutomationLog`` pendente (ainda não salvo) para o formulário informado (Porto ou Amil)"""
+    if isinstance(formulario, FormularioAmil):
+        return AutomationLog(
+            portal='amil',
+            formulario_amil=formulario,
+            status='pending',
+            automation_data={
+                'form_id': formulario.id,
+                'form_name': formulario.nome,
+                'triggered_at': timezone.now().isoformat(),
+            }
+        )
+    return AutomationLog(
+        portal='porto',
+        formulario=formulario,
+        status='pending',
+        automation_data={
+            'form_id': formulario.id,
+            'form_name': formulario.nomeCompleto,
+            'triggered_at': timezone.now().isoformat(),
+        }
+    )
+
+
+def enqueue_automation(formulario):
+    """Cria um job pendente para o formulário informado (Porto ou Amil)"""
+    automation_log = _new_job(formulario)
+    retry_on_locked(automation_log.save)
+    publish_status(automation_log)
+    logger.info(f"📋 Automação {automation_log.portal} enfileirada - job {automation_log.id} para formulário ID: {formulario.id}")
+    return automation_log
+
+
+def enqueue_automations(formularios):
+    """
+    Cria os jobs pendentes de vários formulários já salvos em um único INSERT.
+
+    Chamado dentro da mesma transação que criou os formulários (cadastro em
+    lote): ou ficam todos os registros com os seus jobs, ou nenhum.
+    """
+    jobs = AutomationLog.objects.bulk_create([_new_job(formulario) for formulario in formularios])
+    publish_statuses(jobs)
+    if jobs:
+        logger.info(f"📋 {len(jobs)} automação(ões) {jobs[0].portal} enfileirada(s) em lote")
+    return jobs
+
+
+def pending_jobs(portal=None):
+    """Candidatos à reivindicação, na ordem da fila (índice ``automationlog_queue_idx``)"""
+    pending = AutomationLog.objects.filter(status='pending')
+    if portal:
+        pending = pending.filter(portal=portal)
+    return pending.order_by('started_at', 'id').values_list('id', flat=True)[:CLAIM_BATCH_SIZE]
+
+
+def claim_next_job(worker_id, portal=None):
+    """
+    Reivindica o próximo job pendente (o mais antigo primeiro).
+
+    A reivindicação é um UPDATE condicionado a ``status='pending'``: se outro
+    worker pegou o mesmo registro antes, o UPDATE não afeta nenhuma linha e o
+    próximo candidato é tentado. Com ``portal`` informado, só considera jobs
+    daquele portal. Retorna o AutomationLog reivindicado ou None.
+    """
+    for job_id in list(pending_jobs(portal)):
+        claimed = retry_on_locked(
+            AutomationLog.objects.filter(pk=job_id, status='pending').update,
+            status='running',
+            claimed_at=timezone.now(),
+            worker_id=worker_id,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            automation_log = AutomationLog.objects.select_related('formulario', 'formulario_amil').get(pk=job_id)
+            publish_status(automation_log, worker_id=worker_id, attempt=automation_log.attempts)
+            return automation_log
+
+    return None
+
+
+def requeue_stale_jobs(stale_after=None, heartbeat_after=None):
+    """
+    Devolve para a fila os jobs interrompidos.
+
+    Considera interrompidos os jobs em ``running`` cujo worker não publica o
+    próprio estado (``WorkerStatus``) há mais de ``heartbeat_after`` segundos
+    (padrão: ``worker_stale_after`` de ``AUTOMATION_METRICS``) — o processo
+    morreu — ou reivindicados há mais de ``stale_after`` segundos por qualquer
+    worker. Jobs que já esgotaram ``MAX_ATTEMPTS`` são marcados como falhos.
+    Retorna quantos foram devolvidos.
+    """
+    running = AutomationLog.objects.filter(status='running')
+    if heartbeat_after is None:
+        heartbeat_after = get_metrics_config()['worker_stale_after']
+
+    # Jobs reivindicados dentro da janela ficam de fora: o worker pode ainda não ter publicado o primeiro estado
+    cutoff = timezone.now() - timedelta(seconds=heartbeat_after)
+    alive = WorkerStatus.objects.filter(updated_at__gte=cutoff).values_list('worker_id', flat=True)
+    stale = running.filter(claimed_at__lt=cutoff).exclude(worker_id__in=alive)
+    if stale_after:
+        stale = stale | running.filter(claimed_at__lt=timezone.now() - timedelta(seconds=stale_after))
+
+    exhausted = list(stale.filter(attempts__gte=MAX_ATTEMPTS).only('id', 'portal'))
+    stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status='failed',
+        completed_at=timezone.now(),
+        error_message='Job interrompido e tentativas esgotadas',
+    )
+    interrupted = list(stale.filter(attempts__lt=MAX_ATTEMPTS).only('id', 'portal'))
+    requeued = stale.filter(attempts__lt=MAX_ATTEMPTS).update(
+        status='pending',
+        claimed_at=None,
+        worker_id=None,
+    )
+    publish_statuses(exhausted, 'failed')
+    publish_statuses(interrupted, 'pending')
+
+    if requeued:
+        logger.warning(f"♻️ {requeued} job(s) interrompido(s) devolvido(s) para a fila")
+    return requeued
+
+
+def execute_job(automation_log, use_driver_pool=True):
+    """
+    Executa a automação de um job já reivindicado e registra o resultado.
+
+    Com ``use_driver_pool`` o navegador vem do pool do portal (se estiver
+    habilitado em ``AUTOMATION_DRIVER_POOL``) e volta para ele ao final.
+    Todos os logs emitidos durante o job levam o id do job e o portal.
+    """
+    with job_context(automation_log.id, automation_log.portal):
+        return _execute_job(automation_log, use_driver_pool)
+
+
+def _execute_job(automation_log, use_driver_pool):
+    from .driver_pool import get_driver_pool
+
+    formulario = automation_log.form_instance
+    driver_pool = get_driver_pool(automation_log.portal) if use_driver_pool else None
+    logger.info(f"🔄 Executando job {automation_log.id} ({automation_log.portal}) para formulário ID: {formulario.id}")
+
+    with recording() as wait_durations, tracking(on_step=step_publisher(automation_log)) as steps:
+        success, error_message = _run_automation(automation_log, formulario, driver_pool)
+
+    # A automação normalmente já atualiza o log; garante um estado final caso não tenha atualizado
+    automation_log.refresh_from_db()
+    final = {}
+    if automation_log.status not in ('completed', 'failed'):
+        final.update(status='completed' if success else 'failed', completed_at=timezone.now())
+        if error_message:
+            final['error_message'] = error_message
+
+    # Durações das esperas nomeadas (atendidas e esgotadas), usadas para calcular os timeouts adaptativos
+    update_instance(
+        automation_log,
+        automation_data={
+            **(automation_log.automation_data or {}),
+            'wait_durations': dict(wait_durations),
+            'wait_timeouts': dict(wait_durations.censored),
+        },
+        steps=steps,
+        **final,
+    )
+    publish_status(automation_log, error=automation_log.error_message)
+
+    if success:
+        logger.info(f"✅ Job {automation_log.id} concluído com sucesso")
+    else:
+        logger.error(f"❌ Job {automation_log.id} falhou")
+    return success
+
+
+def _run_automation(automation_log, formulario, driver_pool):
+    """Executa a automação do portal; retorna ``(sucesso, mensagem de erro)``"""
+    try:
+        if automation_log.portal == 'amil':
+            from .automation_amil import run_amil_automation
+            success = run_amil_automation(automation_log, driver_pool=driver_pool)
+        else:
+            from .automation import run_automation_for_form
+            success = run_automation_for_form(
+                form_data_from_instance(formulario),
+                automation_log,
+                close_browser=True,
+                driver_pool=driver_pool,
+            )
+        return success, None if success else 'Automação falhou'
+    except Exception as e:
+        logger.error(f"💥 Erro no job {automation_log.id}: {e}")
+        return False, str(e)
@@ -0,0 +1,185 @@
+"""
+Localização de campos com cache da estratégia vencedora.
+
+Um campo pode ser encontrado por várias estratégias (name exato, name
+contendo, placeholder, label, ID...). Em vez de testar cada uma com um
+``find_element`` separado, ``find_field`` envia a lista inteira para o
+navegador e recebe, em uma única chamada, o primeiro elemento visível e
+habilitado e qual estratégia o encontrou.
+
+A estratégia vencedora é gravada em ``LocatorStrategy`` por (portal, página,
+campo) e vai para o início da lista nas próximas execuções. Se ela deixar de
+encontrar o campo, as demais são testadas na mesma chamada e o cache é
+atualizado (ou apagado, se nenhuma funcionar).
+"""
+import logging
+import threading
+
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+# Estratégias genéricas ("primeiro input visível") nunca são gravadas no cache
+GENERIC_STRATEGIES = {('css', 'input'), ('xpath', '//input')}
+
+# Funções JavaScript compartilhadas com o preenchimento em lote (``form_fill``):
+# ``locate(strategies)`` retorna ``[índice da estratégia, elemento]`` ou null
+LOCATE_JS = """
+function usable(el) {
+    return el && el.offsetParent !== null && !el.disabled && !el.readOnly;
+}
+function locate(strategies) {
+    for (var i = 0; i < strategies.length; i++) {
+        var by = strategies[i][0], value = strategies[i][1];
+        var nodes = [];
+        try {
+            if (by === 'xpath') {
+                var result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                for (var j = 0; j < result.snapshotLength; j++) nodes.push(result.snapshotItem(j));
+            } else if (by === 'css') {
+                nodes = document.querySelectorAll(value);
+            } else if (by === 'id') {
+                nodes = [document.getElementById(value)];
+            }
+        } catch (e) {
+            continue;
+        }
+        for (var k = 0; k < nodes.length; k++) {
+            if (usable(nodes[k])) return [i, nodes[k]];
+        }
+    }
+    return null;
+}
+"""
+
+FIND_FIELD_SCRIPT = LOCATE_JS + "return locate(arguments[0]);"
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def field_strategies(nome_campo, placeholders=None, name_contains=None, labels=None, generic=False):
+    """Estratégias equivalentes às tentativas de ``encontrar_campo_flexivel``, na mesma ordem"""
+    strategies = [('xpath', f"//input[@name='{nome_campo}']")]
+    if name_contains:
+        strategies.append(('xpath', f"//input[contains(@name, '{name_contains}')]"))
+    for placeholder in placeholders or []:
+        strategies.append(('xpath', f"//input[@placeholder='{placeholder}']"))
+    for label in labels or [nome_campo]:
+        strategies.extend([
+            ('xpath', f"//label[contains(text(), '{label}')]/following-sibling::input"),
+            ('xpath', f"//label[contains(text(), '{label.lower()}')]/following-sibling::input"),
+            ('xpath', f"//label[contains(text(), '{label.upper()}')]/following-sibling::input"),
+            ('xpath', "//label[contains(translate(text(), 'ÁÀÂÃÄÅÆÇÈÉÊËÌÍÎÏÐÑÒÓÔÕÖØÙÚÛÜÝÞßáàâãäåæçèéêëìíîïðñòóôõöøùúûüýþÿ', "
+                      f"'AAAAAAACEEEEIIIIDNOOOOOOUUUUYBsaaaaaaaceeeeiiiidnoooooouuuuyby'), '{label.lower()}')]/following-sibling::input"),
+        ])
+    strategies.append(('id', nome_campo.lower().replace(' ', '_')))
+    if generic:
+        strategies.append(('css', 'input'))
+    return strategies
+
+
+def date_strategies(nome_campo, xpath=None):
+    """Estratégias para campos de data: XPath específico, name, placeholders dd/mm/aaaa, label"""
+    strategies = [('xpath', xpath)] if xpath else []
+    strategies.append(('xpath', f"//input[@name='{nome_campo}']"))
+    for placeholder in ['dd/mm/aaaa', 'DD/MM/AAAA', 'dd/mm/yyyy', 'DD/MM/YYYY']:
+        strategies.append(('xpath', f"//input[@placeholder='{placeholder}']"))
+    strategies.append(('xpath', f"//label[contains(text(), '{nome_campo}')]/following-sibling::input"))
+    strategies.append(('xpath', "//input[contains(@placeholder, 'dd/mm') or contains(@name, 'data') or contains(@name, 'date')]"))
+    return strategies
+
+
+def _key(portal, page, field):
+    return (portal, page, field)
+
+
+def cached_strategy(portal, page, field):
+    """Estratégia gravada para o campo (memória do processo, depois banco) ou None"""
+    key = _key(portal, page, field)
+    with _cache_lock:
+        if key in _cache:
+            return _cache[key]
+
+    strategy = None
+    try:
+        from .models import LocatorStrategy
+        row = LocatorStrategy.objects.filter(portal=portal, page=page, field=field).values_list('by', 'value').first()
+        strategy = tuple(row) if row else None
+    except Exception as e:
+        # Sem banco (scripts avulsos): só o cache em memória
+        logger.debug(f"⚠️ Cache de localizadores indisponível: {e}")
+
+    with _cache_lock:
+        _cache[key] = strategy
+    return strategy
+
+
+def _remember(portal, page, field, strategy, invalidated):
+    with _cache_lock:
+        _cache[_key(portal, page, field)] = strategy
+    try:
+        from .models import LocatorStrategy
+        lookup = {'portal': portal, 'page': page, 'field': field}
+        if strategy is None:
+            LocatorStrategy.objects.filter(**lookup).delete()
+            return
+        updated = LocatorStrategy.objects.filter(**lookup).update(
+            by=strategy[0],
+            value=strategy[1],
+            misses=F('misses') + (1 if invalidated else 0),
+        )
+        if not updated:
+            LocatorStrategy.objects.create(by=strategy[0], value=strategy[1], **lookup)
+    except Exception as e:
+        logger.debug(f"⚠️ Não foi possível gravar o localizador de {field}: {e}")
+
+
+def ordered_strategies(portal, page, field, strategies):
+    """``(estratégias com a do cache primeiro, estratégia em cache ou None)``"""
+    cached = cached_strategy(portal, page, field)
+    ordered = [tuple(s) for s in strategies]
+    if cached:
+        ordered = [cached] + [s for s in ordered if s != cached]
+    return ordered, cached
+
+
+def learn_strategy(portal, page, field, ordered, index, cached):
+    """
+    Atualiza o cache com o resultado de uma busca: ``index`` é a posição em
+    ``ordered`` da estratégia que encontrou o campo (None se nenhuma encontrou)
+    """
+    if index is None:
+        if cached:
+            logger.info(f"🗑️ Localizador de {field} não encontra mais o campo - cache removido")
+            _remember(portal, page, field, None, invalidated=True)
+        return
+
+    winner = ordered[int(index)]
+    if winner == cached:
+        return
+    if winner in GENERIC_STRATEGIES:
+        logger.debug(f"🔍 Campo {field} encontrado apenas por estratégia genérica - não gravada")
+        if cached:
+            _remember(portal, page, field, None, invalidated=True)
+    else:
+        if cached:
+            logger.info(f"♻️ Localizador de {field} mudou: {cached[1]} -> {winner[1]}")
+        _remember(portal, page, field, winner, invalidated=cached is not None)
+
+
+def find_field(driver, portal, page, field, strategies):
+    """
+    Primeiro elemento visível e habilitado encontrado pelas ``strategies``
+    (lista de ``(by, value)`` com by em xpath/css/id), tentando antes a
+    estratégia em cache. Uma única chamada ao navegador. Retorna o elemento ou None.
+    """
+    ordered, cached = ordered_strategies(portal, page, field, strategies)
+    found = driver.execute_script(FIND_FIELD_SCRIPT, [list(s) for s in ordered])
+    if not found:
+        learn_strategy(portal, page, field, ordered, None, cached)
+        return None
+
+    index, element = found
+    learn_strategy(portal, page, field, ordered, index, cached)
+    return element
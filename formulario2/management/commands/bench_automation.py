@@ -0,0 +1,184 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test.utils import override_settings
+from django.utils import timezone
+from formulario2.automation_config import BEHAVIOR, CHROME_OPTIONS, URLS
+from formulario2.bench import ResourceSampler, build_report, compare_reports, create_bench_jobs, format_summary
+from formulario2.driver_pool import get_pool_config
+from formulario2.fake_portal import FakePortal, make_threaded_server, serve_in_background, use_fake_portal
+from formulario2.models import AutomationLog
+from formulario2.structured_logging import configure_logging
+from formulario2.worker import AutomationWorkerPool
+from pathlib import Path
+from urllib.parse import urlsplit
+import json
+import os
+import tempfile
+import time
+
+
+class Command(BaseCommand):
+    help = 'Mede o throughput das automações: executa N jobs com concorrência C (por padrão contra o portal de testes) e gera um relatório'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--portal', choices=['porto', 'amil'], default='porto', help='Portal automatizado (padrão: porto)')
+        parser.add_argument('--jobs', type=int, default=10, help='Número de jobs (padrão: 10)')
+        parser.add_argument('--concurrency', type=int, default=2, help='Jobs simultâneos (padrão: 2)')
+        parser.add_argument(
+            '--no-driver-pool',
+            action='store_true',
+            help='Inicia um Chrome novo por job em vez de reutilizar navegadores do pool',
+        )
+        parser.add_argument(
+            '--no-session-reuse',
+            action='store_true',
+            help='Faz login em todos os jobs (BEHAVIOR["reuse_session"] desligado)',
+        )
+        parser.add_argument('--headless', action='store_true', help='Executar o Chrome em modo headless')
+        parser.add_argument(
+            '--portal-url',
+            default=None,
+            help='URL de um portal de testes já em execução (padrão: sobe um em segundo plano, numa porta livre)',
+        )
+        parser.add_argument('--latency', type=float, default=0.2, help='Latência das páginas do portal de testes (padrão: 0.2s)')
+        parser.add_argument('--jitter', type=float, default=0.1, help='Variação aleatória da latência (padrão: 0.1s)')
+        parser.add_argument('--api-latency', type=float, default=0.5, help='Latência das APIs do portal de testes (padrão: 0.5s)')
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='Arquivo do relatório JSON (padrão: benchmarks/bench-<portal>-<data>.json)',
+        )
+        parser.add_argument('--baseline', default=None, help='Relatório JSON anterior para comparação')
+        parser.add_argument(
+            '--max-regression',
+            type=float,
+            default=None,
+            help='Falha (código de saída 1) se jobs/min ou algum p95 piorar mais que N%% em relação ao --baseline',
+        )
+        parser.add_argument('--keep', action='store_true', help='Mantém os formulários e jobs do benchmark no banco')
+        parser.add_argument('--log-level', default='WARNING', help='Nível dos logs das automações (padrão: WARNING)')
+
+    def handle(self, *args, **options):
+        portal = options['portal']
+        if options['jobs'] < 1 or options['concurrency'] < 1:
+            raise CommandError('--jobs e --concurrency devem ser maiores que zero')
+        if options['max_regression'] is not None and not options['baseline']:
+            raise CommandError('--max-regression exige --baseline')
+        # O worker do benchmark reivindicaria jobs que não são dele
+        if AutomationLog.objects.filter(status='pending').exists():
+            raise CommandError('Há jobs pendentes na fila: rode o benchmark com a fila vazia (ou em um banco separado)')
+
+        configure_logging(level=options['log_level'], fmt='text')
+
+        servers = []
+        try:
+            portal_url = options['portal_url']
+            if not portal_url:
+                server = make_threaded_server(FakePortal(
+                    latency=options['latency'], jitter=options['jitter'], api_latency=options['api_latency'],
+                ))
+                servers.append(server)
+                portal_url = serve_in_background(server)
+            use_fake_portal(portal_url)
+
+            # Com BEHAVIOR['fetch_record_via_api'] as automações consultam a API do Django: servida aqui mesmo, no mesmo banco
+            api_server = make_threaded_server(get_wsgi_application())
+            servers.append(api_server)
+            api_netloc = urlsplit(serve_in_background(api_server)).netloc
+            for key in ('api_endpoint', 'api_amil'):
+                URLS[key] = urlsplit(URLS[key])._replace(netloc=api_netloc).geturl()
+
+            CHROME_OPTIONS['headless'] = options['headless']
+            BEHAVIOR['reuse_session'] = not options['no_session_reuse']
+
+            config = {
+                'portal': portal,
+                'jobs': options['jobs'],
+                'concurrency': options['concurrency'],
+                'driver_pool': not options['no_driver_pool'],
+                'reuse_session': not options['no_session_reuse'],
+                'headless': options['headless'],
+                'portal_url': options['portal_url'] or 'fake_portal',
+                'latency': None if options['portal_url'] else options['latency'],
+                'jitter': None if options['portal_url'] else options['jitter'],
+                'api_latency': None if options['portal_url'] else options['api_latency'],
+            }
+            self.stdout.write(self.style.SUCCESS(
+                f"🏁 Benchmark {portal}: {options['jobs']} job(s), concorrência {options['concurrency']}, portal em {portal_url}"
+            ))
+
+            report = self.run_bench(portal, options, config)
+        finally:
+            for server in servers:
+                server.shutdown()
+                server.server_close()
+
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmarks' / (
+            f"bench-{portal}-{timezone.now().strftime('%Y%m%d-%H%M%S')}.json"
+        ))
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+
+        for line in format_summary(report):
+            self.stdout.write(line)
+        self.stdout.write(f'💾 Relatório salvo em: {output}')
+
+        if options['baseline']:
+            self.compare(report, options['baseline'], options['max_regression'])
+
+    def run_bench(self, portal, options, config):
+        """Enfileira os jobs, processa com o pool do worker e devolve o relatório"""
+        concurrency = {choice: 0 for choice, _ in AutomationLog.PORTAL_CHOICES}
+        concurrency[portal] = options['concurrency']
+        pool_config = {**get_pool_config(), 'size': {portal: options['concurrency']}}
+
+        forms = create_bench_jobs(portal, options['jobs'])
+        field = 'formulario_amil' if portal == 'amil' else 'formulario'
+        log_ids = list(AutomationLog.objects.filter(**{f'{field}__in': forms}).values_list('id', flat=True))
+
+        sampler = ResourceSampler()
+        # Sessões salvas em diretório temporário: não misturar com os cookies dos portais reais
+        with tempfile.TemporaryDirectory() as session_dir, \
+                override_settings(AUTOMATION_SESSION_DIR=session_dir, AUTOMATION_DRIVER_POOL=pool_config):
+            pool = AutomationWorkerPool(
+                f'bench-{os.getpid()}',
+                concurrency=concurrency,
+                use_driver_pool=not options['no_driver_pool'],
+            )
+            sampler.start()
+            started = time.monotonic()
+            try:
+                pool.run(poll_interval=0.2, once=True)
+            finally:
+                pool.shutdown(wait=True)
+                wall_seconds = time.monotonic() - started
+                sampler.stop()
+
+        report = build_report(log_ids, wall_seconds, config, sampler)
+
+        if not options['keep']:
+            # Apaga os formulários (e, em cascata, os jobs): não entram nos timeouts adaptativos nem nas métricas
+            type(forms[0]).objects.filter(pk__in=[formulario.pk for formulario in forms]).delete()
+        return report
+
+    def compare(self, report, baseline_path, max_regression):
+        try:
+            baseline = json.loads(Path(baseline_path).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Não foi possível ler o baseline {baseline_path}: {e}')
+
+        if baseline.get('config') != report['config']:
+            self.stdout.write(self.style.WARNING('⚠️ Configuração diferente da do baseline: comparação apenas indicativa'))
+
+        self.stdout.write(f"📈 Comparação com {baseline_path} (commit {baseline.get('commit') or '?'}; positivo = pior):")
+        regressions = []
+        for metric, before, after, change in compare_reports(report, baseline):
+            flag = max_regression is not None and change > max_regression
+            line = f'   {metric}: {before} → {after} ({change:+.1f}%)'
+            self.stdout.write(self.style.ERROR(line) if flag else line)
+            if flag:
+                regressions.append(metric)
+
+        if regressions:
+            raise CommandError(f"Regressão acima de {max_regression}% em: {', '.join(regressions)}")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from formulario2.models import StepTimeout
+from formulario2.step_timeouts import get_step_timeout_config, refresh_step_timeouts
+
+class Command(BaseCommand):
+    help = 'Recalcula os timeouts adaptativos de cada passo (p99 × multiplicador) a partir dos jobs recentes'
+
+    def handle(self, *args, **options):
+        config = get_step_timeout_config()
+        self.stdout.write(
+            f"⏱️ p{config['percentile']} × {config['multiplier']} (entre {config['min']}s e {config['max']}s), "
+            f"mínimo de {config['min_samples']} amostras nos últimos {config['window']} jobs"
+        )
+
+        refresh_step_timeouts()
+
+        for step_timeout in StepTimeout.objects.all():
+            self.stdout.write(
+                f'  {step_timeout.step}: {step_timeout.timeout:.1f}s '
+                f'(p99 {step_timeout.p99:.1f}s, {step_timeout.samples} amostras)'
+            )
+        self.stdout.write(self.style.SUCCESS(f'✅ {StepTimeout.objects.count()} passo(s) com timeout adaptativo'))
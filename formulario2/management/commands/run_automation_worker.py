@@ -0,0 +1,100 @@
+from django.core.management.base import BaseCommand, CommandError
+from formulario2.structured_logging import configure_logging
+from formulario2.worker import AutomationWorkerPool
+import logging
+import os
+import socket
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Executa o worker que processa a fila de automações (AutomationLog pendentes)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--worker-id',
+            default=f'{socket.gethostname()}-{os.getpid()}',
+            help='Identificador do worker, único entre os workers em execução (padrão: hostname-pid)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Segundos de espera quando a fila está vazia (padrão: 2)',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=3600,
+            help='Reenfileira jobs "running" de qualquer worker reivindicados há mais de N segundos (padrão: 3600)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            action='append',
+            default=[],
+            metavar='PORTAL=N',
+            help='Sobrescreve AUTOMATION_CONCURRENCY para um portal (ex: --concurrency porto=2 --concurrency amil=1)',
+        )
+        parser.add_argument(
+            '--no-driver-pool',
+            action='store_true',
+            help='Inicia um Chrome novo por job em vez de reutilizar navegadores do pool',
+        )
+        parser.add_argument(
+            '--log-level',
+            default=None,
+            help='Nível dos logs (padrão: LOGGING["level"] de automation_config; DEBUG inclui listagens de campos e opções)',
+        )
+        parser.add_argument(
+            '--log-format',
+            choices=['json', 'text'],
+            default=None,
+            help='Formato dos logs (padrão: LOGGING["format"] de automation_config)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Processa os jobs pendentes e encerra quando a fila esvaziar',
+        )
+
+    def handle(self, *args, **options):
+        worker_id = options['worker_id']
+        configure_logging(level=options['log_level'], fmt=options['log_format'])
+        self.stdout.write(
+            self.style.SUCCESS(f'🤖 Worker de automação iniciado: {worker_id} (pid {os.getpid()})')
+        )
+
+        # Jobs "running" de workers que pararam de publicar o próprio estado (processo morto) voltam para a
+        # fila ao iniciar e depois periodicamente, no loop do pool
+        pool = AutomationWorkerPool(
+            worker_id,
+            concurrency=self.parse_concurrency(options['concurrency']),
+            use_driver_pool=not options['no_driver_pool'],
+            stale_after=options['stale_after'],
+        )
+        requeued = pool.requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(self.style.WARNING(f'♻️ {requeued} job(s) interrompido(s) devolvido(s) para a fila'))
+
+        limits = ', '.join(f'{portal}={limit}' for portal, limit in pool.concurrency.items())
+        self.stdout.write(f'⚙️ Concorrência por portal: {limits}')
+
+        try:
+            pool.run(poll_interval=options['poll_interval'], once=options['once'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('🛑 Worker interrompido - aguardando jobs em execução...'))
+        finally:
+            pool.shutdown(wait=True)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'🏁 Worker encerrado - {pool.processed} job(s) processado(s)')
+        )
+
+    def parse_concurrency(self, values):
+        overrides = {}
+        for value in values:
+            portal, sep, limit = value.partition('=')
+            if not sep or not limit.isdigit():
+                raise CommandError(f'Valor inválido para --concurrency: {value!r} (use PORTAL=N)')
+            overrides[portal.strip()] = int(limit)
+        return overrides
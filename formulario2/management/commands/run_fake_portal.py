@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from formulario2.fake_portal import make_fake_portal_server, portal_urls
+
+
+class Command(BaseCommand):
+    help = 'Sobe o portal de testes local (imitação da Porto Seguro e da Amil) para rodar as automações sem os portais reais'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Endereço de escuta (padrão: 127.0.0.1)')
+        parser.add_argument('--port', type=int, default=8765, help='Porta (padrão: 8765)')
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.2,
+            help='Segundos de espera em cada página (padrão: 0.2)',
+        )
+        parser.add_argument(
+            '--jitter',
+            type=float,
+            default=0.1,
+            help='Até N segundos aleatórios somados a cada espera (padrão: 0.1)',
+        )
+        parser.add_argument(
+            '--api-latency',
+            type=float,
+            default=0.5,
+            help='Segundos de espera nas chamadas de API das páginas: autocomplete, login da Amil, contratos (padrão: 0.5)',
+        )
+
+    def handle(self, *args, **options):
+        server = make_fake_portal_server(
+            options['host'], options['port'],
+            latency=options['latency'], jitter=options['jitter'], api_latency=options['api_latency'],
+        )
+        base_url = f"http://{options['host']}:{options['port']}"
+
+        self.stdout.write(self.style.SUCCESS(f'🧪 Portal de testes em {base_url}/'))
+        self.stdout.write(
+            f"   latência: {options['latency']}s (+ até {options['jitter']}s), API: {options['api_latency']}s"
+        )
+        self.stdout.write(f'   Aponte as automações para ele com AUTOMATION_FAKE_PORTAL_URL={base_url}')
+        for key, url in portal_urls(base_url).items():
+            self.stdout.write(f'     {key}: {url}')
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write('\n🛑 Portal de testes encerrado')
+        finally:
+            server.server_close()
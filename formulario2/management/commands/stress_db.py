@@ -0,0 +1,137 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from formulario2.bench import create_bench_jobs, summarize
+from formulario2.db import is_locked_error, update_instance
+from formulario2.events import publish_statuses, step_publisher
+from formulario2.jobs import claim_next_job, enqueue_automation, pending_jobs
+from formulario2.models import AutomationEvent, AutomationLog, Formulario2, FormularioAmil
+from collections import Counter
+from datetime import timedelta
+import random
+import threading
+import time
+
+
+class Command(BaseCommand):
+    help = 'Teste de carga do banco: N escritores (ciclo de vida dos jobs) e M leitores (fila, APIs, eventos) simultâneos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8, help='Threads escrevendo como os workers (padrão: 8)')
+        parser.add_argument('--readers', type=int, default=4, help='Threads lendo como o servidor web (padrão: 4)')
+        parser.add_argument('--duration', type=float, default=10, help='Duração em segundos (padrão: 10)')
+        parser.add_argument('--portal', choices=['porto', 'amil'], default='porto', help='Portal dos jobs de teste (padrão: porto)')
+        parser.add_argument('--keep', action='store_true', help='Mantém os formulários e jobs do teste no banco')
+
+    def handle(self, *args, **options):
+        if options['writers'] < 1 or options['readers'] < 0 or options['duration'] <= 0:
+            raise CommandError('--writers e --duration devem ser maiores que zero (e --readers não negativo)')
+        # Os escritores reivindicariam jobs que não são deles
+        if AutomationLog.objects.filter(status='pending').exists():
+            raise CommandError('Há jobs pendentes na fila: rode o teste com a fila vazia (ou em um banco separado)')
+
+        portal = options['portal']
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                journal_mode = cursor.execute('PRAGMA journal_mode').fetchone()[0]
+            self.stdout.write(f'🗄️ SQLite, journal_mode={journal_mode}, timeout={connection.settings_dict["OPTIONS"].get("timeout", 5)}s')
+
+        forms = create_bench_jobs(portal, options['writers'] * 2)
+        self.latencies = {'write': [], 'read': []}
+        self.errors = Counter()
+        self.lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        threads = [
+            threading.Thread(target=self.writer, args=(f'stress-{i}', portal, forms, deadline), name=f'stress-writer_{i}')
+            for i in range(options['writers'])
+        ] + [
+            threading.Thread(target=self.reader, args=(portal, deadline), name=f'stress-reader_{i}')
+            for i in range(options['readers'])
+        ]
+        self.stdout.write(self.style.SUCCESS(
+            f"🏁 {options['writers']} escritor(es) e {options['readers']} leitor(es) por {options['duration']}s"
+        ))
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        try:
+            self.report(elapsed)
+        finally:
+            if not options['keep']:
+                # Apaga os formulários (e, em cascata, os jobs e eventos do teste)
+                type(forms[0]).objects.filter(pk__in=[formulario.pk for formulario in forms]).delete()
+
+        if self.errors['locked']:
+            raise CommandError(f"{self.errors['locked']} operação(ões) falharam com 'database is locked'")
+
+    def timed(self, kind, func, *args, **kwargs):
+        started = time.monotonic()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            with self.lock:
+                self.errors['locked' if is_locked_error(e) else type(e).__name__] += 1
+            return None
+        with self.lock:
+            self.latencies[kind].append(time.monotonic() - started)
+        return result
+
+    def writer(self, worker_id, portal, forms, deadline):
+        """Mesmas escritas de um job no worker: reivindica, publica os passos e grava o resultado"""
+        try:
+            while time.monotonic() < deadline:
+                automation_log = self.timed('write', claim_next_job, worker_id, portal)
+                if automation_log is None:
+                    self.timed('write', enqueue_automation, random.choice(forms))
+                    continue
+                on_step = step_publisher(automation_log)
+                steps = []
+                for name in ('stress.abrir_portal', 'stress.preencher'):
+                    record = {'name': name, 'outcome': 'ok', 'duration': 0.0, 'retries': 0}
+                    if on_step:
+                        self.timed('write', on_step, record, 'started')
+                        self.timed('write', on_step, record, 'finished')
+                    steps.append(record)
+                self.timed('write', update_instance, automation_log, steps=steps)
+                self.timed('write', update_instance, automation_log, status='completed', completed_at=timezone.now())
+                self.timed('write', publish_statuses, [automation_log])
+        finally:
+            connection.close()
+
+    def reader(self, portal, deadline):
+        """Leituras do servidor web: fila, página da API, eventos novos (SSE) e vazão do /metrics"""
+        model = FormularioAmil if portal == 'amil' else Formulario2
+        last_event_id = 0
+        try:
+            while time.monotonic() < deadline:
+                self.timed('read', list, pending_jobs(portal))
+                self.timed('read', list, model.objects.order_by('-id').values()[:100])
+                events = self.timed('read', list, AutomationEvent.objects.filter(id__gt=last_event_id).order_by('id').values_list('id', flat=True)[:500])
+                if events:
+                    last_event_id = events[-1]
+                self.timed('read', AutomationLog.objects.filter(
+                    status__in=('completed', 'failed'), completed_at__gte=timezone.now() - timedelta(seconds=300),
+                ).count)
+        finally:
+            connection.close()
+
+    def report(self, elapsed):
+        for kind, label in (('write', 'Escritas'), ('read', 'Leituras')):
+            stats = summarize(self.latencies[kind])
+            if not stats['count']:
+                self.stdout.write(f'   {label}: nenhuma')
+                continue
+            self.stdout.write(
+                f"   {label}: {stats['count']} ({stats['count'] / elapsed:.0f}/s), "
+                f"p50 {stats['p50'] * 1000:.1f}ms, p95 {stats['p95'] * 1000:.1f}ms, "
+                f"p99 {stats['p99'] * 1000:.1f}ms, máx {stats['max'] * 1000:.1f}ms"
+            )
+        if self.errors:
+            self.stdout.write(self.style.ERROR(f"   Erros: {dict(self.errors)}"))
+        else:
+            self.stdout.write(self.style.SUCCESS('   ✅ Nenhum erro'))
@@ -1,6 +1,7 @@
 from django.core.management.base import BaseCommand
 from formulario2.automation import run_automation_for_form
 from formulario2.automation_config import TEST_DATA
+from formulario2.structured_logging import configure_logging
 import logging
 
 logger = logging.getLogger(__name__)
@@ -91,7 +92,8 @@ class Command(BaseCommand):
         if options['close_browser']:
             self.stdout.write('⚠️ Opção --close-browser ignorada - navegador permanecerá aberto')
         
-        # Executar automação
+        # Executar automação (logs legíveis no terminal)
+        configure_logging(fmt='text')
         try:
             success = run_automation_for_form(form_data)
             
@@ -0,0 +1,189 @@
+"""
+Métricas das automações no formato texto do Prometheus (``GET /metrics``).
+
+Tudo é calculado a partir do banco a cada coleta, sem serviço externo:
+
+* ``automation_jobs`` — jobs por portal e status (fila);
+* ``automation_jobs_per_minute`` — jobs finalizados por minuto na janela ``throughput_window``;
+* ``automation_worker_slots`` / ``automation_browser_pool_*`` — vagas e navegadores de cada worker
+  ativo (publicados pelo worker em ``WorkerStatus``);
+* ``automation_job_duration_seconds`` e ``automation_step_duration_seconds`` — histogramas da
+  duração dos jobs e de cada passo (``AutomationLog.steps``) nos ``window`` jobs mais recentes.
+
+Os histogramas cobrem uma janela deslizante, não o total desde sempre: use ``*_sum``/``*_count``
+e os buckets diretamente (ex: ``histogram_quantile`` sobre o valor atual), sem ``rate()``.
+
+Configuração em ``settings.AUTOMATION_METRICS``.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS_CONFIG = {
+    'token': None,  # se definido, exigido em "Authorization: Bearer <token>" ou ?token=
+    'window': 500,  # jobs mais recentes usados nos histogramas
+    'throughput_window': 300,  # segundos considerados no cálculo de jobs por minuto
+    'worker_stale_after': 60,  # workers sem publicar há mais que isso (segundos) são ignorados
+    'worker_status_interval': 5,  # segundos entre publicações do estado do worker
+    'buckets': [0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300],  # segundos
+}
+
+
+def get_metrics_config():
+    config = dict(DEFAULT_METRICS_CONFIG)
+    config.update(getattr(settings, 'AUTOMATION_METRICS', {}))
+    return config
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Exposition:
+    """Acumula as linhas da exposição (HELP/TYPE uma vez por métrica)"""
+
+    def __init__(self):
+        self.lines = []
+
+    def header(self, name, kind, help_text):
+        self.lines.append(f'# HELP {name} {help_text}')
+        self.lines.append(f'# TYPE {name} {kind}')
+
+    def sample(self, name, value, **labels):
+        self.lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+    def histogram(self, name, help_text, observations, buckets):
+        """``observations``: ``{(('label', 'valor'), ...): [segundos, ...]}``"""
+        self.header(name, 'histogram', help_text)
+        for label_items, values in sorted(observations.items()):
+            labels = dict(label_items)
+            for bound in list(buckets) + [float('inf')]:
+                count = sum(1 for value in values if value <= bound)
+                le = '+Inf' if bound == float('inf') else _format_value(float(bound))
+                self.sample(f'{name}_bucket', count, **labels, le=le)
+            self.sample(f'{name}_sum', round(sum(values), 3), **labels)
+            self.sample(f'{name}_count', len(values), **labels)
+
+    def render(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+def _collect_queue(out, now, config):
+    from .models import AutomationLog
+
+    portals = [portal for portal, _ in AutomationLog.PORTAL_CHOICES]
+    statuses = [status for status, _ in AutomationLog.STATUS_CHOICES]
+
+    counts = {
+        (row['portal'], row['status']): row['total']
+        for row in AutomationLog.objects.values('portal', 'status').annotate(total=Count('id'))
+    }
+    out.header('automation_jobs', 'gauge', 'Jobs de automação por portal e status')
+    for portal in portals:
+        for status in statuses:
+            out.sample('automation_jobs', counts.get((portal, status), 0), portal=portal, status=status)
+
+    window = config['throughput_window']
+    finished = dict(
+        AutomationLog.objects
+        .filter(status__in=['completed', 'failed'], completed_at__gte=now - timedelta(seconds=window))
+        .values_list('portal')
+        .annotate(total=Count('id'))
+    )
+    out.header('automation_jobs_per_minute', 'gauge', f'Jobs finalizados por minuto nos últimos {window}s')
+    for portal in portals:
+        out.sample('automation_jobs_per_minute', round(finished.get(portal, 0) * 60 / window, 3), portal=portal)
+
+
+def _collect_workers(out, now, config):
+    from .models import WorkerStatus
+
+    workers = WorkerStatus.objects.filter(updated_at__gte=now - timedelta(seconds=config['worker_stale_after']))
+
+    out.header('automation_workers', 'gauge', 'Workers ativos (publicaram o estado recentemente)')
+    out.sample('automation_workers', workers.count())
+
+    slots, pools = [], []
+    for worker in workers:
+        for portal, limit in (worker.concurrency or {}).items():
+            slots.append((worker.worker_id, portal, (worker.running or {}).get(portal, 0), limit))
+        for stats in worker.driver_pools or []:
+            pools.append((worker.worker_id, stats))
+
+    out.header('automation_worker_slots_in_use', 'gauge', 'Jobs em execução por worker e portal')
+    for worker_id, portal, running, _ in slots:
+        out.sample('automation_worker_slots_in_use', running, worker=worker_id, portal=portal)
+    out.header('automation_worker_slots', 'gauge', 'Limite de jobs simultâneos por worker e portal')
+    for worker_id, portal, _, limit in slots:
+        out.sample('automation_worker_slots', limit, worker=worker_id, portal=portal)
+
+    for key, help_text in [
+        ('in_use', 'Navegadores do pool em uso'),
+        ('idle', 'Navegadores do pool ociosos (prontos)'),
+        ('size', 'Navegadores ociosos mantidos pelo pool'),
+    ]:
+        name = f'automation_browser_pool_{key}'
+        out.header(name, 'gauge', help_text)
+        for worker_id, stats in pools:
+            out.sample(name, stats.get(key, 0), worker=worker_id, portal=stats.get('portal', ''))
+
+
+def _collect_durations(out, config):
+    from .models import AutomationLog
+
+    recent = (
+        AutomationLog.objects
+        .filter(status__in=['completed', 'failed'], completed_at__isnull=False)
+        .order_by('-id')
+        .values_list('portal', 'status', 'claimed_at', 'completed_at', 'steps')[:config['window']]
+    )
+
+    jobs = defaultdict(list)
+    steps = defaultdict(list)
+    for portal, status, claimed_at, completed_at, job_steps in recent:
+        if claimed_at:
+            jobs[(('portal', portal), ('status', status))].append((completed_at - claimed_at).total_seconds())
+        for record in job_steps or []:
+            if record.get('duration') is not None:
+                steps[(('portal', portal), ('step', record['name']))].append(record['duration'])
+
+    out.histogram(
+        'automation_job_duration_seconds',
+        'Duração dos jobs (reivindicação até o fim) nos jobs mais recentes',
+        jobs, config['buckets'],
+    )
+    out.histogram(
+        'automation_step_duration_seconds',
+        'Duração de cada passo da automação nos jobs mais recentes',
+        steps, config['buckets'],
+    )
+
+
+def render_metrics():
+    """Texto da exposição Prometheus com todas as métricas"""
+    config = get_metrics_config()
+    now = timezone.now()
+    out = _Exposition()
+    _collect_queue(out, now, config)
+    _collect_workers(out, now, config)
+    _collect_durations(out, config)
+    return out.render()
+
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formulario2', '0005_alter_formularioamil_nacionalidade'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='automationlog',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0, verbose_name='Tentativas'),
+        ),
+        migrations.AddField(
+            model_name='automationlog',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Reivindicado em'),
+        ),
+        migrations.AddField(
+            model_name='automationlog',
+            name='worker_id',
+            field=models.CharField(blank=True, max_length=100, null=True, verbose_name='Worker'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formulario2', '0006_automationlog_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='automationlog',
+            name='formulario_amil',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='automation_logs', to='formulario2.formularioamil'),
+        ),
+        migrations.AddField(
+            model_name='automationlog',
+            name='portal',
+            field=models.CharField(choices=[('porto', 'Porto Seguro'), ('amil', 'Amil')], default='porto', max_length=10, verbose_name='Portal'),
+        ),
+        migrations.AlterField(
+            model_name='automationlog',
+            name='formulario',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='automation_logs', to='formulario2.formulario2'),
+        ),
+    ]
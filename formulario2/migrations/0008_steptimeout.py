@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formulario2', '0007_automationlog_portal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StepTimeout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('step', models.CharField(max_length=100, unique=True, verbose_name='Passo')),
+                ('timeout', models.FloatField(verbose_name='Timeout (s)')),
+                ('p99', models.FloatField(verbose_name='p99 (s)')),
+                ('samples', models.PositiveIntegerField(default=0, verbose_name='Amostras')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Timeout de Passo',
+                'verbose_name_plural': 'Timeouts de Passos',
+                'ordering': ['step'],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formulario2', '0008_steptimeout'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LocatorStrategy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('portal', models.CharField(choices=[('porto', 'Porto Seguro'), ('amil', 'Amil')], max_length=10, verbose_name='Portal')),
+                ('page', models.CharField(max_length=100, verbose_name='Página')),
+                ('field', models.CharField(max_length=100, verbose_name='Campo')),
+                ('by', models.CharField(max_length=10, verbose_name='Tipo')),
+                ('value', models.TextField(verbose_name='Seletor')),
+                ('misses', models.PositiveIntegerField(default=0, verbose_name='Invalidações')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Estratégia de Localização',
+                'verbose_name_plural': 'Estratégias de Localização',
+                'ordering': ['portal', 'page', 'field'],
+                'unique_together': {('portal', 'page', 'field')},
+            },
+        ),
+    ]
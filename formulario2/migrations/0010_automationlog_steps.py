@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formulario2', '0009_locatorstrategy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='automationlog',
+            name='steps',
+            field=models.JSONField(blank=True, default=list, verbose_name='Passos'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formulario2', '0010_automationlog_steps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkerStatus',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('worker_id', models.CharField(max_length=100, unique=True, verbose_name='Worker')),
+                ('running', models.JSONField(blank=True, default=dict, verbose_name='Jobs em execução')),
+                ('concurrency', models.JSONField(blank=True, default=dict, verbose_name='Limite por portal')),
+                ('driver_pools', models.JSONField(blank=True, default=list, verbose_name='Pools de navegadores')),
+                ('processed', models.PositiveIntegerField(default=0, verbose_name='Jobs processados')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Status de Worker',
+                'verbose_name_plural': 'Status dos Workers',
+                'ordering': ['worker_id'],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:45
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formulario2', '0011_workerstatus'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='formulario2',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='formulario2',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
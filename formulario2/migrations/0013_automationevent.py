@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formulario2', '0012_formulario2_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AutomationEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('portal', models.CharField(choices=[('porto', 'Porto Seguro'), ('amil', 'Amil')], max_length=10, verbose_name='Portal')),
+                ('kind', models.CharField(choices=[('status', 'Status'), ('step', 'Passo')], max_length=10, verbose_name='Tipo')),
+                ('status', models.CharField(choices=[('pending', 'Pendente'), ('running', 'Executando'), ('completed', 'Concluído'), ('failed', 'Falhou')], max_length=20, verbose_name='Status')),
+                ('step', models.CharField(blank=True, default='', max_length=100, verbose_name='Passo')),
+                ('data', models.JSONField(blank=True, default=dict, verbose_name='Dados')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Criado em')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='formulario2.automationlog', verbose_name='Job')),
+            ],
+            options={
+                'verbose_name': 'Evento de Automação',
+                'verbose_name_plural': 'Eventos de Automação',
+                'ordering': ['id'],
+            },
+        ),
+    ]
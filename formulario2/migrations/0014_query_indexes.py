@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:47
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('formulario2', '0013_automationevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='formulario2',
+            name='cpf_digits',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(models.F('cpf'), models.Value('.'), models.Value('')), models.Value('-'), models.Value('')), models.Value(' '), models.Value('')), output_field=models.CharField(max_length=14)),
+        ),
+        migrations.AddField(
+            model_name='formularioamil',
+            name='cpf_digits',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(models.F('cpf'), models.Value('.'), models.Value('')), models.Value('-'), models.Value('')), models.Value(' '), models.Value('')), output_field=models.CharField(max_length=14)),
+        ),
+        migrations.AddIndex(
+            model_name='automationlog',
+            index=models.Index(fields=['status', 'portal', 'started_at'], name='automationlog_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='automationlog',
+            index=models.Index(fields=['status', 'started_at'], name='automationlog_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='automationlog',
+            index=models.Index(fields=['started_at'], name='automationlog_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='automationlog',
+            index=models.Index(fields=['status', 'completed_at'], name='automationlog_finished_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='formulario2',
+            index=models.Index(fields=['cpf_digits'], name='formulario2_cpf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='formulario2',
+            index=models.Index(fields=['updated_at'], name='formulario2_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='formularioamil',
+            index=models.Index(fields=['created_at'], name='formularioamil_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='formularioamil',
+            index=models.Index(fields=['cpf_digits'], name='formularioamil_cpf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='formularioamil',
+            index=models.Index(fields=['updated_at'], name='formularioamil_updated_idx'),
+        ),
+    ]
@@ -1,4 +1,15 @@
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Replace
+
+
+def cpf_digits(field='cpf'):
+    """CPF só com dígitos (sem pontos, traço e espaços), calculado pelo banco"""
+    expression = F(field)
+    for char in ('.', '-', ' '):
+        expression = Replace(expression, Value(char), Value(''))
+    return expression
+
 
 class Formulario2(models.Model):
     GENERO_CHOICES = [
@@ -29,12 +40,22 @@ class Formulario2(models.Model):
     email = models.EmailField(verbose_name="Email")
     nomeMae = models.CharField(max_length=100, verbose_name="Nome da Mãe")
     
+    # Campos de metadados
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # CPF normalizado (coluna gerada pelo banco, indexada): busca exata pelo CPF em qualquer formato
+    cpf_digits = models.GeneratedField(expression=cpf_digits(), output_field=models.CharField(max_length=14), db_persist=True)
+    
     def __str__(self):
         return self.nomeCompleto
     
     class Meta:
         verbose_name = "Formulário Porto"
         verbose_name_plural = "Formulários Porto"
+        indexes = [
+            models.Index(fields=['cpf_digits'], name='formulario2_cpf_idx'),
+            models.Index(fields=['updated_at'], name='formulario2_updated_idx'),  # Last-Modified da API
+        ]
 
 class FormularioAmil(models.Model):
     GENERO_CHOICES = [
@@ -76,6 +97,8 @@ class FormularioAmil(models.Model):
     # Campos de metadados
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # CPF normalizado (coluna gerada pelo banco, indexada): busca exata pelo CPF em qualquer formato
+    cpf_digits = models.GeneratedField(expression=cpf_digits(), output_field=models.CharField(max_length=14), db_persist=True)
     
     def __str__(self):
         return self.nome
@@ -84,6 +107,11 @@ class FormularioAmil(models.Model):
         verbose_name = "Formulário Amil"
         verbose_name_plural = "Formulários Amil"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at'], name='formularioamil_created_idx'),  # listas e API (-created_at, -id)
+            models.Index(fields=['cpf_digits'], name='formularioamil_cpf_idx'),
+            models.Index(fields=['updated_at'], name='formularioamil_updated_idx'),  # Last-Modified da API
+        ]
 
 class AutomationLog(models.Model):
     """Modelo para armazenar logs de automação"""
@@ -94,20 +122,123 @@ class AutomationLog(models.Model):
         ('failed', 'Falhou'),
     ]
     
-    formulario = models.ForeignKey(Formulario2, on_delete=models.CASCADE, related_name='automation_logs')
+    PORTAL_CHOICES = [
+        ('porto', 'Porto Seguro'),
+        ('amil', 'Amil'),
+    ]
+    
+    portal = models.CharField(max_length=10, choices=PORTAL_CHOICES, default='porto', verbose_name="Portal")
+    formulario = models.ForeignKey(Formulario2, on_delete=models.CASCADE, related_name='automation_logs', blank=True, null=True)
+    formulario_amil = models.ForeignKey(FormularioAmil, on_delete=models.CASCADE, related_name='automation_logs', blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     started_at = models.DateTimeField(auto_now_add=True)
     completed_at = models.DateTimeField(null=True, blank=True)
+
+    # Campos de controle da fila (preenchidos pelo worker ao reivindicar o job)
+    claimed_at = models.DateTimeField(null=True, blank=True, verbose_name="Reivindicado em")
+    worker_id = models.CharField(max_length=100, blank=True, null=True, verbose_name="Worker")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Tentativas")
+
     log_file_path = models.CharField(max_length=500, blank=True, null=True)
     screenshot_path = models.CharField(max_length=500, blank=True, null=True)
     error_message = models.TextField(blank=True, null=True)
     automation_data = models.JSONField(default=dict, blank=True)
+    # Passos cronometrados: [{name, started_at, duration, outcome, retries, parent?, error?}, ...]
+    steps = models.JSONField(default=list, blank=True, verbose_name="Passos")
+    
+    @property
+    def form_instance(self):
+        """Formulário (Porto ou Amil) que originou o job"""
+        return self.formulario_amil if self.portal == 'amil' else self.formulario
     
     def __str__(self):
-        return f"Automação {self.id} - {self.formulario.nomeCompleto} ({self.status})"
+        return f"Automação {self.id} - {self.form_instance} ({self.status})"
     
     class Meta:
         verbose_name = "Log de Automação"
         verbose_name_plural = "Logs de Automação"
         ordering = ['-started_at']
-    
\ No newline at end of file
+        indexes = [
+            # Reivindicação da fila: status='pending' AND portal=? ORDER BY started_at, id
+            models.Index(fields=['status', 'portal', 'started_at'], name='automationlog_queue_idx'),
+            # Filtro por status no admin (ORDER BY -started_at), fila sem portal e jobs em execução
+            models.Index(fields=['status', 'started_at'], name='automationlog_status_idx'),
+            models.Index(fields=['started_at'], name='automationlog_started_idx'),
+            # Vazão no /metrics: finalizados com completed_at na janela
+            models.Index(fields=['status', 'completed_at'], name='automationlog_finished_idx'),
+        ]
+    
+class StepTimeout(models.Model):
+    """Tempo máximo de espera aprendido para um passo da automação (ver step_timeouts.py)"""
+    step = models.CharField(max_length=100, unique=True, verbose_name="Passo")
+    timeout = models.FloatField(verbose_name="Timeout (s)")
+    p99 = models.FloatField(verbose_name="p99 (s)")
+    samples = models.PositiveIntegerField(default=0, verbose_name="Amostras")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+    
+    def __str__(self):
+        return f"{self.step}: {self.timeout:.1f}s"
+    
+    class Meta:
+        verbose_name = "Timeout de Passo"
+        verbose_name_plural = "Timeouts de Passos"
+        ordering = ['step']
+
+class LocatorStrategy(models.Model):
+    """Estratégia de localização que encontrou um campo da última vez (ver locators.py)"""
+    portal = models.CharField(max_length=10, choices=AutomationLog.PORTAL_CHOICES, verbose_name="Portal")
+    page = models.CharField(max_length=100, verbose_name="Página")
+    field = models.CharField(max_length=100, verbose_name="Campo")
+    by = models.CharField(max_length=10, verbose_name="Tipo")  # xpath, css ou id
+    value = models.TextField(verbose_name="Seletor")
+    misses = models.PositiveIntegerField(default=0, verbose_name="Invalidações")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+    
+    def __str__(self):
+        return f"{self.portal}/{self.page}/{self.field}: {self.by}={self.value}"
+    
+    class Meta:
+        verbose_name = "Estratégia de Localização"
+        verbose_name_plural = "Estratégias de Localização"
+        unique_together = [('portal', 'page', 'field')]
+        ordering = ['portal', 'page', 'field']
+
+class WorkerStatus(models.Model):
+    """Estado publicado periodicamente por cada worker (vagas e pool de navegadores), lido pelo /metrics"""
+    worker_id = models.CharField(max_length=100, unique=True, verbose_name="Worker")
+    running = models.JSONField(default=dict, blank=True, verbose_name="Jobs em execução")  # {portal: n}
+    concurrency = models.JSONField(default=dict, blank=True, verbose_name="Limite por portal")  # {portal: n}
+    driver_pools = models.JSONField(default=list, blank=True, verbose_name="Pools de navegadores")  # [DriverPool.stats]
+    processed = models.PositiveIntegerField(default=0, verbose_name="Jobs processados")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+    
+    def __str__(self):
+        return f"{self.worker_id} ({self.updated_at:%d/%m/%Y %H:%M:%S})"
+    
+    class Meta:
+        verbose_name = "Status de Worker"
+        verbose_name_plural = "Status dos Workers"
+        ordering = ['worker_id']
+
+class AutomationEvent(models.Model):
+    """Mudança de status ou progresso (passo) de um job, transmitida em /api/jobs/events/ (ver events.py)"""
+    KIND_CHOICES = [
+        ('status', 'Status'),
+        ('step', 'Passo'),
+    ]
+    
+    job = models.ForeignKey(AutomationLog, on_delete=models.CASCADE, related_name='events', verbose_name="Job")
+    portal = models.CharField(max_length=10, choices=AutomationLog.PORTAL_CHOICES, verbose_name="Portal")
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name="Tipo")
+    status = models.CharField(max_length=20, choices=AutomationLog.STATUS_CHOICES, verbose_name="Status")
+    step = models.CharField(max_length=100, blank=True, default='', verbose_name="Passo")
+    data = models.JSONField(default=dict, blank=True, verbose_name="Dados")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Criado em")
+    
+    def __str__(self):
+        return f"Job {self.job_id}: {self.step or self.status}"
+    
+    class Meta:
+        verbose_name = "Evento de Automação"
+        verbose_name_plural = "Eventos de Automação"
+        ordering = ['id']
@@ -0,0 +1,131 @@
+"""
+Paginação por cursor (keyset) das APIs de listagem.
+
+Em vez de ``OFFSET``, cada página continua a partir dos valores de ordenação
+do último registro entregue: a consulta usa o índice da ordenação e custa o
+mesmo na primeira e na milésima página, e registros inseridos durante a
+leitura não deslocam nem duplicam itens. A ordenação sempre termina em
+``id`` (único), o que a torna estável.
+
+O cursor é opaco para o cliente: os valores do último registro em JSON,
+codificados em base64 (URL-safe).
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class QueryError(ValueError):
+    """Parâmetro inválido na listagem (a view responde 400)"""
+
+
+class CursorError(QueryError):
+    """``limit`` ou ``cursor`` inválido"""
+
+
+def encode_cursor(values):
+    payload = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, ordering, model):
+    """Valores de ordenação do cursor, convertidos para o tipo de cada campo"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeError):
+        raise CursorError('Cursor inválido')
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise CursorError('Cursor inválido')
+
+    decoded = []
+    for field_name, value in zip(ordering, values):
+        field = model._meta.get_field(field_name.lstrip('-'))
+        if field.get_internal_type() == 'DateTimeField':
+            value = parse_datetime(value) if isinstance(value, str) else None
+        elif field.get_internal_type() in ('AutoField', 'BigAutoField') and not isinstance(value, int):
+            value = None
+        if value is None:
+            raise CursorError('Cursor inválido')
+        decoded.append(value)
+    return decoded
+
+
+def parse_limit(value):
+    if value in (None, ''):
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise CursorError('limit deve ser um número inteiro')
+    if limit < 1:
+        raise CursorError('limit deve ser maior que zero')
+    return min(limit, MAX_LIMIT)
+
+
+def parse_ids(value):
+    """Ids de ``?ids=1,2,3`` (no máximo ``MAX_LIMIT``)"""
+    try:
+        ids = {int(pk) for pk in value.split(',') if pk.strip()}
+    except ValueError:
+        raise QueryError('ids deve ser uma lista de números separados por vírgula')
+    if not ids:
+        raise QueryError('Nenhum id informado')
+    if len(ids) > MAX_LIMIT:
+        raise QueryError(f'Máximo de {MAX_LIMIT} ids por requisição')
+    return ids
+
+
+def after_cursor(ordering, values):
+    """
+    Filtro "depois de ``values``" na ordenação informada, ex: para
+    ``('-created_at', '-id')``: ``created_at < c OR (created_at = c AND id < i)``
+    """
+    condition = Q()
+    for i, field_name in enumerate(ordering):
+        name = field_name.lstrip('-')
+        lookup = 'lt' if field_name.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[i]})
+        for previous, value in zip(ordering[:i], values[:i]):
+            step &= Q(**{previous.lstrip('-'): value})
+        condition |= step
+    return condition
+
+
+def apply_cursor(queryset, request, ordering):
+    """``queryset`` ordenado por ``ordering`` e, com ``?cursor=``, restrito aos registros depois dele"""
+    queryset = queryset.order_by(*ordering)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        queryset = queryset.filter(after_cursor(ordering, decode_cursor(cursor, ordering, queryset.model)))
+    return queryset
+
+
+def paginate(queryset, request, ordering):
+    """
+    Página de ``queryset`` segundo ``?limit=`` e ``?cursor=`` da requisição.
+
+    ``ordering`` deve terminar em ``id`` ou ``-id``; ``queryset`` pode ser de
+    instâncias ou de ``.values()`` (que precisa incluir os campos da
+    ordenação). Retorna ``(registros, próximo cursor ou None, limit)``; lança
+    ``CursorError`` para parâmetros inválidos.
+    """
+    limit = parse_limit(request.GET.get('limit'))
+    queryset = apply_cursor(queryset, request, ordering)
+
+    # Um registro a mais indica se existe uma próxima página
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        names = [field_name.lstrip('-') for field_name in ordering]
+        values = [last[name] for name in names] if isinstance(last, dict) else [getattr(last, name) for name in names]
+        next_cursor = encode_cursor(values)
+    return rows, next_cursor, limit
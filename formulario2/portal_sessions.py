@@ -0,0 +1,192 @@
+"""
+Reaproveitamento de sessões autenticadas nos portais.
+
+O login (botão, CPF, senha, SUSEP) leva de 20 a 40 segundos por formulário.
+Depois de um login bem-sucedido os cookies do navegador são gravados em
+``<AUTOMATION_SESSION_DIR>/<portal>-<conta>.json``; o job seguinte injeta esses
+cookies (via CDP, antes de abrir o portal) e confere se a sessão ainda vale
+abrindo a página inicial e aguardando um elemento que só aparece logado
+(``SESSION_CHECKS`` em ``automation_config``). Só quando a verificação falha o
+login completo é refeito.
+
+Os arquivos contêm cookies de sessão: ficam fora do git (``/sessions/``) e são
+gravados com permissão 0600.
+"""
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .automation_config import PORTAL_ACCOUNTS, SESSION_CHECKS
+from .step_timing import step
+
+logger = logging.getLogger(__name__)
+
+# Sessões mais antigas que isso nem são testadas (segundos)
+DEFAULT_SESSION_MAX_AGE = 4 * 60 * 60
+
+_write_lock = threading.Lock()
+
+
+def get_session_dir():
+    return Path(getattr(settings, 'AUTOMATION_SESSION_DIR', Path(settings.BASE_DIR) / 'sessions'))
+
+
+def get_session_max_age():
+    return getattr(settings, 'AUTOMATION_SESSION_MAX_AGE', DEFAULT_SESSION_MAX_AGE)
+
+
+def session_path(portal):
+    """Arquivo de cookies do portal para a conta configurada em PORTAL_ACCOUNTS"""
+    conta = re.sub(r'[^A-Za-z0-9_-]', '', PORTAL_ACCOUNTS[portal]['login'])
+    return get_session_dir() / f'{portal}-{conta}.json'
+
+
+def load_session(portal):
+    """Cookies salvos do portal, ou None se não existirem ou estiverem velhos demais"""
+    path = session_path(portal)
+    try:
+        data = json.loads(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Sessão {portal} ilegível ({path}): {e}")
+        return None
+
+    age = time.time() - data.get('saved_at', 0)
+    if age > get_session_max_age():
+        logger.info(f"⌛ Sessão {portal} salva há {age / 60:.0f} min - login será refeito")
+        return None
+
+    now = time.time()
+    cookies = [c for c in data.get('cookies', []) if not c.get('expiry') or c['expiry'] > now]
+    return cookies or None
+
+
+def save_session(driver, portal):
+    """Grava os cookies atuais do navegador (de todos os domínios) para o portal"""
+    try:
+        try:
+            cookies = [_from_cdp(c) for c in driver.execute_cdp_cmd('Network.getAllCookies', {})['cookies']]
+        except Exception:
+            # Sem CDP só é possível ler os cookies do domínio atual
+            cookies = driver.get_cookies()
+
+        path = session_path(portal)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps({'saved_at': time.time(), 'cookies': cookies})
+
+        with _write_lock:
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{portal}-')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as tmp:
+                    tmp.write(payload)
+                os.chmod(tmp_path, 0o600)
+                os.replace(tmp_path, path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+
+        logger.info(f"💾 Sessão {portal} salva ({len(cookies)} cookies)")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Não foi possível salvar a sessão {portal}: {e}")
+        return False
+
+
+def invalidate_session(portal):
+    """Apaga a sessão salva (ex: login falhou ou a sessão foi rejeitada pelo portal)"""
+    try:
+        session_path(portal).unlink()
+        logger.info(f"🗑️ Sessão {portal} descartada")
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"⚠️ Não foi possível apagar a sessão {portal}: {e}")
+
+
+def restore_session(driver, portal):
+    """
+    Injeta os cookies salvos e verifica se a sessão ainda é válida.
+
+    Retorna True com o navegador já na página inicial logada do portal, ou
+    False (sessão inexistente, expirada ou rejeitada) — nesse caso o chamador
+    deve fazer o login completo.
+    """
+    cookies = load_session(portal)
+    if not cookies:
+        return False
+
+    check = SESSION_CHECKS[portal]
+    with step(f'{portal}.restaurar_sessao') as passo:
+        try:
+            _set_cookies(driver, cookies, check['url'])
+            driver.get(check['url'])
+            WebDriverWait(driver, check.get('timeout', 8)).until(
+                EC.presence_of_element_located((By.XPATH, check['logged_in_xpath']))
+            )
+        except Exception as e:
+            logger.info(f"🔐 Sessão {portal} expirada ou inválida - login será refeito ({type(e).__name__})")
+            passo['outcome'] = 'failed'
+            invalidate_session(portal)
+            return False
+
+    logger.info(f"♻️ Sessão {portal} restaurada ({len(cookies)} cookies)")
+    return True
+
+
+def _set_cookies(driver, cookies, url):
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setCookies', {'cookies': [_to_cdp(c) for c in cookies]})
+    except Exception:
+        # Sem CDP: add_cookie exige estar no domínio do cookie
+        driver.get(url)
+        for cookie in cookies:
+            try:
+                driver.add_cookie({k: v for k, v in cookie.items() if k != 'sameSite' or v in ('Strict', 'Lax', 'None')})
+            except Exception:
+                pass
+
+
+def _from_cdp(cookie):
+    """Cookie do CDP (Network.getAllCookies) no formato do Selenium"""
+    converted = {
+        'name': cookie['name'],
+        'value': cookie['value'],
+        'domain': cookie['domain'],
+        'path': cookie.get('path', '/'),
+        'secure': cookie.get('secure', False),
+        'httpOnly': cookie.get('httpOnly', False),
+    }
+    if cookie.get('sameSite'):
+        converted['sameSite'] = cookie['sameSite']
+    if not cookie.get('session') and cookie.get('expires', -1) > 0:
+        converted['expiry'] = int(cookie['expires'])
+    return converted
+
+
+def _to_cdp(cookie):
+    """Cookie no formato do Selenium para Network.setCookies"""
+    converted = {
+        'name': cookie['name'],
+        'value': cookie['value'],
+        'domain': cookie['domain'],
+        'path': cookie.get('path', '/'),
+        'secure': cookie.get('secure', False),
+        'httpOnly': cookie.get('httpOnly', False),
+    }
+    if cookie.get('sameSite'):
+        converted['sameSite'] = cookie['sameSite']
+    if cookie.get('expiry'):
+        converted['expires'] = cookie['expiry']
+    return converted
@@ -0,0 +1,67 @@
+"""
+Verificação dos planos das consultas mais frequentes (``EXPLAIN``).
+
+A fila é consultada por todos os workers a cada poucos segundos e o histórico
+de ``AutomationLog`` só cresce; sem índice, cada reivindicação leria a tabela
+inteira. ``check_query_plans`` roda ``EXPLAIN`` nas consultas abaixo e aponta
+as que fazem varredura completa (``SCAN <tabela>`` sem índice) ou ordenação em
+tabela temporária (``USE TEMP B-TREE FOR ORDER BY``).
+
+Registrada como system check de banco de dados: roda no ``migrate`` e em
+``python manage.py check --database default``. Só no SQLite, cujo planejador
+é determinístico; em outros bancos o plano depende das estatísticas da tabela.
+"""
+import re
+
+from django.core.checks import Tags, Warning, register
+from django.db import OperationalError, ProgrammingError, connections
+
+from .models import AutomationLog, Formulario2, FormularioAmil
+
+
+def hot_queries():
+    """``(nome, queryset)`` das consultas que precisam usar índice"""
+    from .jobs import pending_jobs
+
+    queries = [(f'fila ({portal})', pending_jobs(portal)) for portal, _ in AutomationLog.PORTAL_CHOICES]
+    queries += [
+        ('fila (todos os portais)', pending_jobs()),
+        ('jobs em execução', AutomationLog.objects.filter(status='running').values_list('id', flat=True)),
+        ('API Amil', FormularioAmil.objects.order_by('-created_at', '-id').values('id')[:100]),
+        ('CPF Porto', Formulario2.objects.filter(cpf_digits='00000000000').values('id')),
+        ('CPF Amil', FormularioAmil.objects.filter(cpf_digits='00000000000').order_by().values('id')),
+    ]
+    return queries
+
+
+def plan_problems(queryset):
+    """Linhas do plano com varredura completa ou ordenação sem índice (só SQLite)"""
+    if connections[queryset.db].vendor != 'sqlite':
+        return []
+    problems = []
+    for line in queryset.explain().splitlines():
+        detail = line.split(None, 3)[-1]  # "id parent notused detail"
+        if re.match(r'SCAN \w+$', detail) or 'TEMP B-TREE' in detail:
+            problems.append(detail)
+    return problems
+
+
+@register(Tags.database)
+def check_query_plans(app_configs=None, databases=None, **kwargs):
+    if not databases or 'default' not in databases:
+        return []
+    warnings = []
+    for name, queryset in hot_queries():
+        try:
+            problems = plan_problems(queryset)
+        except (OperationalError, ProgrammingError):
+            # Tabelas ainda não criadas (antes do primeiro migrate)
+            return []
+        if problems:
+            warnings.append(Warning(
+                f"Consulta '{name}' sem índice: {'; '.join(problems)}",
+                hint="Aplique as migrações (python manage.py migrate formulario2) e confira Meta.indexes.",
+                obj=queryset.model,
+                id='formulario2.W001',
+            ))
+    return warnings
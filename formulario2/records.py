@@ -0,0 +1,51 @@
+"""
+Registro do formulário que disparou um job.
+
+Cada job carrega exatamente o seu registro, pelo id, no mesmo formato que a
+API devolve. Por padrão a leitura é feita direto no banco (ORM, uma linha);
+com ``BEHAVIOR['fetch_record_via_api']`` (automação rodando fora do servidor
+Django) o registro vem do endpoint de detalhe da API (``/api/porto/<pk>/``,
+``/api/amil/<pk>/``).
+"""
+import logging
+
+import requests
+
+from .automation_config import BEHAVIOR, URLS
+from .models import Formulario2, FormularioAmil
+from .serializers import FORMULARIO2_API_FIELDS, FORMULARIO_AMIL_API_FIELDS, formulario2_row, formulario_amil_row
+
+logger = logging.getLogger(__name__)
+
+# portal: (modelo, campos, serialização, chave da URL da API em URLS)
+RECORD_SOURCES = {
+    'porto': (Formulario2, FORMULARIO2_API_FIELDS, formulario2_row, 'api_endpoint'),
+    'amil': (FormularioAmil, FORMULARIO_AMIL_API_FIELDS, formulario_amil_row, 'api_amil'),
+}
+
+
+def load_record(portal, pk, via_api=None):
+    """
+    Registro ``pk`` do portal como dicionário (formato da API), ou None se não existir.
+
+    ``via_api`` (padrão: ``BEHAVIOR['fetch_record_via_api']``) busca pela API
+    em vez do banco; erros de conexão propagam como ``requests.RequestException``.
+    """
+    if via_api is None:
+        via_api = BEHAVIOR.get('fetch_record_via_api', False)
+    model, fields, serialize, url_key = RECORD_SOURCES[portal]
+
+    if via_api:
+        response = requests.get(f"{URLS[url_key].rstrip('/')}/{pk}/", timeout=10)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()['data']
+
+    row = model.objects.values(*fields).filter(pk=pk).first()
+    return serialize(row) if row else None
+
+
+def latest_amil_id():
+    """Id do registro Amil mais recente (execução manual, sem job)"""
+    return FormularioAmil.objects.order_by('-created_at', '-id').values_list('id', flat=True).first()
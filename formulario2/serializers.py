@@ -0,0 +1,85 @@
+"""
+Serialização das APIs de listagem a partir de ``.values()``.
+
+As listagens leem só as colunas expostas (``FORMULARIO2_API_FIELDS``,
+``FORMULARIO_AMIL_API_FIELDS``, ou só as pedidas em ``?fields=``) como
+dicionários, sem instanciar os modelos, e as funções abaixo ajustam cada
+linha no lugar — datas em ``AAAA-MM-DD``, data/hora em
+``AAAA-MM-DD HH:MM:SS`` (UTC) e textos opcionais vazios como ``''`` —
+mantendo o formato que a API sempre devolveu.
+"""
+from .pagination import QueryError
+
+FORMULARIO2_API_FIELDS = (
+    'id', 'nomeCompleto', 'nomeSocial', 'dataNascimento', 'genero', 'estadoCivil', 'rg', 'cpf',
+    'orgaoEmissor', 'dataEmissao', 'telefone', 'email', 'nomeMae', 'created_at', 'updated_at',
+)
+
+FORMULARIO_AMIL_API_FIELDS = (
+    'id', 'nome', 'cpf', 'nome_cartao', 'data_inclusao', 'data_registro', 'data_nascimento', 'sexo',
+    'nacionalidade', 'nome_mae', 'nome_pai', 'estado_civil', 'plano', 'contrato_dental', 'plano_dental',
+    'created_at', 'updated_at',
+)
+
+
+def parse_fields(value, allowed):
+    """
+    Campos pedidos em ``?fields=id,nome`` (na ordem de ``allowed``); sem
+    ``value``, todos. Campos fora de ``allowed`` lançam ``QueryError``.
+    """
+    if not value:
+        return allowed
+    requested = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise QueryError(f"Campos desconhecidos: {', '.join(sorted(unknown))}")
+    return tuple(name for name in allowed if name in requested)
+
+
+def _text(value):
+    return value or ''
+
+
+def _date(value):
+    return value.isoformat() if value else None
+
+
+def _datetime(value):
+    # str(datetime) é "AAAA-MM-DD HH:MM:SS[.ffffff][+00:00]": os 19 primeiros caracteres, sem strftime
+    return str(value)[:19] if value else None
+
+
+# Conversão por campo; os demais vão como estão. Só os campos presentes na linha (?fields=) são convertidos
+FORMULARIO2_CONVERTERS = {
+    'nomeSocial': _text,
+    'dataNascimento': _date,
+    'dataEmissao': _date,
+    'created_at': _datetime,
+    'updated_at': _datetime,
+}
+
+FORMULARIO_AMIL_CONVERTERS = {
+    'data_inclusao': _date,
+    'data_registro': _date,
+    'data_nascimento': _date,
+    'nome_pai': _text,
+    'contrato_dental': _text,
+    'plano_dental': _text,
+    'created_at': _datetime,
+    'updated_at': _datetime,
+}
+
+
+def _convert(row, converters):
+    for name, convert in converters.items():
+        if name in row:
+            row[name] = convert(row[name])
+    return row
+
+
+def formulario2_row(row):
+    return _convert(row, FORMULARIO2_CONVERTERS)
+
+
+def formulario_amil_row(row):
+    return _convert(row, FORMULARIO_AMIL_CONVERTERS)
@@ -1,10 +1,8 @@
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
-from django.core.exceptions import ObjectDoesNotExist
-from django.utils import timezone
-from .models import Formulario2, AutomationLog
-from .automation import run_automation_for_form
-import threading
+from .models import Formulario2, FormularioAmil
+from .jobs import enqueue_automation
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,75 +10,37 @@ logger = logging.getLogger(__name__)
 @receiver(post_save, sender=Formulario2)
 def trigger_automation_on_form_save(sender, instance, created, **kwargs):
     """
-    Signal que dispara a automação Selenium quando um formulário é salvo
+    Signal que enfileira a automação Selenium quando um formulário é salvo.
+
+    O job só é criado depois do commit da transação; a execução fica a cargo do
+    comando ``run_automation_worker``.
     """
     if created:  # Só executa para novos registros
-        try:
-            logger.info(f"🚀 Formulário salvo! Iniciando automação para: {instance.nomeCompleto}")
-            
-            # Criar log de automação no banco
-            automation_log = AutomationLog.objects.create(
-                formulario=instance,
-                status='pending',
-                automation_data={
-                    'form_id': instance.id,
-                    'form_name': instance.nomeCompleto,
-                    'triggered_at': timezone.now().isoformat()
-                }
-            )
-            
-            # Preparar dados do formulário para JSON
-            form_data = {
-                'id': instance.id,
-                'nomeCompleto': instance.nomeCompleto,
-                'nomeSocial': instance.nomeSocial or '',
-                'dataNascimento': instance.dataNascimento.strftime('%Y-%m-%d') if instance.dataNascimento else None,
-                'genero': instance.genero,
-                'estadoCivil': instance.estadoCivil,
-                'rg': instance.rg,
-                'cpf': instance.cpf,
-                'orgaoEmissor': instance.orgaoEmissor,
-                'dataEmissao': instance.dataEmissao.strftime('%Y-%m-%d') if instance.dataEmissao else None,
-                'telefone': instance.telefone,
-                'email': instance.email,
-                'nomeMae': instance.nomeMae,
-                'created_at': instance.pk,  # Usar o ID como timestamp de criação
-            }
-            
-            # Executar automação em thread separada para não bloquear o salvamento
-            def run_automation_async():
-                try:
-                    logger.info(f"🔄 Iniciando automação assíncrona para formulário ID: {instance.id}")
-                    success = run_automation_for_form(form_data)
-                    
-                    if success:
-                        logger.info(f"✅ Automação concluída com sucesso para formulário ID: {instance.id}")
-                        # Atualizar log com sucesso
-                        automation_log.status = 'completed'
-                        automation_log.save()
-                    else:
-                        logger.error(f"❌ Falha na automação para formulário ID: {instance.id}")
-                        # Atualizar log com falha
-                        automation_log.status = 'failed'
-                        automation_log.error_message = 'Automação falhou'
-                        automation_log.save()
-                        
-                except Exception as e:
-                    logger.error(f"💥 Erro na automação assíncrona: {e}")
-                    # Atualizar log com erro
-                    automation_log.status = 'failed'
-                    automation_log.error_message = str(e)
-                    automation_log.save()
-            
-            # Iniciar thread da automação
-            automation_thread = threading.Thread(target=run_automation_async)
-            automation_thread.daemon = True  # Thread será encerrada quando o programa principal terminar
-            automation_thread.start()
-            
-            logger.info(f"📋 Automação iniciada em background para formulário ID: {instance.id}")
-            
-        except Exception as e:
-            logger.error(f"💥 Erro ao disparar automação: {e}")
+        logger.info(f"🚀 Formulário salvo! Enfileirando automação para: {instance.nomeCompleto}")
+
+        def enqueue():
+            try:
+                enqueue_automation(instance)
+            except Exception as e:
+                logger.error(f"💥 Erro ao enfileirar automação: {e}")
+
+        transaction.on_commit(enqueue)
+
+@receiver(post_save, sender=FormularioAmil)
+def trigger_amil_automation_on_form_save(sender, instance, created, **kwargs):
+    """
+    Signal que enfileira a automação da Amil quando um formulário Amil é salvo
+    """
+    if created:
+        logger.info(f"🚀 Formulário Amil salvo! Enfileirando automação para: {instance.nome}")
+
+        def enqueue():
+            try:
+                enqueue_automation(instance)
+            except Exception as e:
+                logger.error(f"💥 Erro ao enfileirar automação Amil: {e}")
+
+        transaction.on_commit(enqueue)
 
 @receiver(post_save, sender=Formulario2)
 def log_form_save(sender, instance, created, **kwargs):
@@ -0,0 +1,183 @@
+"""
+Timeouts adaptativos por passo da automação.
+
+Cada espera nomeada (``waits.clickable(..., step='porto.susep')``) registra
+quanto tempo levou até a condição ser atendida; o worker grava essas durações
+em ``AutomationLog.automation_data['wait_durations']``. Periodicamente
+(``python manage.py refresh_step_timeouts`` ou o próprio worker) o timeout de
+cada passo é recalculado como ``p99 × multiplier`` das esperas atendidas,
+limitado entre ``min`` e ``max``, e salvo em ``StepTimeout``. Passos sem
+amostras suficientes continuam usando o valor de ``TIMING``.
+
+As esperas obrigatórias que esgotam o tempo ficam em ``wait_timeouts``
+(amostras censuradas: a duração real é maior que a registrada). Elas não
+entram no p99 — só decidem se o timeout pode crescer além do que os sucessos
+indicam: quando passam de ``growth_timeout_rate`` das amostras *e* os
+sucessos já chegam perto do limite atual (p99 ≥ timeout / ``multiplier``), o
+portal ficou lento e o timeout cresce. Qualquer aumento é limitado a
+``max_growth`` × o valor atual por recálculo; com sucessos rápidos o timeout
+volta direto ao valor calculado pelos sucessos.
+
+Configuração em ``settings.AUTOMATION_STEP_TIMEOUTS``.
+"""
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STEP_TIMEOUT_CONFIG = {
+    'enabled': True,
+    'percentile': 99,
+    'multiplier': 1.5,
+    'min': 2,  # segundos
+    'max': 90,  # segundos
+    'min_samples': 20,  # amostras necessárias para substituir o valor de TIMING
+    'growth_timeout_rate': 0.05,  # fração de esperas esgotadas a partir da qual o timeout pode crescer
+    'max_growth': 1.25,  # aumento máximo por recálculo (× o timeout atual)
+    'window': 500,  # jobs mais recentes considerados no cálculo
+    'refresh_interval': 3600,  # segundos entre recálculos feitos pelo worker
+    'cache_ttl': 300,  # segundos que cada processo mantém os timeouts em memória
+}
+
+_durations = contextvars.ContextVar('step_durations', default=None)
+
+_cache = {'loaded_at': 0.0, 'timeouts': {}}
+_cache_lock = threading.Lock()
+
+
+def get_step_timeout_config():
+    config = dict(DEFAULT_STEP_TIMEOUT_CONFIG)
+    config.update(getattr(settings, 'AUTOMATION_STEP_TIMEOUTS', {}))
+    return config
+
+
+class StepDurations(defaultdict):
+    """``{passo: [segundos, ...]}`` das esperas atendidas; ``censored`` tem as que esgotaram o tempo"""
+
+    def __init__(self):
+        super().__init__(list)
+        self.censored = defaultdict(list)
+
+
+@contextmanager
+def recording():
+    """Coleta as durações das esperas nomeadas executadas dentro do bloco (``StepDurations``)"""
+    collected = StepDurations()
+    token = _durations.set(collected)
+    try:
+        yield collected
+    finally:
+        _durations.reset(token)
+
+
+def record_step_duration(step, seconds, timed_out=False):
+    """Registra a duração de uma espera; com ``timed_out`` ela é só um limite inferior (amostra censurada)"""
+    collected = _durations.get()
+    if collected is not None:
+        (collected.censored if timed_out else collected)[step].append(round(seconds, 3))
+
+
+def percentile(values, pct):
+    """Percentil pelo método nearest-rank"""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def compute_step_timeouts(durations_by_step, config=None, timeouts_by_step=None, current=None):
+    """
+    ``{passo: [durações]}`` -> ``{passo: (timeout, p99, amostras)}`` para passos
+    com amostras suficientes. ``timeouts_by_step`` são as esperas esgotadas e
+    ``current`` os timeouts em uso (``{passo: segundos}``).
+    """
+    config = config or get_step_timeout_config()
+    timeouts_by_step = timeouts_by_step or {}
+    current = current or {}
+    result = {}
+    for step, durations in durations_by_step.items():
+        if len(durations) < config['min_samples']:
+            continue
+        p99 = percentile(durations, config['percentile'])
+        timeout = p99 * config['multiplier']
+
+        previous = current.get(step)
+        if previous:
+            timed_out = len(timeouts_by_step.get(step, ()))
+            if timed_out / (timed_out + len(durations)) > config['growth_timeout_rate'] and p99 * config['multiplier'] >= previous:
+                # Sucessos no limite e esperas estourando: a página ficou mais lenta que o timeout atual
+                timeout = max(timeout, previous * config['max_growth'])
+            timeout = min(timeout, previous * config['max_growth'])
+
+        timeout = min(config['max'], max(config['min'], timeout))
+        result[step] = (timeout, p99, len(durations))
+    return result
+
+
+def refresh_step_timeouts():
+    """Recalcula e grava os timeouts a partir dos jobs mais recentes. Retorna ``{passo: timeout}``"""
+    from .models import AutomationLog, StepTimeout
+
+    config = get_step_timeout_config()
+    recent = (
+        AutomationLog.objects
+        .filter(status__in=['completed', 'failed'], automation_data__has_key='wait_durations')
+        .order_by('-id')
+        .values_list('automation_data', flat=True)[:config['window']]
+    )
+
+    durations_by_step = defaultdict(list)
+    timeouts_by_step = defaultdict(list)
+    for data in recent:
+        for step, durations in (data.get('wait_durations') or {}).items():
+            durations_by_step[step].extend(durations)
+        for step, durations in (data.get('wait_timeouts') or {}).items():
+            timeouts_by_step[step].extend(durations)
+
+    computed = compute_step_timeouts(durations_by_step, config, timeouts_by_step, _load_timeouts())
+    for step, (timeout, p99, samples) in computed.items():
+        StepTimeout.objects.update_or_create(
+            step=step,
+            defaults={'timeout': timeout, 'p99': p99, 'samples': samples},
+        )
+
+    invalidate_cache()
+    logger.info(f"⏱️ Timeouts adaptativos recalculados para {len(computed)} passo(s)")
+    return {step: values[0] for step, values in computed.items()}
+
+
+def invalidate_cache():
+    with _cache_lock:
+        _cache['loaded_at'] = 0.0
+
+
+def _load_timeouts():
+    from .models import StepTimeout
+    return dict(StepTimeout.objects.values_list('step', 'timeout'))
+
+
+def get_step_timeout(step, default):
+    """Timeout aprendido para o passo ou ``default`` (valor de TIMING) se ainda não houver"""
+    config = get_step_timeout_config()
+    if not config['enabled']:
+        return default
+
+    now = time.monotonic()
+    with _cache_lock:
+        if now - _cache['loaded_at'] > config['cache_ttl']:
+            try:
+                _cache['timeouts'] = _load_timeouts()
+            except Exception as e:
+                # Sem banco (scripts avulsos) ou tabela ainda não migrada
+                logger.debug(f"⚠️ Timeouts adaptativos indisponíveis: {e}")
+                _cache['timeouts'] = {}
+            _cache['loaded_at'] = now
+        return _cache['timeouts'].get(step, default)
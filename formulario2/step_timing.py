@@ -0,0 +1,123 @@
+"""
+Cronometragem dos passos das automações.
+
+Cada passo do fluxo (login, SUSEP, redirecionamento, preenchimento...) roda
+dentro de ``step('porto.login')`` ou de uma função decorada com
+``@timed_step('amil.menu')``. O passo registra nome, início, duração,
+resultado (``ok``, ``failed`` ou ``error``) e quantas vezes caiu em um método
+alternativo (``retry()``). Passos podem ser aninhados; o passo pai fica em
+``parent``.
+
+O worker coleta os passos de cada job com ``tracking()`` e grava a lista em
+``AutomationLog.steps``; com ``on_step`` ele também é avisado do início e do
+fim de cada passo (eventos de progresso, ver ``events.py``).
+"""
+import contextvars
+import functools
+import logging
+import time
+from contextlib import contextmanager
+
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_steps = contextvars.ContextVar('automation_steps', default=None)
+_current = contextvars.ContextVar('automation_current_step', default=None)
+_on_step = contextvars.ContextVar('automation_on_step', default=None)
+
+
+@contextmanager
+def tracking(on_step=None):
+    """
+    Coleta os passos executados dentro do bloco, na ordem em que começaram.
+    ``on_step(record, phase)`` é chamado com ``phase`` ``'started'`` e ``'finished'``.
+    """
+    collected = []
+    token = _steps.set(collected)
+    listener_token = _on_step.set(on_step)
+    try:
+        yield collected
+    finally:
+        _on_step.reset(listener_token)
+        _steps.reset(token)
+
+
+def _notify(record, phase):
+    on_step = _on_step.get()
+    if on_step is None:
+        return
+    try:
+        on_step(record, phase)
+    except Exception as e:
+        logger.warning(f"⚠️ Erro ao notificar passo {record['name']}: {e}")
+
+
+@contextmanager
+def step(name):
+    """Cronometra um passo; uma exceção que escape do bloco marca o passo como ``error``"""
+    record = {
+        'name': name,
+        'started_at': timezone.now().isoformat(),
+        'duration': None,
+        'outcome': 'ok',
+        'retries': 0,
+    }
+    parent = _current.get()
+    if parent:
+        record['parent'] = parent['name']
+
+    collected = _steps.get()
+    if collected is not None:
+        collected.append(record)
+
+    token = _current.set(record)
+    _notify(record, 'started')
+    started = time.monotonic()
+    try:
+        yield record
+    except Exception as e:
+        record['outcome'] = 'error'
+        record['error'] = str(e)[:500]
+        raise
+    finally:
+        record['duration'] = round(time.monotonic() - started, 3)
+        _current.reset(token)
+        _notify(record, 'finished')
+        logger.debug(f"⏱️ Passo {name}: {record['duration']}s ({record['outcome']}, {record['retries']} retentativa(s))")
+
+
+def timed_step(name):
+    """Decorador: executa a função dentro de ``step(name)``; retorno ``False`` marca o passo como ``failed``"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with step(name) as record:
+                result = func(*args, **kwargs)
+                if result is False and record['outcome'] == 'ok':
+                    record['outcome'] = 'failed'
+                return result
+        return wrapper
+    return decorator
+
+
+def retry():
+    """Conta uma nova tentativa (método alternativo, fallback) no passo em andamento"""
+    record = _current.get()
+    if record is not None:
+        record['retries'] += 1
+
+
+def fail(error=None):
+    """Marca o passo em andamento como ``failed`` sem interromper o fluxo"""
+    record = _current.get()
+    if record is not None:
+        record['outcome'] = 'failed'
+        if error:
+            record['error'] = str(error)[:500]
+
+
+def current_step():
+    """Nome do passo em andamento (o mais interno) ou None"""
+    record = _current.get()
+    return record['name'] if record else None
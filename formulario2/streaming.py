@@ -0,0 +1,64 @@
+"""
+Exportação em streaming das APIs de listagem (``?stream=json`` ou ``?stream=ndjson``).
+
+As linhas vêm de ``.values().iterator(chunk_size=...)``: o banco entrega
+blocos de ``chunk_size`` registros, cada um é serializado e enviado em
+seguida, e nada da tabela inteira fica em memória — o primeiro byte sai
+antes da consulta terminar de ser lida.
+
+* ``json``: um array JSON (``[{...},{...}]``);
+* ``ndjson``: um objeto JSON por linha (``application/x-ndjson``).
+"""
+import json
+
+from django.http import StreamingHttpResponse
+
+STREAM_FORMATS = {
+    'json': 'application/json',
+    'ndjson': 'application/x-ndjson',
+}
+
+CHUNK_SIZE = 2000  # registros lidos do banco por vez
+ROWS_PER_WRITE = 200  # registros serializados por pedaço enviado ao cliente
+
+
+def _batches(queryset, serialize, chunk_size):
+    """Listas de até ``ROWS_PER_WRITE`` linhas já serializadas em JSON"""
+    batch = []
+    for row in queryset.iterator(chunk_size=chunk_size):
+        batch.append(json.dumps(serialize(row)))
+        if len(batch) >= ROWS_PER_WRITE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _json_array(queryset, serialize, chunk_size):
+    yield '['
+    separator = ''
+    for batch in _batches(queryset, serialize, chunk_size):
+        yield separator + ','.join(batch)
+        separator = ','
+    yield ']'
+
+
+def _ndjson(queryset, serialize, chunk_size):
+    for batch in _batches(queryset, serialize, chunk_size):
+        yield '\n'.join(batch) + '\n'
+
+
+def streaming_response(queryset, serialize, fmt, chunk_size=CHUNK_SIZE):
+    """
+    ``StreamingHttpResponse`` com todas as linhas de ``queryset`` (de
+    ``.values()``, já ordenado), cada uma passada por ``serialize``.
+    ``fmt`` deve ser uma das chaves de ``STREAM_FORMATS``.
+    """
+    generator = _ndjson if fmt == 'ndjson' else _json_array
+    response = StreamingHttpResponse(
+        generator(queryset, serialize, chunk_size),
+        content_type=f'{STREAM_FORMATS[fmt]}; charset=utf-8',
+    )
+    # Proxies (nginx) não devem acumular a resposta antes de repassar
+    response['X-Accel-Buffering'] = 'no'
+    return response
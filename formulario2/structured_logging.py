@@ -0,0 +1,139 @@
+"""
+Logs estruturados e sem bloqueio para as automações.
+
+Com vários navegadores rodando em paralelo, cada thread do worker escrevendo
+direto no stdout disputa o mesmo arquivo. ``configure_logging`` troca os
+handlers do logger raiz por um ``QueueHandler``: as threads só enfileiram o
+registro e um ``QueueListener`` em segundo plano formata e escreve.
+
+Cada registro recebe ``job_id`` e ``portal`` (definidos por ``job_context``
+no início do job) e ``step`` (passo em andamento, de ``step_timing``). Com
+``LOGGING['format'] = 'json'`` (em ``automation_config``) cada linha é um
+objeto JSON; ``'text'`` mantém uma linha legível com os mesmos campos.
+
+Listagens detalhadas (payloads da API, campos e opções encontrados) são
+registradas em DEBUG e somem com ``LOGGING['level'] = 'INFO'``.
+"""
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from .automation_config import LOGGING
+from .step_timing import current_step
+
+_job = contextvars.ContextVar('automation_log_job', default=None)
+
+_listener = None
+_listener_lock = threading.Lock()
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s [%(threadName)s] job=%(job_id)s portal=%(portal)s step=%(step)s %(name)s: %(message)s'
+
+
+@contextmanager
+def job_context(job_id, portal):
+    """Anexa ``job_id`` e ``portal`` a todos os registros emitidos dentro do bloco (na mesma thread)"""
+    token = _job.set({'job_id': job_id, 'portal': portal})
+    try:
+        yield
+    finally:
+        _job.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """Copia job, portal e passo atuais para o registro (executado na thread que emitiu o log)"""
+
+    def filter(self, record):
+        job = _job.get() or {}
+        record.job_id = job.get('job_id')
+        record.portal = job.get('portal')
+        record.step = current_step()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Um objeto JSON por linha"""
+
+    def format(self, record):
+        payload = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'job_id': getattr(record, 'job_id', None),
+            'portal': getattr(record, 'portal', None),
+            'step': getattr(record, 'step', None),
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            payload['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload['exc'] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class _ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que deixa a formatação para o listener: só resolve a
+    mensagem e o traceback (que não podem atravessar a fila) e mantém os
+    campos de contexto no registro
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def configure_logging(level=None, fmt=None, stream=None):
+    """
+    Direciona o logger raiz para a fila (idempotente). ``level`` e ``fmt``
+    (``'json'`` ou ``'text'``) sobrescrevem ``LOGGING`` de ``automation_config``.
+    """
+    global _listener
+
+    level = level or LOGGING.get('level', 'INFO')
+    fmt = fmt or LOGGING.get('format', 'json')
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(JsonFormatter() if fmt == 'json' else logging.Formatter(TEXT_FORMAT))
+
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+
+        log_queue = queue.SimpleQueue()
+        handler = _ContextQueueHandler(log_queue)
+        handler.addFilter(ContextFilter())
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(log_queue, output)
+        _listener.start()
+
+
+def stop_logging():
+    """Esvazia a fila e encerra o listener (chamado automaticamente ao sair do processo)"""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+atexit.register(stop_logging)
@@ -1,3 +1,130 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from selenium.common.exceptions import TimeoutException
+
+from . import automation_amil, waits
+from .bench import create_bench_jobs
+from .models import AutomationLog, StepTimeout, WorkerStatus
+from .step_timeouts import compute_step_timeouts, get_step_timeout_config, recording, refresh_step_timeouts
+from .worker import AutomationWorkerPool
+
+
+class StepTimeoutRecordingTests(SimpleTestCase):
+    """Só as esperas obrigatórias registram o tempo esgotado"""
+
+    def wait(self, func, *args, **kwargs):
+        with mock.patch.object(waits, 'WebDriverWait') as wait:
+            wait.return_value.until.side_effect = TimeoutException()
+            return func(mock.Mock(), *args, timeout=1, **kwargs)
+
+    def test_required_wait_records_timeout(self):
+        with recording() as durations:
+            with self.assertRaises(TimeoutException):
+                self.wait(waits.clickable, ('xpath', '//a'), step='t.botao')
+        self.assertEqual(len(durations.censored['t.botao']), 1)
+
+    def test_tolerant_and_optional_waits_do_not_record_timeout(self):
+        with recording() as durations:
+            self.assertFalse(self.wait(waits.until, lambda driver: False, step='t.pronto'))
+            with self.assertRaises(TimeoutException):
+                self.wait(waits.present, ('xpath', '//a'), step='t.alternativa', optional=True)
+        self.assertEqual(dict(durations.censored), {})
+
+
+class ComputeStepTimeoutsTests(SimpleTestCase):
+    def setUp(self):
+        self.config = {**get_step_timeout_config(), 'min': 2, 'max': 90, 'multiplier': 1.5, 'max_growth': 1.25}
+
+    def test_grows_at_most_max_growth_when_successes_reach_the_limit(self):
+        computed = compute_step_timeouts({'t': [5.0] * 90}, self.config, {'t': [6.0] * 10}, {'t': 6.0})
+        self.assertEqual(computed['t'][0], 7.5)
+
+    def test_fast_successes_with_timeouts_do_not_grow(self):
+        computed = compute_step_timeouts({'t': [0.5] * 400}, self.config, {'t': [15.0] * 40}, {'t': 15.0})
+        self.assertEqual(computed['t'][0], 2)
+
+    def test_decays_to_success_based_timeout(self):
+        computed = compute_step_timeouts({'t': [4.0] * 100}, self.config, {}, {'t': 60.0})
+        self.assertEqual(computed['t'][0], 6.0)
+
+
+class RefreshStepTimeoutsTests(TestCase):
+    def add_jobs(self, count, durations, timeouts):
+        AutomationLog.objects.bulk_create([
+            AutomationLog(status='completed', automation_data={
+                'wait_durations': {'t.passo': durations},
+                'wait_timeouts': {'t.passo': timeouts},
+            })
+            for _ in range(count)
+        ])
+
+    def test_two_percent_timeouts_stay_stable(self):
+        # 400 esperas atendidas em 4 s e 8 esgotadas (2%) no timeout em uso
+        StepTimeout.objects.create(step='t.passo', timeout=6.0, p99=4.0, samples=400)
+        self.add_jobs(8, [4.0] * 49, [6.0])
+        self.add_jobs(12, [4.0] * 50, [])
+
+        values = [refresh_step_timeouts()['t.passo'] for _ in range(5)]
+        self.assertEqual(values, [6.0] * 5)
+
+
+class AmilFillResultTests(TestCase):
+    """O job Amil só termina ``completed`` se todos os campos foram preenchidos"""
+
+    def run_job(self, failing_key=None):
+        create_bench_jobs('amil', 1)
+        automation_log = AutomationLog.objects.get(portal='amil')
+
+        def fill_fields(driver, portal, page, campos):
+            return {
+                campo['key']: {'ok': campo['key'] != failing_key, 'found': True, 'value': '', 'element': None, 'error': None}
+                for campo in campos
+            }
+
+        with mock.patch.multiple(
+            automation_amil,
+            create_driver=mock.Mock(return_value=mock.MagicMock()),
+            restore_session=mock.Mock(return_value=True),
+            handle_popups=mock.Mock(),
+            clicar_seletor_contrato=mock.Mock(),
+            clicar_opcao_contrato=mock.Mock(),
+            waits=mock.Mock(),
+            fill_fields=fill_fields,
+            preencher_campo_teclado=mock.Mock(return_value=False),
+        ):
+            success = automation_amil.run_amil_automation(automation_log, reuse_session=True)
+        automation_log.refresh_from_db()
+        return success, automation_log
+
+    def test_field_not_filled_by_batch_or_keyboard_fails_the_job(self):
+        success, automation_log = self.run_job(failing_key='beneficiaryOwner.cpf')
+        self.assertFalse(success)
+        self.assertEqual(automation_log.status, 'failed')
+
+    def test_all_fields_filled_completes_the_job(self):
+        success, automation_log = self.run_job()
+        self.assertTrue(success)
+        self.assertEqual(automation_log.status, 'completed')
+
+
+class WorkerRequeueTests(TestCase):
+    def test_pool_requeues_jobs_of_dead_workers_while_running(self):
+        create_bench_jobs('porto', 2)
+        claimed_at = timezone.now() - timedelta(minutes=5)
+        dead, alive = AutomationLog.objects.order_by('id')
+        AutomationLog.objects.filter(pk=dead.pk).update(status='running', worker_id='host-1', claimed_at=claimed_at, attempts=1)
+        AutomationLog.objects.filter(pk=alive.pk).update(status='running', worker_id='host-2', claimed_at=claimed_at, attempts=1)
+        WorkerStatus.objects.create(worker_id='host-2')
+
+        pool = AutomationWorkerPool('host-3', use_driver_pool=False)
+        try:
+            self.assertEqual(pool.requeue_stale_jobs(), 1)
+            # Dentro do intervalo não consulta de novo
+            self.assertEqual(pool.requeue_stale_jobs(), 0)
+        finally:
+            pool.shutdown()
+        self.assertEqual(AutomationLog.objects.get(pk=dead.pk).status, 'pending')
+        self.assertEqual(AutomationLog.objects.get(pk=alive.pk).status, 'running')
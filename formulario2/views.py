@@ -7,12 +7,20 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.urls import reverse_lazy
 from django.views import View
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
 from .models import Formulario2, FormularioAmil, AutomationLog
+from .bulk import BulkError, create_in_bulk, parse_items
+from .conditional import conditional_detail, conditional_list
+from .events import get_broker, sse_stream
 from .forms import Formulario2Form, FormularioAmilForm, LoginForm
-from .automation_amil import start_amil_automation
+from .metrics import get_metrics_config, render_metrics
+from .pagination import QueryError, apply_cursor, paginate, parse_ids
+from .serializers import FORMULARIO2_API_FIELDS, FORMULARIO_AMIL_API_FIELDS, formulario2_row, formulario_amil_row, parse_fields
+from .streaming import STREAM_FORMATS, streaming_response
 
 # Create your views here.
 class CustomLoginView(LoginView):
@@ -71,19 +79,10 @@ class FormularioAmilCreateView(LoginRequiredMixin, CreateView):
     success_url = reverse_lazy('formulario_amil_list')
     
     def form_valid(self, form):
-        """Override form_valid to add success message and start automation"""
+        """Override form_valid to add success message (a automação é enfileirada pelo signal)"""
         response = super().form_valid(form)
         messages.success(self.request, 'Formulário Amil enviado com sucesso!')
-        
-        # Iniciar automação do Selenium em uma thread separada
-        try:
-            print("Iniciando automação da Amil...")
-            start_amil_automation()
-            messages.info(self.request, 'Automação da Amil iniciada! O navegador será aberto em alguns segundos.')
-        except Exception as e:
-            print(f"Erro ao iniciar automação: {e}")
-            messages.warning(self.request, 'Formulário salvo, mas houve um erro ao iniciar a automação.')
-        
+        messages.info(self.request, 'Automação da Amil enfileirada! Ela será executada assim que houver um worker livre.')
         return response
     
     def form_invalid(self, form):
@@ -124,44 +123,65 @@ class FormularioAmilDeleteView(LoginRequiredMixin, DeleteView):
         return super().delete(request, *args, **kwargs)
 
 
+def api_list(request, model, fields, ordering, serialize):
+    """
+    Listagem das APIs: ``?fields=`` (campos da resposta), ``?ids=`` (só esses
+    registros, em uma consulta), ``?stream=`` (exportação completa) ou uma
+    página por cursor (``?limit=``, ``?cursor=``)
+    """
+    fields = parse_fields(request.GET.get('fields'), fields)
+    # O cursor precisa dos campos da ordenação, mesmo que não tenham sido pedidos
+    extra = [name.lstrip('-') for name in ordering if name.lstrip('-') not in fields]
+    queryset = model.objects.values(*fields, *extra)
+    
+    def row(values):
+        for name in extra:
+            del values[name]
+        return serialize(values)
+    
+    ids = request.GET.get('ids')
+    stream = request.GET.get('stream')
+    if ids:
+        rows = list(queryset.filter(pk__in=parse_ids(ids)).order_by(*ordering))
+        next_cursor, limit = None, len(rows)
+    elif stream:
+        if stream not in STREAM_FORMATS:
+            raise QueryError(f"stream deve ser um de: {', '.join(STREAM_FORMATS)}")
+        return streaming_response(apply_cursor(queryset, request, ordering), row, stream)
+    else:
+        rows, next_cursor, limit = paginate(queryset, request, ordering)
+    
+    data = [row(values) for values in rows]
+    return JsonResponse({
+        'success': True,
+        'count': len(data),
+        'limit': limit,
+        'next': next_cursor,
+        'data': data
+    }, safe=False)
+
 
 @method_decorator(csrf_exempt, name='dispatch')
 class Formulario2APIView(View):
     """
     API endpoint para gerenciar dados do Formulario2
-    GET: Retorna todos os registros
+    GET: Retorna uma página de registros (?limit=, ?cursor=), do mais antigo para o mais novo,
+         ou todos em streaming (?stream=json|ndjson); ?fields= e ?ids= limitam campos e registros
     POST: Cria um novo registro
     """
+    ordering = ('id',)
     
+    @conditional_list(Formulario2)
     def get(self, request):
-        """Retorna todos os registros em formato JSON"""
+        """Retorna uma página de registros em formato JSON; ``next`` é o cursor da página seguinte"""
         try:
-            formularios = Formulario2.objects.all()
-            data = []
-            
-            for formulario in formularios:
-                data.append({
-                    'id': formulario.id,
-                    'nomeCompleto': formulario.nomeCompleto,
-                    'nomeSocial': formulario.nomeSocial or '',
-                    'dataNascimento': formulario.dataNascimento.strftime('%Y-%m-%d') if formulario.dataNascimento else None,
-                    'genero': formulario.genero,
-                    'estadoCivil': formulario.estadoCivil,
-                    'rg': formulario.rg,
-                    'cpf': formulario.cpf,
-                    'orgaoEmissor': formulario.orgaoEmissor,
-                    'dataEmissao': formulario.dataEmissao.strftime('%Y-%m-%d') if formulario.dataEmissao else None,
-                    'telefone': formulario.telefone,
-                    'email': formulario.email,
-                    'nomeMae': formulario.nomeMae,
-                })
+            return api_list(request, Formulario2, FORMULARIO2_API_FIELDS, self.ordering, formulario2_row)
             
+        except QueryError as e:
             return JsonResponse({
-                'success': True,
-                'count': len(data),
-                'data': data
-            }, safe=False)
-            
+                'success': False,
+                'error': str(e)
+            }, status=400)
         except Exception as e:
             return JsonResponse({
                 'success': False,
@@ -210,43 +230,23 @@ class Formulario2APIView(View):
 class FormularioAmilAPIView(View):
     """
     API endpoint para gerenciar dados do FormularioAmil
-    GET: Retorna todos os registros
+    GET: Retorna uma página de registros (?limit=, ?cursor=), do mais recente para o mais antigo,
+         ou todos em streaming (?stream=json|ndjson); ?fields= e ?ids= limitam campos e registros
     POST: Cria um novo registro
     """
+    ordering = ('-created_at', '-id')
     
+    @conditional_list(FormularioAmil)
     def get(self, request):
-        """Retorna todos os registros em formato JSON"""
+        """Retorna uma página de registros em formato JSON; ``next`` é o cursor da página seguinte"""
         try:
-            formularios = FormularioAmil.objects.all()
-            data = []
-            
-            for formulario in formularios:
-                data.append({
-                    'id': formulario.id,
-                    'nome': formulario.nome,
-                    'cpf': formulario.cpf,
-                    'nome_cartao': formulario.nome_cartao,
-                    'data_inclusao': formulario.data_inclusao.strftime('%Y-%m-%d') if formulario.data_inclusao else None,
-                    'data_registro': formulario.data_registro.strftime('%Y-%m-%d') if formulario.data_registro else None,
-                    'data_nascimento': formulario.data_nascimento.strftime('%Y-%m-%d') if formulario.data_nascimento else None,
-                    'sexo': formulario.sexo,
-                    'nacionalidade': formulario.nacionalidade,
-                    'nome_mae': formulario.nome_mae,
-                    'nome_pai': formulario.nome_pai or '',
-                    'estado_civil': formulario.estado_civil,
-                    'plano': formulario.plano,
-                    'contrato_dental': formulario.contrato_dental or '',
-                    'plano_dental': formulario.plano_dental or '',
-                    'created_at': formulario.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                    'updated_at': formulario.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-                })
+            return api_list(request, FormularioAmil, FORMULARIO_AMIL_API_FIELDS, self.ordering, formulario_amil_row)
             
+        except QueryError as e:
             return JsonResponse({
-                'success': True,
-                'count': len(data),
-                'data': data
-            }, safe=False)
-            
+                'success': False,
+                'error': str(e)
+            }, status=400)
         except Exception as e:
             return JsonResponse({
                 'success': False,
@@ -301,29 +301,16 @@ class Formulario2DetailAPIView(View):
     PUT: Atualiza um registro
     DELETE: Remove um registro
     """
+    @conditional_detail(Formulario2)
     def get(self, request, pk):
         try:
-            formulario = Formulario2.objects.get(pk=pk)
-            data = {
-                'success': True,
-                'data': {
-                    'id': formulario.id,
-                    'nomeCompleto': formulario.nomeCompleto,
-                    'cpf': formulario.cpf,
-                    'dataNascimento': formulario.dataNascimento.strftime('%Y-%m-%d') if formulario.dataNascimento else None,
-                    'email': formulario.email,
-                    'telefone': formulario.telefone,
-                    'endereco': formulario.endereco,
-                    'cidade': formulario.cidade,
-                    'estado': formulario.estado,
-                    'cep': formulario.cep,
-                    'created_at': formulario.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                    'updated_at': formulario.updated_at.strftime('%Y-%m-%d %H:%M:%S')
-                }
-            }
-            return JsonResponse(data)
+            fields = parse_fields(request.GET.get('fields'), FORMULARIO2_API_FIELDS)
+            formulario = Formulario2.objects.values(*fields).get(pk=pk)
+            return JsonResponse({'success': True, 'data': formulario2_row(formulario)})
         except Formulario2.DoesNotExist:
             return JsonResponse({'success': False, 'error': 'Formulário não encontrado'}, status=404)
+        except QueryError as e:
+            return JsonResponse({'success': False, 'error': str(e)}, status=400)
         except Exception as e:
             return JsonResponse({'success': False, 'error': str(e)}, status=500)
 
@@ -363,29 +350,13 @@ class FormularioAmilDetailAPIView(View):
     DELETE: Remove um registro
     """
     
+    @conditional_detail(FormularioAmil)
     def get(self, request, pk):
         """Retorna um registro específico"""
         try:
-            formulario = FormularioAmil.objects.get(pk=pk)
-            data = {
-                'id': formulario.id,
-                'nome': formulario.nome,
-                'cpf': formulario.cpf,
-                'nome_cartao': formulario.nome_cartao,
-                'data_inclusao': formulario.data_inclusao.strftime('%Y-%m-%d') if formulario.data_inclusao else None,
-                'data_registro': formulario.data_registro.strftime('%Y-%m-%d') if formulario.data_registro else None,
-                'data_nascimento': formulario.data_nascimento.strftime('%Y-%m-%d') if formulario.data_nascimento else None,
-                'sexo': formulario.sexo,
-                'nacionalidade': formulario.nacionalidade,
-                'nome_mae': formulario.nome_mae,
-                'nome_pai': formulario.nome_pai or '',
-                'estado_civil': formulario.estado_civil,
-                'plano': formulario.plano,
-                'contrato_dental': formulario.contrato_dental or '',
-                'plano_dental': formulario.plano_dental or '',
-                'created_at': formulario.created_at.strftime('%Y-%m-%d %H:%M:%S'),
-                'updated_at': formulario.updated_at.strftime('%Y-%m-%d %H:%M:%S'),
-            }
+            fields = parse_fields(request.GET.get('fields'), FORMULARIO_AMIL_API_FIELDS)
+            formulario = FormularioAmil.objects.values(*fields).get(pk=pk)
+            data = formulario_amil_row(formulario)
             
             return JsonResponse({
                 'success': True,
@@ -397,6 +368,11 @@ class FormularioAmilDetailAPIView(View):
                 'success': False,
                 'error': 'Registro não encontrado'
             }, status=404)
+        except QueryError as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            }, status=400)
         except Exception as e:
             return JsonResponse({
                 'success': False,
@@ -467,4 +443,89 @@ class FormularioAmilDetailAPIView(View):
         
         
         
-        
\ No newline at end of file
+        
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class FormularioBulkAPIView(View):
+    """
+    API endpoint de cadastro em lote (``form_class`` define o portal)
+    POST: Cria vários registros (array JSON ou NDJSON) e enfileira uma automação para cada um
+
+    Status: 201 se todos os itens foram criados, 207 (Multi-Status) se só
+    parte deles e 400 se nenhum; o resultado de cada item está em ``results``.
+    """
+    form_class = None
+    
+    def post(self, request):
+        """Valida cada item, cria os válidos em uma transação e retorna o resultado por item"""
+        try:
+            results = create_in_bulk(self.form_class, parse_items(request))
+            created = sum(1 for result in results if result['success'])
+            if created == len(results):
+                status = 201
+            else:
+                status = 207 if created else 400
+            
+            return JsonResponse({
+                'success': created == len(results),
+                'created': created,
+                'failed': len(results) - created,
+                'results': results
+            }, status=status)
+            
+        except BulkError as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            }, status=400)
+        except Exception as e:
+            return JsonResponse({
+                'success': False,
+                'error': str(e)
+            }, status=500)
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Métricas das automações no formato texto do Prometheus (fila, vazão,
+    pool de navegadores e histogramas de duração por passo)
+    """
+    token = get_metrics_config()['token']
+    if token:
+        auth = request.headers.get('Authorization', '')
+        provided = auth[7:] if auth.startswith('Bearer ') else request.GET.get('token')
+        if not constant_time_compare(provided or '', token):
+            return HttpResponse('Não autorizado\n', status=401, content_type='text/plain; charset=utf-8')
+    
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@require_GET
+def job_events_view(request, pk=None):
+    """
+    Status dos jobs em tempo real (Server-Sent Events): de todos os jobs ou,
+    com ``pk``, só daquele job — começando pelo estado atual (``snapshot``) e
+    encerrando quando ele termina
+    """
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Last-Event-ID inválido'}, status=400)
+    
+    if pk is not None and not AutomationLog.objects.filter(pk=pk).exists():
+        return JsonResponse({'success': False, 'error': 'Job não encontrado'}, status=404)
+    
+    # Assina antes de ler o estado atual: nenhuma transição entre os dois se perde
+    subscription = get_broker().subscribe(job_id=pk, last_event_id=last_event_id)
+    snapshot = None
+    if pk is not None:
+        snapshot = AutomationLog.objects.values('id', 'portal', 'status', 'attempts', 'worker_id', 'error_message').get(pk=pk)
+        snapshot['job'] = snapshot.pop('id')
+    
+    response = StreamingHttpResponse(sse_stream(subscription, snapshot), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,324 @@
+"""
+Esperas por condição usadas pelas automações no lugar de ``time.sleep``.
+
+Cada função retorna assim que a condição é satisfeita; os valores de
+``TIMING`` (em ``automation_config``) são apenas o tempo máximo de espera.
+
+Há dois tipos de espera:
+
+* ``present``, ``visible``, ``clickable``, ``url_contains`` e ``url_changed``
+  exigem a condição e lançam ``TimeoutException`` se ela não ocorrer;
+* ``page_loaded``, ``spinner_gone``, ``quiescent``, ``network_idle``,
+  ``dom_quiet``, ``value_settled``, ``focused``, ``js_truthy`` e ``until`` substituem
+  pausas de "dar um tempo para a página": retornam True/False e nunca lançam
+  exceção, como o ``sleep`` que substituem.
+
+"Página pronta" é medida por um probe injetado em cada documento
+(``QUIESCENCE_PROBE``): um MutationObserver e um contador de requisições
+fetch/XHR em andamento. ``quiescent`` espera ambos ficarem parados por
+``quiet_ms`` — os portais são SPAs React que continuam carregando depois do
+``readyState`` completo.
+
+Com ``step='porto.susep'`` a espera usa o timeout aprendido para aquele passo
+(``step_timeouts``) em vez do valor genérico de ``TIMING`` e registra quanto
+tempo a condição levou para ser atendida. O tempo esgotado só é registrado nas
+esperas obrigatórias: nas tolerantes e nas tentativas com ``optional=True``
+ele é um resultado esperado, não sinal de que o timeout está curto.
+
+As verificações de DOM são feitas via JavaScript (e não ``find_elements``)
+para não acumular o ``implicitly_wait`` do driver a cada consulta.
+"""
+import logging
+import time
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from .automation_config import TIMING
+from .step_timeouts import get_step_timeout, record_step_duration
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMING = {
+    'page_load': 30,
+    'element': 15,
+    'navigation': 30,
+    'settle': 5,
+    'network_idle': 10,
+    'poll_interval': 0.1,
+}
+
+# Indicadores de carregamento comuns nos portais (React/Angular)
+SPINNER_SELECTORS = [
+    '[class*="spinner"]',
+    '[class*="loading"]',
+    '[class*="loader"]',
+    '[aria-busy="true"]',
+    '[role="progressbar"]',
+]
+
+
+# Instalado em cada documento: conta requisições fetch/XHR em andamento e
+# registra o instante da última mutação do DOM e da última atividade de rede
+QUIESCENCE_PROBE = """
+(function () {
+    if (window.__automationQuiet) return;
+    var state = window.__automationQuiet = {inflight: 0, lastMutation: performance.now(), lastNetwork: performance.now()};
+
+    function started() { state.inflight++; state.lastNetwork = performance.now(); }
+    function finished() { state.inflight = Math.max(0, state.inflight - 1); state.lastNetwork = performance.now(); }
+
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            started();
+            return originalFetch.apply(this, arguments).then(
+                function (response) { finished(); return response; },
+                function (error) { finished(); throw error; }
+            );
+        };
+    }
+
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        started();
+        this.addEventListener('loadend', finished, {once: true});
+        return originalSend.apply(this, arguments);
+    };
+
+    function observe() {
+        new MutationObserver(function () { state.lastMutation = performance.now(); })
+            .observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    }
+    if (document.documentElement) {
+        observe();
+    } else {
+        document.addEventListener('DOMContentLoaded', observe, {once: true});
+    }
+})();
+"""
+
+QUIESCENCE_STATE = """
+var state = window.__automationQuiet;
+if (!state) return null;
+return {inflight: state.inflight, lastMutation: state.lastMutation, lastNetwork: state.lastNetwork, now: performance.now()};
+"""
+
+
+def timeout_for(name):
+    """Tempo máximo (segundos) de uma categoria de espera em ``TIMING``"""
+    return TIMING.get(name, DEFAULT_TIMING.get(name, 10))
+
+
+def _poll():
+    return timeout_for('poll_interval')
+
+
+def _resolve_timeout(timeout, name, step):
+    """Timeout explícito > aprendido para o passo (``StepTimeout``) > ``TIMING[name]``"""
+    if timeout is not None:
+        return timeout
+    if step:
+        return get_step_timeout(step, timeout_for(name))
+    return timeout_for(name)
+
+
+def _run(driver, condition, timeout, name, step, record_timeout=True):
+    """
+    Executa a espera e registra a duração do passo. Com ``record_timeout`` o
+    tempo esgotado também é registrado, como amostra censurada: só esperas
+    obrigatórias, cujo timeout significa que a página demorou demais.
+    """
+    started = time.monotonic()
+    try:
+        result = WebDriverWait(
+            driver,
+            _resolve_timeout(timeout, name, step),
+            poll_frequency=_poll(),
+            ignored_exceptions=(StaleElementReferenceException,),
+        ).until(condition)
+    except TimeoutException:
+        if step and record_timeout:
+            record_step_duration(step, time.monotonic() - started, timed_out=True)
+        raise
+    if step:
+        record_step_duration(step, time.monotonic() - started)
+    return result
+
+
+# ``optional=True``: tentativa com alternativa em caso de falha (ex: um entre vários localizadores);
+# o tempo esgotado não conta como demora da página nos timeouts adaptativos
+
+def present(driver, locator, timeout=None, step=None, name='element', optional=False):
+    """Elemento presente no DOM"""
+    return _run(driver, EC.presence_of_element_located(locator), timeout, name, step, not optional)
+
+
+def visible(driver, locator, timeout=None, step=None, name='element', optional=False):
+    """Elemento presente e visível"""
+    return _run(driver, EC.visibility_of_element_located(locator), timeout, name, step, not optional)
+
+
+def clickable(driver, locator, timeout=None, step=None, name='element', optional=False):
+    """Elemento visível e habilitado"""
+    return _run(driver, EC.element_to_be_clickable(locator), timeout, name, step, not optional)
+
+
+def url_contains(driver, *fragments, timeout=None, step=None):
+    """URL atual contém algum dos trechos; retorna a URL"""
+    _run(driver, lambda d: any(fragment in d.current_url for fragment in fragments), timeout, 'navigation', step)
+    return driver.current_url
+
+
+def url_changed(driver, old_url, timeout=None, step=None):
+    """URL diferente de ``old_url`` (ex: após clicar em login); retorna a nova URL"""
+    _run(driver, lambda d: d.current_url != old_url, timeout, 'navigation', step)
+    return driver.current_url
+
+
+def _until(driver, condition, timeout, name, step, description):
+    """Executa uma espera tolerante: retorna True/False em vez de lançar (tempo esgotado não é amostrado)"""
+    try:
+        _run(driver, condition, timeout, name, step, record_timeout=False)
+        return True
+    except TimeoutException:
+        logger.debug(f"⏳ Tempo esgotado aguardando {description}")
+        return False
+    except WebDriverException as e:
+        logger.debug(f"⚠️ Erro aguardando {description}: {e}")
+        return False
+
+
+def until(driver, predicate, timeout=None, name='settle', step=None, description='condição'):
+    """Aguarda ``predicate(driver)`` retornar um valor verdadeiro"""
+    return _until(driver, predicate, timeout, name, step, description)
+
+
+def js_truthy(driver, script, *args, timeout=None, name='settle', step=None):
+    """Aguarda ``script`` retornar um valor verdadeiro"""
+    return _until(driver, lambda d: d.execute_script(script, *args), timeout, name, step, 'condição JavaScript')
+
+
+def page_loaded(driver, timeout=None, step=None):
+    """``document.readyState`` completo"""
+    return _until(
+        driver,
+        lambda d: d.execute_script("return document.readyState") == 'complete',
+        timeout, 'page_load', step, 'carregamento da página',
+    )
+
+
+def spinner_gone(driver, selectors=None, timeout=None, step=None):
+    """Nenhum indicador de carregamento visível"""
+    script = """
+        var selectors = arguments[0];
+        for (var i = 0; i < selectors.length; i++) {
+            var nodes = document.querySelectorAll(selectors[i]);
+            for (var j = 0; j < nodes.length; j++) {
+                if (nodes[j].offsetParent !== null) return false;
+            }
+        }
+        return true;
+    """
+    return _until(
+        driver,
+        lambda d: d.execute_script(script, selectors or SPINNER_SELECTORS),
+        timeout, 'settle', step, 'indicadores de carregamento sumirem',
+    )
+
+
+def install_quiescence_probe(driver):
+    """
+    Registra o ``QUIESCENCE_PROBE`` para todo documento novo (inclusive iframes) via CDP
+    e o instala no documento atual. Chamado ao criar o driver; pode ser repetido.
+    """
+    if not getattr(driver, '_quiescence_probe_installed', False):
+        try:
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': QUIESCENCE_PROBE})
+            driver._quiescence_probe_installed = True
+        except Exception as e:
+            # Sem CDP o probe é instalado sob demanda e só vê a atividade posterior à instalação
+            logger.debug(f"⚠️ CDP indisponível para o probe de quiescência: {e}")
+    try:
+        driver.execute_script(QUIESCENCE_PROBE)
+    except WebDriverException:
+        pass
+
+
+def _quiet_state(driver):
+    state = driver.execute_script(QUIESCENCE_STATE)
+    if state is None:
+        driver.execute_script(QUIESCENCE_PROBE)
+        state = driver.execute_script(QUIESCENCE_STATE)
+    return state
+
+
+def quiescent(driver, quiet_ms=500, timeout=None, dom=True, network=True, step=None):
+    """
+    Aguarda o DOM (MutationObserver) e a rede (fetch/XHR em andamento) ficarem
+    sem atividade por ``quiet_ms`` milissegundos
+    """
+    def quiet(d):
+        state = _quiet_state(d)
+        if not state:
+            return False
+        if network and state['inflight'] > 0:
+            return False
+        last_activity = max(
+            state['lastMutation'] if dom else 0,
+            state['lastNetwork'] if network else 0,
+        )
+        return state['now'] - last_activity >= quiet_ms
+
+    return _until(driver, quiet, timeout, 'network_idle', step, 'página ociosa (DOM e rede)')
+
+
+def network_idle(driver, idle_for=0.5, timeout=None, step=None):
+    """Nenhuma requisição fetch/XHR em andamento por ``idle_for`` segundos"""
+    return quiescent(driver, quiet_ms=idle_for * 1000, timeout=timeout, dom=False, step=step)
+
+
+def dom_quiet(driver, quiet_ms=300, timeout=None, step=None):
+    """DOM sem mutações por ``quiet_ms`` milissegundos (ex: React terminou de renderizar)"""
+    return quiescent(driver, quiet_ms=quiet_ms, timeout=timeout, network=False, step=step)
+
+
+def value_settled(driver, element, expected=None, stable_for=0.3, timeout=None, step=None):
+    """
+    Valor do campo igual a ``expected`` (se informado) e sem mudanças por ``stable_for`` segundos
+    (máscaras e autocompletes reescrevem o valor logo após a digitação)
+    """
+    state = {'last': None, 'since': time.monotonic()}
+
+    def settled(d):
+        value = d.execute_script("return arguments[0].value;", element)
+        now = time.monotonic()
+        if value != state['last']:
+            state['last'] = value
+            state['since'] = now
+            return False
+        if expected is not None and value != expected:
+            return False
+        return now - state['since'] >= stable_for
+
+    return _until(driver, settled, timeout, 'settle', step, 'valor do campo estabilizar')
+
+
+def focused(driver, element, timeout=None, step=None):
+    """Elemento com foco"""
+    return _until(
+        driver,
+        lambda d: d.execute_script("return document.activeElement === arguments[0];", element),
+        timeout, 'settle', step, 'foco no campo',
+    )
+
+
+def ready(driver, timeout=None, step=None):
+    """Página carregada, sem spinners e com DOM e rede ociosos (cada etapa registrada como ``<step>:<etapa>``)"""
+    results = [
+        page_loaded(driver, timeout, step=step and f'{step}:load'),
+        spinner_gone(driver, timeout=timeout, step=step and f'{step}:spinner'),
+        quiescent(driver, timeout=timeout, step=step and f'{step}:quiet'),
+    ]
+    return all(results)
@@ -0,0 +1,216 @@
+"""
+Pool de execução do worker de automações.
+
+Executa até N jobs em paralelo, com um limite separado por portal
+(``settings.AUTOMATION_CONCURRENCY``). Cada job ocupa um navegador, então o
+limite define o consumo máximo de memória da máquina; o excedente permanece
+``pending`` no banco até abrir uma vaga.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+
+from .driver_pool import get_driver_pool, shutdown_driver_pools
+from .events import purge_events
+from .jobs import claim_next_job, execute_job, requeue_stale_jobs
+from .metrics import get_metrics_config
+from .models import WorkerStatus
+from .step_timeouts import get_step_timeout_config, refresh_step_timeouts
+
+logger = logging.getLogger(__name__)
+
+# Segundos entre limpezas dos eventos de status antigos
+EVENTS_PURGE_INTERVAL = 3600
+
+DEFAULT_CONCURRENCY = {
+    'porto': 1,
+    'amil': 1,
+}
+
+
+def get_concurrency(overrides=None):
+    """Limites por portal: padrão < settings.AUTOMATION_CONCURRENCY < overrides"""
+    concurrency = dict(DEFAULT_CONCURRENCY)
+    concurrency.update(getattr(settings, 'AUTOMATION_CONCURRENCY', {}))
+    concurrency.update(overrides or {})
+    return {portal: max(0, int(limit)) for portal, limit in concurrency.items()}
+
+
+class AutomationWorkerPool:
+    """Reivindica jobs da fila respeitando o limite de cada portal"""
+
+    def __init__(self, worker_id, concurrency=None, use_driver_pool=True, stale_after=None):
+        self.worker_id = worker_id
+        self.use_driver_pool = use_driver_pool
+        self.stale_after = stale_after
+        self.concurrency = get_concurrency(concurrency)
+        self.running = {portal: 0 for portal in self.concurrency}
+        self.processed = 0
+        self._timeouts_refreshed_at = None
+        self._status_published_at = None
+        self._events_purged_at = None
+        self._requeued_at = None
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Event()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, sum(self.concurrency.values())),
+            thread_name_prefix='automation-worker',
+        )
+
+    @property
+    def in_flight(self):
+        with self._lock:
+            return sum(self.running.values())
+
+    def fill(self):
+        """Ocupa todas as vagas livres com jobs pendentes. Retorna quantos foram iniciados"""
+        started = 0
+        for portal, limit in self.concurrency.items():
+            while True:
+                with self._lock:
+                    if self.running[portal] >= limit:
+                        break
+
+                automation_log = claim_next_job(self.worker_id, portal=portal)
+                if automation_log is None:
+                    break
+
+                with self._lock:
+                    self.running[portal] += 1
+                logger.info(
+                    f"📋 Job {automation_log.id} ({portal}) reivindicado "
+                    f"(tentativa {automation_log.attempts}, {self.running[portal]}/{limit} em execução)"
+                )
+                self._executor.submit(self._run, automation_log)
+                started += 1
+        return started
+
+    def _run(self, automation_log):
+        try:
+            execute_job(automation_log, use_driver_pool=self.use_driver_pool)
+        except Exception as e:
+            logger.error(f"💥 Erro inesperado no job {automation_log.id}: {e}")
+        finally:
+            # Cada thread tem sua própria conexão com o banco
+            connections.close_all()
+            with self._lock:
+                self.running[automation_log.portal] -= 1
+                self.processed += 1
+            self._slot_freed.set()
+
+    def wait(self, timeout):
+        """Aguarda até uma vaga ser liberada ou ``timeout`` segundos"""
+        self._slot_freed.wait(timeout)
+        self._slot_freed.clear()
+
+    def warm_driver_pools(self):
+        """Pré-inicializa os navegadores dos portais com vagas no pool"""
+        if not self.use_driver_pool:
+            return
+        for portal, limit in self.concurrency.items():
+            driver_pool = get_driver_pool(portal) if limit else None
+            if driver_pool:
+                driver_pool.warm()
+
+    def refresh_step_timeouts(self):
+        """Recalcula os timeouts adaptativos a cada ``refresh_interval`` segundos"""
+        config = get_step_timeout_config()
+        now = time.monotonic()
+        if not config['enabled']:
+            return
+        if self._timeouts_refreshed_at is not None and now - self._timeouts_refreshed_at < config['refresh_interval']:
+            return
+        self._timeouts_refreshed_at = now
+        try:
+            refresh_step_timeouts()
+        except Exception as e:
+            logger.error(f"❌ Erro ao recalcular timeouts adaptativos: {e}")
+
+    def purge_events(self):
+        """Apaga os eventos de status antigos (``AUTOMATION_EVENTS['retention']``) uma vez por hora"""
+        now = time.monotonic()
+        if self._events_purged_at is not None and now - self._events_purged_at < EVENTS_PURGE_INTERVAL:
+            return
+        self._events_purged_at = now
+        try:
+            deleted = purge_events()
+            if deleted:
+                logger.info(f"🧹 {deleted} evento(s) de automação antigo(s) apagado(s)")
+        except Exception as e:
+            logger.error(f"❌ Erro ao apagar eventos antigos: {e}")
+
+    def requeue_stale_jobs(self):
+        """
+        Devolve para a fila, a cada ``worker_stale_after`` segundos, os jobs de
+        workers que pararam de publicar o próprio estado (ou mais antigos que
+        ``stale_after``)
+        """
+        now = time.monotonic()
+        if self._requeued_at is not None and now - self._requeued_at < get_metrics_config()['worker_stale_after']:
+            return 0
+        self._requeued_at = now
+        try:
+            return requeue_stale_jobs(stale_after=self.stale_after)
+        except Exception as e:
+            logger.error(f"❌ Erro ao devolver jobs interrompidos para a fila: {e}")
+            return 0
+
+    def publish_status(self, force=False):
+        """Publica vagas e pool de navegadores em ``WorkerStatus`` (lido pelo /metrics)"""
+        now = time.monotonic()
+        interval = get_metrics_config()['worker_status_interval']
+        if not force and self._status_published_at is not None and now - self._status_published_at < interval:
+            return
+        self._status_published_at = now
+
+        with self._lock:
+            running = dict(self.running)
+            processed = self.processed
+
+        driver_pools = []
+        if self.use_driver_pool:
+            for portal, limit in self.concurrency.items():
+                driver_pool = get_driver_pool(portal) if limit else None
+                if driver_pool:
+                    driver_pools.append(driver_pool.stats)
+
+        try:
+            WorkerStatus.objects.update_or_create(
+                worker_id=self.worker_id,
+                defaults={
+                    'running': running,
+                    'concurrency': self.concurrency,
+                    'driver_pools': driver_pools,
+                    'processed': processed,
+                },
+            )
+        except Exception as e:
+            logger.error(f"❌ Erro ao publicar o estado do worker: {e}")
+
+    def run(self, poll_interval=2.0, once=False):
+        """Loop principal; com ``once`` encerra quando a fila esvazia e os jobs terminam"""
+        self.warm_driver_pools()
+        while True:
+            close_old_connections()
+            self.refresh_step_timeouts()
+            self.purge_events()
+            self.requeue_stale_jobs()
+            self.fill()
+            self.publish_status()
+
+            if once and self.in_flight == 0:
+                break
+            self.wait(poll_interval)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+        try:
+            WorkerStatus.objects.filter(worker_id=self.worker_id).delete()
+        except Exception as e:
+            logger.warning(f"⚠️ Não foi possível remover o estado do worker: {e}")
+        if self.use_driver_pool:
+            shutdown_driver_pools()
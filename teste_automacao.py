@@ -10,8 +10,7 @@ try:
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
-    from selenium.webdriver.chrome.service import Service
-    from webdriver_manager.chrome import ChromeDriverManager
+    from formulario2.chromedriver import chrome_service
     import time
     print("✅ Bibliotecas importadas com sucesso!")
     
@@ -23,9 +22,9 @@ try:
     chrome_options.add_experimental_option('useAutomationExtension', False)
     print("✅ Chrome configurado!")
     
-    print("3. Baixando ChromeDriver...")
-    service = Service(ChromeDriverManager().install())
-    print("✅ ChromeDriver baixado!")
+    print("3. Localizando ChromeDriver...")
+    service = chrome_service()
+    print("✅ ChromeDriver localizado!")
     
     print("4. Iniciando navegador...")
     driver = webdriver.Chrome(service=service, options=chrome_options)